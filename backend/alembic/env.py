@@ -20,6 +20,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.config import settings
 from app.core import models  # noqa: F401 - garante registro no metadata
+from app.auth import models as auth_models  # noqa: F401
 from app.volunteers import models as volunteers_models  # noqa: F401
 from app.db.base import Base
 
@@ -29,8 +30,8 @@ if config.config_file_name is not None:
     if logging_config.endswith(".ini"):
         logging.config.fileConfig(logging_config)
 
-# override sqlalchemy.url com settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# override sqlalchemy.url com settings (direta: DDL e locks não passam pelo PgBouncer)
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL_DIRETA or settings.DATABASE_URL)
 
 logger = getLogger("alembic.env")
 
@@ -0,0 +1,70 @@
+"""Resumo corrente de vendas por turno de caixa.
+
+Revision ID: 0011_pos_resumo_turno
+Revises: 0010_add_volunteers
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0011_pos_resumo_turno"
+down_revision = "0010_add_volunteers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "pos_turnocaixa",
+        sa.Column("quantidade_vendas", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "pos_turnocaixa",
+        sa.Column("valor_vendas", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "pos_resumoturnopagamento",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "turno_id",
+            sa.BigInteger(),
+            sa.ForeignKey("pos_turnocaixa.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("valor", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("quantidade", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("turno_id", "tipo", name="uniq_resumo_turno_tipo"),
+    )
+
+    # Backfill a partir das vendas já registradas.
+    op.execute(
+        """
+        UPDATE pos_turnocaixa t
+        SET quantidade_vendas = agg.qtd, valor_vendas = agg.total
+        FROM (
+            SELECT turno_id, COUNT(*) AS qtd, COALESCE(SUM(total), 0) AS total
+            FROM pos_vendamobile
+            WHERE turno_id IS NOT NULL
+            GROUP BY turno_id
+        ) agg
+        WHERE agg.turno_id = t.id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO pos_resumoturnopagamento (turno_id, tipo, valor, quantidade)
+        SELECT v.turno_id, p.tipo, SUM(p.valor), COUNT(*)
+        FROM pos_pagamentovenda p
+        JOIN pos_vendamobile v ON v.id = p.venda_id
+        WHERE v.turno_id IS NOT NULL
+        GROUP BY v.turno_id, p.tipo
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("pos_resumoturnopagamento")
+    op.drop_column("pos_turnocaixa", "valor_vendas")
+    op.drop_column("pos_turnocaixa", "quantidade_vendas")
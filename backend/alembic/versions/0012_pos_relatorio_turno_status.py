@@ -0,0 +1,28 @@
+"""Status da geração assíncrona do PDF de fechamento de turno.
+
+Revision ID: 0012_pos_relatorio_status
+Revises: 0011_pos_resumo_turno
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0012_pos_relatorio_status"
+down_revision = "0011_pos_resumo_turno"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("pos_turnocaixa", sa.Column("relatorio_status", sa.String(20), nullable=True))
+    op.add_column("pos_turnocaixa", sa.Column("relatorio_erro", sa.String(500), nullable=True))
+    # Turnos fechados antes desta revisão já tiveram o PDF gerado de forma síncrona.
+    op.execute(
+        "UPDATE pos_turnocaixa SET relatorio_status = 'PRONTO' WHERE relatorio_pdf IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("pos_turnocaixa", "relatorio_erro")
+    op.drop_column("pos_turnocaixa", "relatorio_status")
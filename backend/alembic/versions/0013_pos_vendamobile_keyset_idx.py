@@ -0,0 +1,36 @@
+"""Índice para a paginação por keyset de /pos/vendas.
+
+Revision ID: 0013_pos_vendas_keyset_idx
+Revises: 0012_pos_relatorio_status
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0013_pos_vendas_keyset_idx"
+down_revision = "0012_pos_relatorio_status"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY não roda dentro de transação e não bloqueia as vendas em andamento.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_vendamobile_evento_local_data",
+            "pos_vendamobile",
+            ["evento_id", "local_id", sa.text("data_hora DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_vendamobile_evento_local_data",
+            table_name="pos_vendamobile",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
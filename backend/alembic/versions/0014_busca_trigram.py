@@ -0,0 +1,52 @@
+"""Busca de produtos com pg_trgm + unaccent (índices GIN).
+
+Revision ID: 0014_busca_trigram
+Revises: 0013_pos_vendas_keyset_idx
+"""
+
+from alembic import op
+
+revision = "0014_busca_trigram"
+down_revision = "0013_pos_vendas_keyset_idx"
+branch_labels = None
+depends_on = None
+
+
+# Devem ser idênticas às expressões geradas por app.db.search.documento_busca.
+INDICES = {
+    "ix_itemvendamobile_busca_trgm": (
+        "pos_itemvendamobile",
+        "f_unaccent(lower((nome_produto || ' ') || codigo_produto))",
+    ),
+    "ix_produto_busca_trgm": (
+        "inventory_produto",
+        "f_unaccent(lower((nome || ' ') || sku))",
+    ),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() é STABLE; índices de expressão exigem uma função IMMUTABLE.
+    # Fixar o dicionário torna o wrapper seguro para isso.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    with op.get_context().autocommit_block():
+        for nome, (tabela, expressao) in INDICES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {nome} "
+                f"ON {tabela} USING gin ({expressao} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nome in INDICES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
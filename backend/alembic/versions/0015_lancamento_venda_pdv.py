@@ -0,0 +1,49 @@
+"""Vínculo explícito entre lançamento financeiro e venda do PDV.
+
+Revision ID: 0015_lancamento_venda_pdv
+Revises: 0014_busca_trigram
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0015_lancamento_venda_pdv"
+down_revision = "0014_busca_trigram"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "finance_lancamentofinanceiro",
+        sa.Column(
+            "venda_pdv_id",
+            sa.BigInteger(),
+            sa.ForeignKey("pos_vendamobile.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_lancamento_venda_pdv",
+        "finance_lancamentofinanceiro",
+        ["venda_pdv_id"],
+        postgresql_where=sa.text("venda_pdv_id IS NOT NULL"),
+    )
+    # Lançamentos por venda gravados antes do vínculo: descrição "Venda PDV #<ref[:8]> — ..."
+    op.execute(
+        """
+        UPDATE finance_lancamentofinanceiro AS l
+           SET venda_pdv_id = v.id
+          FROM pos_vendamobile AS v
+         WHERE l.setor_origem = 'pos'
+           AND l.venda_pdv_id IS NULL
+           AND l.evento_id = v.evento_id
+           AND l.descricao LIKE 'Venda PDV #' || left(v.id_referencia, 8) || ' %'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lancamento_venda_pdv", table_name="finance_lancamentofinanceiro")
+    op.drop_column("finance_lancamentofinanceiro", "venda_pdv_id")
@@ -0,0 +1,121 @@
+"""Versão do catálogo do PDV (ETag / modo delta).
+
+Revision ID: 0016_pos_catalogo_versao
+Revises: 0015_lancamento_venda_pdv
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0016_pos_catalogo_versao"
+down_revision = "0015_lancamento_venda_pdv"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS pos_catalogo_versao_seq")
+    op.add_column(
+        "pos_produtolocal",
+        sa.Column(
+            "versao",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("nextval('pos_catalogo_versao_seq')"),
+        ),
+    )
+    op.add_column(
+        "pos_localvenda",
+        sa.Column("catalogo_versao", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_produtolocal_local_versao", "pos_produtolocal", ["local_id", "versao"])
+
+    # Triggers: valem também para escritas da stack Django, que não conhece a coluna.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_produtolocal_bump_versao() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.versao := nextval('pos_catalogo_versao_seq');
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_produtolocal_versao
+        BEFORE INSERT OR UPDATE ON pos_produtolocal
+        FOR EACH ROW EXECUTE FUNCTION pos_produtolocal_bump_versao()
+        """
+    )
+    # Remoções não deixam linha para versionar: avança a versão do local.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_produtolocal_remocao_versao() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE pos_localvenda
+               SET catalogo_versao = nextval('pos_catalogo_versao_seq')
+             WHERE id = OLD.local_id;
+            RETURN OLD;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_produtolocal_remocao_versao
+        AFTER DELETE ON pos_produtolocal
+        FOR EACH ROW EXECUTE FUNCTION pos_produtolocal_remocao_versao()
+        """
+    )
+    # Nome/SKU do produto e nome da família fazem parte do catálogo.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_catalogo_toca_produtos() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'pos_familiavenda' THEN
+                UPDATE pos_produtolocal SET familia_id = familia_id WHERE familia_id = NEW.id;
+            ELSE
+                UPDATE pos_produtolocal SET produto_id = produto_id WHERE produto_id = NEW.id;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_familiavenda_catalogo
+        AFTER UPDATE OF nome ON pos_familiavenda
+        FOR EACH ROW WHEN (OLD.nome IS DISTINCT FROM NEW.nome)
+        EXECUTE FUNCTION pos_catalogo_toca_produtos()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_produto_catalogo
+        AFTER UPDATE OF nome, sku, ativo ON inventory_produto
+        FOR EACH ROW
+        WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.sku IS DISTINCT FROM NEW.sku
+              OR OLD.ativo IS DISTINCT FROM NEW.ativo)
+        EXECUTE FUNCTION pos_catalogo_toca_produtos()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_produto_catalogo ON inventory_produto")
+    op.execute("DROP TRIGGER IF EXISTS trg_familiavenda_catalogo ON pos_familiavenda")
+    op.execute("DROP TRIGGER IF EXISTS trg_produtolocal_remocao_versao ON pos_produtolocal")
+    op.execute("DROP TRIGGER IF EXISTS trg_produtolocal_versao ON pos_produtolocal")
+    op.execute("DROP FUNCTION IF EXISTS pos_catalogo_toca_produtos()")
+    op.execute("DROP FUNCTION IF EXISTS pos_produtolocal_remocao_versao()")
+    op.execute("DROP FUNCTION IF EXISTS pos_produtolocal_bump_versao()")
+    op.drop_index("ix_produtolocal_local_versao", table_name="pos_produtolocal")
+    op.drop_column("pos_localvenda", "catalogo_versao")
+    op.drop_column("pos_produtolocal", "versao")
+    op.execute("DROP SEQUENCE IF EXISTS pos_catalogo_versao_seq")
@@ -0,0 +1,76 @@
+"""NOTIFY pos_eventos para o canal de push do PDV.
+
+Revision ID: 0017_pos_notify_eventos
+Revises: 0016_pos_catalogo_versao
+"""
+
+from alembic import op
+
+revision = "0017_pos_notify_eventos"
+down_revision = "0016_pos_catalogo_versao"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_notify_produtolocal() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('pos_eventos', json_build_object(
+                'tipo', 'produto',
+                'local_id', NEW.local_id,
+                'id', NEW.id,
+                'estoque_atual', NEW.estoque_atual,
+                'preco_venda', NEW.preco_venda,
+                'ativo', NEW.ativo,
+                'versao', NEW.versao
+            )::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_produtolocal_notify
+        AFTER UPDATE OF estoque_atual, preco_venda, ativo ON pos_produtolocal
+        FOR EACH ROW
+        WHEN (OLD.estoque_atual IS DISTINCT FROM NEW.estoque_atual
+              OR OLD.preco_venda IS DISTINCT FROM NEW.preco_venda
+              OR OLD.ativo IS DISTINCT FROM NEW.ativo)
+        EXECUTE FUNCTION pos_notify_produtolocal()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_notify_localvenda() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('pos_eventos', json_build_object(
+                'tipo', 'caixa',
+                'local_id', NEW.id,
+                'caixa_aberto', NEW.caixa_aberto,
+                'turno_id', NEW.caixa_atual_turno_id
+            )::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_localvenda_notify
+        AFTER UPDATE OF caixa_aberto ON pos_localvenda
+        FOR EACH ROW WHEN (OLD.caixa_aberto IS DISTINCT FROM NEW.caixa_aberto)
+        EXECUTE FUNCTION pos_notify_localvenda()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_localvenda_notify ON pos_localvenda")
+    op.execute("DROP TRIGGER IF EXISTS trg_produtolocal_notify ON pos_produtolocal")
+    op.execute("DROP FUNCTION IF EXISTS pos_notify_localvenda()")
+    op.execute("DROP FUNCTION IF EXISTS pos_notify_produtolocal()")
@@ -0,0 +1,114 @@
+"""core_auditlog particionada por mês em created_at.
+
+A tabela legada é renomeada, os dados são copiados para a nova tabela
+particionada (uma partição por mês, do registro mais antigo até 3 meses à
+frente) e a antiga é descartada. A criação das partições futuras e a retenção
+ficam com `AuditLogService.manter_particoes` (startup + diário e
+scripts/auditlog_particoes.py).
+
+Em bases com muitos milhões de linhas a cópia leva alguns minutos e segura a
+tabela legada; rode fora do horário de evento.
+
+Revision ID: 0018_auditlog_particionada
+Revises: 0017_pos_notify_eventos
+"""
+
+from alembic import op
+
+revision = "0018_auditlog_particionada"
+down_revision = "0017_pos_notify_eventos"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE core_auditlog RENAME TO core_auditlog_legado")
+    op.execute("CREATE SEQUENCE core_auditlog_part_id_seq")
+    op.execute(
+        "SELECT setval('core_auditlog_part_id_seq', "
+        "COALESCE((SELECT max(id) FROM core_auditlog_legado), 0) + 1, false)"
+    )
+    # PK precisa conter a chave de partição
+    op.execute(
+        """
+        CREATE TABLE core_auditlog (
+            id bigint NOT NULL DEFAULT nextval('core_auditlog_part_id_seq'),
+            user_id bigint NULL REFERENCES auth_user (id),
+            method varchar(10) NOT NULL,
+            path varchar(2048) NOT NULL,
+            view_name varchar(255) NOT NULL DEFAULT '',
+            status_code smallint NOT NULL,
+            ip_address varchar(39) NULL,
+            user_agent text NOT NULL DEFAULT '',
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE core_auditlog_part_id_seq OWNED BY core_auditlog.id")
+    # Rede de segurança: só recebe linhas se o job de partições deixar de rodar
+    op.execute("CREATE TABLE core_auditlog_padrao PARTITION OF core_auditlog DEFAULT")
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            mes date := date_trunc(
+                'month', COALESCE((SELECT min(created_at) FROM core_auditlog_legado), now()) AT TIME ZONE 'UTC'
+            )::date;
+            ultimo date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date;
+        BEGIN
+            WHILE mes <= ultimo LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF core_auditlog FOR VALUES FROM (%L) TO (%L)',
+                    'core_auditlog_p' || to_char(mes, 'YYYYMM'),
+                    mes::text || ' 00:00:00+00',
+                    (mes + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+                mes := (mes + interval '1 month')::date;
+            END LOOP;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO core_auditlog
+            (id, user_id, method, path, view_name, status_code, ip_address, user_agent, created_at)
+        SELECT id, user_id, method, path, view_name, status_code, ip_address, user_agent,
+               COALESCE(created_at, now())
+        FROM core_auditlog_legado
+        """
+    )
+    op.execute("DROP TABLE core_auditlog_legado")
+
+    # Índices no pai valem para todas as partições, atuais e futuras.
+    # (created_at, id) atende a paginação por keyset sem filtro.
+    op.create_index("ix_auditlog_created_id", "core_auditlog", ["created_at", "id"])
+    op.create_index("ix_auditlog_user_created", "core_auditlog", ["user_id", "created_at", "id"])
+    op.create_index("ix_auditlog_status_created", "core_auditlog", ["status_code", "created_at", "id"])
+    op.execute("ANALYZE core_auditlog")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE core_auditlog RENAME TO core_auditlog_particionada")
+    op.execute(
+        """
+        CREATE TABLE core_auditlog (
+            id bigserial PRIMARY KEY,
+            user_id bigint NULL REFERENCES auth_user (id),
+            method varchar(10) NOT NULL,
+            path varchar(2048) NOT NULL,
+            view_name varchar(255) NOT NULL DEFAULT '',
+            status_code smallint NOT NULL,
+            ip_address varchar(39) NULL,
+            user_agent text NOT NULL DEFAULT '',
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute("INSERT INTO core_auditlog SELECT * FROM core_auditlog_particionada")
+    op.execute(
+        "SELECT setval('core_auditlog_id_seq', COALESCE((SELECT max(id) FROM core_auditlog), 0) + 1, false)"
+    )
+    op.execute("CREATE INDEX core_auditlog_user_id ON core_auditlog (user_id)")
+    op.execute("DROP TABLE core_auditlog_particionada CASCADE")
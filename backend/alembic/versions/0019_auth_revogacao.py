@@ -0,0 +1,63 @@
+"""Revogação de tokens (auth_token_revogado + NOTIFY) e atividade de sessão.
+
+Revision ID: 0019_auth_revogacao
+Revises: 0018_auditlog_particionada
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0019_auth_revogacao"
+down_revision = "0018_auditlog_particionada"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "auth_token_revogado",
+        sa.Column("jti", sa.String(64), primary_key=True),
+        sa.Column("user_id", sa.BigInteger, nullable=True),
+        sa.Column("motivo", sa.String(20), nullable=False),
+        sa.Column("expira_em", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revogado_em", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_token_revogado_expira_em", "auth_token_revogado", ["expira_em"])
+
+    op.create_table(
+        "auth_sessao",
+        sa.Column("sid", sa.String(64), primary_key=True),
+        sa.Column(
+            "user_id", sa.BigInteger, sa.ForeignKey("auth_user.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("criada_em", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("ultima_atividade", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_sessao_ultima_atividade", "auth_sessao", ["ultima_atividade"])
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION auth_notify_revogacao() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('auth_revogacoes', NEW.jti);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_token_revogado_notify
+        AFTER INSERT ON auth_token_revogado
+        FOR EACH ROW EXECUTE FUNCTION auth_notify_revogacao()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_token_revogado_notify ON auth_token_revogado")
+    op.execute("DROP FUNCTION IF EXISTS auth_notify_revogacao()")
+    op.drop_table("auth_sessao")
+    op.drop_table("auth_token_revogado")
@@ -0,0 +1,106 @@
+"""Resumo diário dos lançamentos financeiros, mantido por trigger.
+
+Revision ID: 0020_finance_resumo_diario
+Revises: 0019_auth_revogacao
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0020_finance_resumo_diario"
+down_revision = "0019_auth_revogacao"
+branch_labels = None
+depends_on = None
+
+CHAVE = ("evento_id", "data", "tipo", "categoria_id", "conta_id", "forma_pagamento")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "finance_resumo_diario",
+        sa.Column("evento_id", sa.BigInteger, sa.ForeignKey("core_evento.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("data", sa.Date, nullable=False),
+        sa.Column("tipo", sa.String(10), nullable=False),
+        sa.Column("categoria_id", sa.BigInteger, nullable=False),
+        sa.Column("conta_id", sa.BigInteger, nullable=False),
+        sa.Column("forma_pagamento", sa.String(10), nullable=False),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("quantidade", sa.Integer, nullable=False),
+        sa.PrimaryKeyConstraint(*CHAVE, name="pk_finance_resumo_diario"),
+    )
+
+    # Aplica um delta (+1/-1 lançamento) à linha do resumo; linha zerada é apagada
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION finance_resumo_aplicar(
+            p_evento bigint, p_data date, p_tipo varchar, p_categoria bigint,
+            p_conta bigint, p_forma varchar, p_valor numeric, p_quantidade integer
+        ) RETURNS void
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO finance_resumo_diario AS r
+                (evento_id, data, tipo, categoria_id, conta_id, forma_pagamento, total, quantidade)
+            VALUES (p_evento, p_data, p_tipo, p_categoria, p_conta, p_forma, p_valor, p_quantidade)
+            ON CONFLICT (evento_id, data, tipo, categoria_id, conta_id, forma_pagamento)
+            DO UPDATE SET total = r.total + EXCLUDED.total,
+                          quantidade = r.quantidade + EXCLUDED.quantidade;
+            IF p_quantidade < 0 THEN
+                DELETE FROM finance_resumo_diario
+                 WHERE evento_id = p_evento AND data = p_data AND tipo = p_tipo
+                   AND categoria_id = p_categoria AND conta_id = p_conta
+                   AND forma_pagamento = p_forma AND quantidade = 0;
+            END IF;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION finance_resumo_lancamento() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM finance_resumo_aplicar(
+                    OLD.evento_id, OLD.data, OLD.tipo, OLD.categoria_id,
+                    OLD.conta_id, OLD.forma_pagamento, -OLD.valor, -1
+                );
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM finance_resumo_aplicar(
+                    NEW.evento_id, NEW.data, NEW.tipo, NEW.categoria_id,
+                    NEW.conta_id, NEW.forma_pagamento, NEW.valor, 1
+                );
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_lancamento_resumo
+        AFTER INSERT OR DELETE
+           OR UPDATE OF evento_id, data, tipo, categoria_id, conta_id, forma_pagamento, valor
+        ON finance_lancamentofinanceiro
+        FOR EACH ROW EXECUTE FUNCTION finance_resumo_lancamento()
+        """
+    )
+
+    # Backfill (o mesmo que `python -m scripts.finance_resumo`)
+    op.execute(
+        """
+        INSERT INTO finance_resumo_diario
+            (evento_id, data, tipo, categoria_id, conta_id, forma_pagamento, total, quantidade)
+        SELECT evento_id, data, tipo, categoria_id, conta_id, forma_pagamento, sum(valor), count(*)
+          FROM finance_lancamentofinanceiro
+         GROUP BY evento_id, data, tipo, categoria_id, conta_id, forma_pagamento
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_lancamento_resumo ON finance_lancamentofinanceiro")
+    op.execute("DROP FUNCTION IF EXISTS finance_resumo_lancamento()")
+    op.execute("DROP FUNCTION IF EXISTS finance_resumo_aplicar(bigint, date, varchar, bigint, bigint, varchar, numeric, integer)")
+    op.drop_table("finance_resumo_diario")
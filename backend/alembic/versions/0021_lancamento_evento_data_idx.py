@@ -0,0 +1,34 @@
+"""Índice (evento_id, data, tipo) para relatórios e listagens por período.
+
+Revision ID: 0021_lancamento_evento_data_idx
+Revises: 0020_finance_resumo_diario
+"""
+
+from alembic import op
+
+revision = "0021_lancamento_evento_data_idx"
+down_revision = "0020_finance_resumo_diario"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY não roda dentro de transação e não bloqueia os lançamentos em andamento.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_lancamento_evento_data_tipo",
+            "finance_lancamentofinanceiro",
+            ["evento_id", "data", "tipo"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_lancamento_evento_data_tipo",
+            table_name="finance_lancamentofinanceiro",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
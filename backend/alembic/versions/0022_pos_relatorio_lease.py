@@ -0,0 +1,62 @@
+"""Prazo de reivindicação do PDF de turno e vínculo lançamento → turno.
+
+Revision ID: 0022_pos_relatorio_lease
+Revises: 0021_lancamento_evento_data_idx
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0022_pos_relatorio_lease"
+down_revision = "0021_lancamento_evento_data_idx"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "pos_turnocaixa",
+        sa.Column("relatorio_reivindicado_em", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "finance_lancamentofinanceiro",
+        sa.Column(
+            "turno_caixa_id",
+            sa.BigInteger(),
+            sa.ForeignKey("pos_turnocaixa.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_lancamento_turno_caixa",
+        "finance_lancamentofinanceiro",
+        ["turno_caixa_id"],
+        postgresql_where=sa.text("turno_caixa_id IS NOT NULL"),
+    )
+    # Consolidações gravadas antes do vínculo: descrição "... — Turno: #<id> — Forma: ..."
+    op.execute(
+        """
+        UPDATE finance_lancamentofinanceiro AS l
+           SET turno_caixa_id = t.id
+          FROM pos_turnocaixa AS t
+         WHERE l.setor_origem = 'pos'
+           AND l.turno_caixa_id IS NULL
+           AND l.descricao LIKE 'Consolidação Fechamento Caixa % — Turno: #' || t.id || ' — %'
+        """
+    )
+    # Anexos que apontam para um PDF que nunca foi gerado; voltam quando o relatório ficar PRONTO
+    op.execute(
+        """
+        DELETE FROM finance_anexolancamento AS a
+         USING pos_turnocaixa AS t
+         WHERE a.arquivo = 'pos/fechamento_' || t.id || '.pdf'
+           AND t.relatorio_status IS DISTINCT FROM 'PRONTO'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lancamento_turno_caixa", table_name="finance_lancamentofinanceiro")
+    op.drop_column("finance_lancamentofinanceiro", "turno_caixa_id")
+    op.drop_column("pos_turnocaixa", "relatorio_reivindicado_em")
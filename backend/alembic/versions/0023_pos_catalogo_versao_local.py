@@ -0,0 +1,122 @@
+"""Versão do catálogo do PDV por local, atribuída sob lock da linha do local.
+
+Com nextval a versão era tirada na escrita mas só ficava visível no commit, e
+transações concorrentes comitam fora de ordem: um terminal podia ver a versão
+101 antes de a 100 existir e nunca mais receber a 100 pelo delta. Agora cada
+INSERT/UPDATE de pos_produtolocal incrementa pos_localvenda.catalogo_versao (o
+UPDATE trava a linha do local até o commit), então uma versão só é visível
+depois de todas as menores do mesmo local. Remoções passam a ser marcadas em
+catalogo_remocao_versao.
+
+Revision ID: 0023_pos_catalogo_versao_local
+Revises: 0022_pos_relatorio_lease
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0023_pos_catalogo_versao_local"
+down_revision = "0022_pos_relatorio_lease"
+branch_labels = None
+depends_on = None
+
+# Também usados por tests/test_pos_catalogo_concorrencia.py
+FUNCAO_VERSAO = """
+CREATE OR REPLACE FUNCTION pos_produtolocal_bump_versao() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.local_id IS DISTINCT FROM NEW.local_id THEN
+        -- a linha saiu do local antigo: para ele é uma remoção
+        UPDATE pos_localvenda
+           SET catalogo_versao = catalogo_versao + 1,
+               catalogo_remocao_versao = catalogo_versao + 1
+         WHERE id = OLD.local_id;
+    END IF;
+    UPDATE pos_localvenda
+       SET catalogo_versao = catalogo_versao + 1
+     WHERE id = NEW.local_id
+    RETURNING catalogo_versao INTO NEW.versao;
+    NEW.versao := COALESCE(NEW.versao, 0);
+    RETURN NEW;
+END
+$$
+"""
+
+FUNCAO_REMOCAO = """
+CREATE OR REPLACE FUNCTION pos_produtolocal_remocao_versao() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE pos_localvenda
+       SET catalogo_versao = catalogo_versao + 1,
+           catalogo_remocao_versao = catalogo_versao + 1
+     WHERE id = OLD.local_id;
+    RETURN OLD;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "pos_localvenda",
+        sa.Column("catalogo_remocao_versao", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Os valores antigos vieram de uma sequência global: o contador do local parte do maior deles.
+    op.execute(
+        """
+        UPDATE pos_localvenda AS l
+           SET catalogo_remocao_versao = l.catalogo_versao,
+               catalogo_versao = GREATEST(
+                   l.catalogo_versao,
+                   COALESCE((SELECT max(p.versao) FROM pos_produtolocal AS p WHERE p.local_id = l.id), 0)
+               )
+        """
+    )
+    op.execute(FUNCAO_VERSAO)
+    op.execute(FUNCAO_REMOCAO)
+    op.alter_column("pos_produtolocal", "versao", server_default="0")
+    op.execute("DROP SEQUENCE IF EXISTS pos_catalogo_versao_seq")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        DO $$
+        DECLARE inicio bigint;
+        BEGIN
+            SELECT COALESCE(max(catalogo_versao), 0) + 1 INTO inicio FROM pos_localvenda;
+            EXECUTE format('CREATE SEQUENCE pos_catalogo_versao_seq START %s', inicio);
+        END
+        $$
+        """
+    )
+    op.alter_column(
+        "pos_produtolocal", "versao", server_default=sa.text("nextval('pos_catalogo_versao_seq')")
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_produtolocal_bump_versao() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.versao := nextval('pos_catalogo_versao_seq');
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_produtolocal_remocao_versao() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE pos_localvenda
+               SET catalogo_versao = nextval('pos_catalogo_versao_seq')
+             WHERE id = OLD.local_id;
+            RETURN OLD;
+        END
+        $$
+        """
+    )
+    op.execute("UPDATE pos_localvenda SET catalogo_versao = catalogo_remocao_versao")
+    op.drop_column("pos_localvenda", "catalogo_remocao_versao")
@@ -0,0 +1,80 @@
+"""NOTIFY pos_eventos também na inclusão e remoção de produtos do local.
+
+Revision ID: 0024_pos_notify_insercao
+Revises: 0023_pos_catalogo_versao_local
+"""
+
+from alembic import op
+
+revision = "0024_pos_notify_insercao"
+down_revision = "0023_pos_catalogo_versao_local"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # `operacao` diz ao terminal se precisa buscar o catálogo (INSERT: nome/família
+    # não vêm no evento; DELETE: remove o item). Remoção não leva `versao`: a da
+    # linha apagada é antiga e viraria um id SSE fora de ordem.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_notify_produtolocal() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            linha pos_produtolocal%ROWTYPE;
+            evento jsonb;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                linha := OLD;
+            ELSE
+                linha := NEW;
+            END IF;
+            evento := jsonb_build_object(
+                'tipo', 'produto',
+                'operacao', TG_OP,
+                'local_id', linha.local_id,
+                'id', linha.id,
+                'estoque_atual', linha.estoque_atual,
+                'preco_venda', linha.preco_venda,
+                'ativo', linha.ativo,
+                'versao', linha.versao
+            );
+            IF TG_OP = 'DELETE' THEN
+                evento := evento - 'versao';
+            END IF;
+            PERFORM pg_notify('pos_eventos', evento::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_produtolocal_notify_inclusao
+        AFTER INSERT OR DELETE ON pos_produtolocal
+        FOR EACH ROW EXECUTE FUNCTION pos_notify_produtolocal()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_produtolocal_notify_inclusao ON pos_produtolocal")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pos_notify_produtolocal() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('pos_eventos', json_build_object(
+                'tipo', 'produto',
+                'local_id', NEW.local_id,
+                'id', NEW.id,
+                'estoque_atual', NEW.estoque_atual,
+                'preco_venda', NEW.preco_venda,
+                'ativo', NEW.ativo,
+                'versao', NEW.versao
+            )::text);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
@@ -2,24 +2,31 @@
 
 from __future__ import annotations
 
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.jwt import InvalidTokenError, decode_token
-from app.auth.scopes import groups_to_scopes
-from app.core.models import User
+from app.auth.jwt import InvalidTokenError
+from app.auth.principal import Principal, carregar_principal
+from app.auth.revogacao import rastreador_atividade, revogacoes
+from app.auth.services import SessaoService
+from app.auth.verificacao import verificar_access_token
 from app.db.session import get_session
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
+async def get_token_payload(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
-    session: Annotated[AsyncSession, Depends(get_session)],
-) -> User:
+) -> dict[str, Any]:
+    """Decodifica o access token uma vez por request.
+
+    O FastAPI guarda o resultado da dependency durante a request, então
+    `get_current_user` e `require_scopes` recebem o mesmo payload. Entre
+    requests o token verificado fica memorizado (app/auth/verificacao.py).
+    """
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,7 +35,7 @@ async def get_current_user(
         )
 
     try:
-        payload = decode_token(credentials.credentials)
+        payload = verificar_access_token(credentials.credentials)
     except InvalidTokenError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,7 +45,17 @@ async def get_current_user(
 
     if payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="Tipo de token inesperado")
+    return payload
+
+
+TokenPayload = Annotated[dict[str, Any], Depends(get_token_payload)]
+
 
+async def get_current_user(
+    request: Request,
+    payload: TokenPayload,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Principal:
     sub = payload.get("sub")
     if not sub:
         raise HTTPException(status_code=401, detail="Token sem subject")
@@ -47,14 +64,29 @@ async def get_current_user(
     except (TypeError, ValueError) as exc:
         raise HTTPException(status_code=401, detail="subject inválido") from exc
 
-    user = await session.get(User, user_id)
+    # filtro de Bloom em memória; o banco só confirma quando o filtro diz "talvez"
+    jti = payload.get("jti")
+    if jti and revogacoes.talvez_revogado(jti) and await SessaoService.revogado(session, jti):
+        raise HTTPException(
+            status_code=401,
+            detail="Token revogado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # cache por worker (app/auth/principal.py): no caminho comum, zero consultas
+    user = await carregar_principal(session, user_id)
     if user is None or not user.is_active:
         raise HTTPException(status_code=401, detail="Usuário inexistente ou inativo")
 
+    # lido pelo AuditLogMiddleware
+    request.state.user_id = user.id
+    sid = payload.get("sid")
+    if sid:
+        rastreador_atividade.registrar(sid)
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
 def require_scopes(*required: str):
@@ -63,20 +95,13 @@ def require_scopes(*required: str):
     Superuser bypassa (já vem com scopes administrativos no JWT).
     """
 
-    async def _checker(
-        user: CurrentUser,
-        credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
-    ) -> User:
-        scopes: list[str] = []
-        if credentials is not None:
-            try:
-                payload = decode_token(credentials.credentials)
-                scopes = payload.get("scopes", [])
-            except InvalidTokenError:
-                scopes = []
+    exigidos = frozenset(required)
+
+    async def _checker(user: CurrentUser, payload: TokenPayload) -> Principal:
         if user.is_superuser:
             return user
-        missing = set(required) - set(scopes)
+        # payload["scopes"] já vem como frozenset (lista antiga ou bitmask `sc`)
+        missing = exigidos - payload["scopes"]
         if missing:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -101,7 +126,7 @@ async def require_admin_or_responsavel(
     evento_id: int,
     user: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_session)],
-) -> User:
+) -> Principal:
     from app.core.models import Evento
 
     evento = await session.get(Evento, evento_id)
@@ -113,9 +138,7 @@ async def require_admin_or_responsavel(
     if evento.responsavel_geral_id == user.id:
         return user
 
-    from app.core.services import UserService
-    scopes = await UserService.get_scopes(session, user.id)
-    if "admin:write" in scopes or "core:write" in scopes:
+    if "admin:write" in user.scopes or "core:write" in user.scopes:
         return user
 
     raise HTTPException(
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from jose import JWTError, jwt
 
+from app.auth.scopes import scopes_para_mascara
 from app.config import settings
 
 
@@ -14,6 +16,11 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def novo_jti() -> str:
+    """Id aleatório do token (e da sessão, `sid`) - chave da revogação."""
+    return secrets.token_urlsafe(16)
+
+
 def create_access_token(
     subject: int,
     *,
@@ -21,33 +28,62 @@ def create_access_token(
     groups: list[str] | None = None,
     scopes: list[str] | None = None,
     evento_id: int | None = None,
+    sessao: str | None = None,
     extra: dict[str, Any] | None = None,
 ) -> str:
     now = _now()
     payload: dict[str, Any] = {
         "sub": str(subject),
+        "jti": novo_jti(),
         "iat": now,
         "exp": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
         "type": "access",
         "superuser": is_superuser,
-        "groups": groups or [],
-        "scopes": scopes or [],
         "evento_id": evento_id,
         "last_activity": int(now.timestamp()),
     }
+    if sessao is not None:
+        payload["sid"] = sessao
+    if settings.JWT_SCOPES_COMPACTOS:
+        # grupos não são lidos do token por ninguém; scopes viram bits (ver SCOPES_BITS)
+        payload["sc"], extras = scopes_para_mascara(scopes or [])
+        if extras:
+            payload["scopes"] = extras
+    else:
+        payload["groups"] = groups or []
+        payload["scopes"] = scopes or []
     if extra:
         payload.update(extra)
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
-def create_refresh_token(subject: int) -> str:
+def create_refresh_token(subject: int, *, sessao: str | None = None) -> str:
     now = _now()
     payload = {
         "sub": str(subject),
+        "jti": novo_jti(),
         "iat": now,
         "exp": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
         "type": "refresh",
     }
+    if sessao is not None:
+        payload["sid"] = sessao
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def create_stream_ticket(subject: int, *, local_id: int, sessao: str | None = None) -> str:
+    """Ticket curto para abrir /pos/stream com EventSource, que não envia Authorization."""
+    now = _now()
+    payload: dict[str, Any] = {
+        "sub": str(subject),
+        "jti": novo_jti(),
+        "iat": now,
+        "exp": now + timedelta(seconds=settings.POS_STREAM_TICKET_SEGUNDOS),
+        "type": "pos_stream",
+        "local_id": local_id,
+    }
+    if sessao is not None:
+        payload["sid"] = sessao
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
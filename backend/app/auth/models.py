@@ -0,0 +1,43 @@
+"""Modelos do módulo auth - revogação de tokens e atividade das sessões."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TokenRevogado(Base):
+    """`jti` de access/refresh token invalidado antes do `exp`.
+
+    Cada INSERT dispara NOTIFY auth_revogacoes (migração 0019); os workers
+    espelham a tabela num filtro de Bloom (app/auth/revogacao.py).
+    """
+
+    __tablename__ = "auth_token_revogado"
+
+    MOTIVO_LOGOUT = "LOGOUT"
+    MOTIVO_ROTACAO = "ROTACAO"
+    MOTIVO_INATIVIDADE = "INATIVIDADE"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    motivo: Mapped[str] = mapped_column(String(20))
+    # depois disso o token já não passa na verificação; a linha pode ser apagada
+    expira_em: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    revogado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class SessaoAtividade(Base):
+    """Uma sessão de login (claim `sid`, mantida na rotação do refresh token)."""
+
+    __tablename__ = "auth_sessao"
+
+    sid: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id", ondelete="CASCADE"))
+    criada_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # gravada em lote pelo RastreadorAtividade, com atraso de até ATIVIDADE_FLUSH_SEGUNDOS
+    ultima_atividade: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -4,16 +4,44 @@ Django armazena no formato:
   pbkdf2_sha256$<iterations>$<salt_b64>$<hash_b64>
 
 Usamos hash manual do Django para verificação e geração (100% compatível).
+
+Com 600k iterações cada hash leva centenas de ms de CPU. Nos handlers async use
+`verify_password_async` / `hash_password_async`: o cálculo roda num pool de
+threads limitado (SENHA_HASH_WORKERS) e o event loop segue atendendo as outras
+requests. `pbkdf2_hmac` solta o GIL, então threads bastam - sem processo nem pickle.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
+import hmac
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
 
 _DJANGO_ITERATIONS = 600_000
 
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.SENHA_HASH_WORKERS, thread_name_prefix="pbkdf2"
+        )
+    return _executor
+
+
+def encerrar_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
 
 def _b64encode(b: bytes) -> str:
     """Base64 encode sem trailing '=' (formato Django)."""
@@ -47,7 +75,7 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
     iterations, salt, expected = parsed
     dk = hashlib.pbkdf2_hmac("sha256", plain.encode("utf-8"), salt, iterations)
-    return dk == expected
+    return hmac.compare_digest(dk, expected)
 
 
 def hash_password(plain: str) -> str:
@@ -55,3 +83,12 @@ def hash_password(plain: str) -> str:
     salt = os.urandom(16)
     dk = hashlib.pbkdf2_hmac("sha256", plain.encode("utf-8"), salt, _DJANGO_ITERATIONS)
     return f"pbkdf2_sha256${_DJANGO_ITERATIONS}${_b64encode(salt)}${_b64encode(dk)}"
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """`verify_password` fora do event loop; no máximo SENHA_HASH_WORKERS por vez."""
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), verify_password, plain, hashed)
+
+
+async def hash_password_async(plain: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), hash_password, plain)
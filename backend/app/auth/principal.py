@@ -0,0 +1,134 @@
+"""Principal autenticado - flags do usuário + scopes resolvidos, com cache por worker.
+
+`get_current_user` só vai ao banco quando o principal não está no cache (3
+consultas: usuário + scopes diretos + scopes via roles). A entrada vale por
+PRINCIPAL_CACHE_TTL_SEGUNDOS e é descartada após o commit de qualquer alteração
+de usuário, papel ou permissão feita pelos routers do core
+(`invalidar_apos_commit`). O cache é por processo: nos outros workers a
+alteração aparece quando o TTL vence.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.models import User
+
+_CHAVE_INVALIDAR = "maanaim_principais_invalidar"
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    username: str
+    is_active: bool
+    is_superuser: bool
+    is_staff: bool
+    scopes: frozenset[str]
+
+
+class PrincipalCache:
+    def __init__(self, *, ttl_segundos: float, tamanho_maximo: int) -> None:
+        self.ttl = ttl_segundos
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: dict[int, tuple[float, Principal]] = {}
+        # muda a cada invalidação; carga que começou antes dela não é guardada
+        self.geracao = 0
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, user_id: int) -> Principal | None:
+        entrada = self._entradas.get(user_id)
+        if entrada is None or entrada[0] <= time.monotonic():
+            self.faltas += 1
+            return None
+        self.acertos += 1
+        return entrada[1]
+
+    def guardar(self, principal: Principal, geracao: int | None = None) -> None:
+        if geracao is not None and geracao != self.geracao:
+            return
+        if len(self._entradas) >= self.tamanho_maximo and principal.id not in self._entradas:
+            # descarta a entrada mais antiga (dict mantém ordem de inserção)
+            self._entradas.pop(next(iter(self._entradas)))
+        self._entradas[principal.id] = (time.monotonic() + self.ttl, principal)
+
+    def invalidar(self, user_id: int | None = None) -> None:
+        """Sem `user_id` limpa tudo (ex.: mudou a lista de permissões de um papel)."""
+        self.geracao += 1
+        if user_id is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(user_id, None)
+
+    def metricas(self) -> dict[str, int]:
+        return {"entradas": len(self._entradas), "acertos": self.acertos, "faltas": self.faltas}
+
+
+principal_cache = PrincipalCache(
+    ttl_segundos=settings.PRINCIPAL_CACHE_TTL_SEGUNDOS,
+    tamanho_maximo=settings.PRINCIPAL_CACHE_MAXIMO,
+)
+
+
+def principal_de(user: User, scopes: list[str]) -> Principal:
+    return Principal(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        is_superuser=user.is_superuser,
+        is_staff=user.is_staff,
+        scopes=frozenset(scopes),
+    )
+
+
+async def carregar_principal(session: AsyncSession, user_id: int) -> Principal | None:
+    """Principal do cache ou do banco; None se o usuário não existe."""
+    principal = principal_cache.obter(user_id)
+    if principal is not None:
+        return principal
+
+    from app.core.services import UserService
+
+    geracao = principal_cache.geracao
+    linha = (
+        await session.execute(
+            select(User.id, User.username, User.is_active, User.is_superuser, User.is_staff).where(
+                User.id == user_id
+            )
+        )
+    ).one_or_none()
+    if linha is None:
+        return None
+    scopes = await UserService.get_scopes(session, user_id)
+    principal = Principal(
+        id=linha.id,
+        username=linha.username,
+        is_active=linha.is_active,
+        is_superuser=linha.is_superuser,
+        is_staff=linha.is_staff,
+        scopes=frozenset(scopes),
+    )
+    principal_cache.guardar(principal, geracao)
+    return principal
+
+
+def invalidar_apos_commit(session: AsyncSession, user_id: int | None = None) -> None:
+    """Agenda a invalidação para depois do commit da sessão.
+
+    Invalidar antes do commit deixaria outra request recarregar o estado antigo
+    e guardá-lo por um TTL inteiro. Em rollback nada é invalidado (nada mudou).
+    """
+    session.info.setdefault(_CHAVE_INVALIDAR, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_pendentes(sessao: Session) -> None:
+    for user_id in sessao.info.pop(_CHAVE_INVALIDAR, ()):
+        principal_cache.invalidar(user_id)
@@ -0,0 +1,207 @@
+"""Revogação de tokens e rastreio de atividade, sem consulta ao banco por request.
+
+Revogação: cada worker espelha `auth_token_revogado` num filtro de Bloom em
+memória. A carga completa acontece ao conectar o LISTEN e a cada
+REVOGACAO_RECONSTRUIR_SEGUNDOS, o que descarta os `jti` já expirados. No meio
+tempo o NOTIFY auth_revogacoes (trigger da migração 0019) acrescenta cada `jti`
+novo em todos os workers. A checagem por request é só o filtro (~1 µs). O banco
+é consultado apenas quando o filtro diz "talvez": token revogado de fato ou
+falso positivo raro (< 1e-6 com os parâmetros padrão e dezenas de milhares de
+revogações).
+
+Atividade: `RastreadorAtividade.registrar` só grava num dict. Uma task junta os
+`sid` ativos e faz um UPDATE em lote a cada ATIVIDADE_FLUSH_SEGUNDOS. O refresh
+recusa sessões paradas há mais de INACTIVITY_TIMEOUT_SECONDS (o access token
+dura o mesmo tanto, então a sessão morre no próximo refresh).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import time
+from datetime import UTC, datetime
+
+import asyncpg
+from sqlalchemy import DateTime, String, column, func, update, values
+
+from app.auth.models import SessaoAtividade
+from app.config import settings
+from app.db.session import dsn_direta, engine
+
+logger = logging.getLogger("maanaim.auth.revogacao")
+
+CANAL = "auth_revogacoes"
+
+
+class FiltroBloom:
+    """Bloom com hashing duplo sobre um blake2b de 128 bits."""
+
+    def __init__(self, bits: int, hashes: int) -> None:
+        self.bits = bits
+        self.hashes = hashes
+        self._mapa = bytearray((bits + 7) // 8)
+
+    def _posicoes(self, chave: str) -> list[int]:
+        digest = hashlib.blake2b(chave.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def adicionar(self, chave: str) -> None:
+        for pos in self._posicoes(chave):
+            self._mapa[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, chave: str) -> bool:
+        mapa = self._mapa
+        return all(mapa[pos >> 3] >> (pos & 7) & 1 for pos in self._posicoes(chave))
+
+
+class Revogacoes:
+    """Filtro de Bloom dos `jti` revogados, mantido via LISTEN auth_revogacoes."""
+
+    RECONEXAO_SEGUNDOS = 5
+
+    def __init__(self, *, bits: int, hashes: int, reconstruir_segundos: float) -> None:
+        self.bits = bits
+        self.hashes = hashes
+        self.reconstruir_segundos = reconstruir_segundos
+        self.filtro = FiltroBloom(bits, hashes)
+        # jti notificados durante uma recarga: entram também no filtro novo
+        self._durante_recarga: set[str] | None = None
+        self._tarefa: asyncio.Task | None = None
+        self.carregados = 0
+        self.notificados = 0
+
+    def talvez_revogado(self, jti: str) -> bool:
+        return jti in self.filtro
+
+    def adicionar(self, jti: str) -> None:
+        self.filtro.adicionar(jti)
+        if self._durante_recarga is not None:
+            self._durante_recarga.add(jti)
+
+    def _ao_notificar(self, _conn, _pid, _canal, jti: str) -> None:
+        self.notificados += 1
+        self.adicionar(jti)
+
+    async def _recarregar(self, conn: asyncpg.Connection) -> None:
+        self._durante_recarga = set()
+        try:
+            await conn.execute("DELETE FROM auth_token_revogado WHERE expira_em < now()")
+            # sessão parada além do timeout já seria recusada no refresh
+            await conn.execute(
+                "DELETE FROM auth_sessao WHERE ultima_atividade < now() - make_interval(secs => $1)",
+                settings.INACTIVITY_TIMEOUT_SECONDS,
+            )
+            linhas = await conn.fetch("SELECT jti FROM auth_token_revogado")
+            filtro = FiltroBloom(self.bits, self.hashes)
+            for linha in linhas:
+                filtro.adicionar(linha["jti"])
+            for jti in self._durante_recarga:
+                filtro.adicionar(jti)
+            self.filtro = filtro
+            self.carregados = len(linhas)
+        finally:
+            self._durante_recarga = None
+
+    async def _escutar(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn_direta())
+                # LISTEN antes da carga: nada revogado no intervalo se perde
+                await conn.add_listener(CANAL, self._ao_notificar)
+                fechada = asyncio.Event()
+                conn.add_termination_listener(lambda _c, fechada=fechada: fechada.set())
+                while not fechada.is_set():
+                    await self._recarregar(conn)
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(fechada.wait(), self.reconstruir_segundos)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Conexão LISTEN %s falhou; reconectando", CANAL)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.RECONEXAO_SEGUNDOS)
+
+    def iniciar(self) -> None:
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.get_running_loop().create_task(self._escutar())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._tarefa
+            self._tarefa = None
+
+    def metricas(self) -> dict[str, int]:
+        return {"carregados": self.carregados, "notificados": self.notificados}
+
+
+class RastreadorAtividade:
+    """Última atividade por sessão (`sid`), gravada em lote em auth_sessao."""
+
+    def __init__(self, *, intervalo_segundos: float) -> None:
+        self.intervalo = intervalo_segundos
+        self._pendentes: dict[str, float] = {}
+        self._tarefa: asyncio.Task | None = None
+
+    def registrar(self, sid: str) -> None:
+        self._pendentes[sid] = time.time()
+
+    def ultima_local(self, sid: str) -> float | None:
+        """Atividade vista por este worker e ainda não gravada no banco."""
+        return self._pendentes.get(sid)
+
+    async def descarregar(self) -> None:
+        pendentes, self._pendentes = self._pendentes, {}
+        if not pendentes:
+            return
+        # um UPDATE ... FROM (VALUES ...) por rodada; a linha da sessão nasce no login
+        lote = values(
+            column("sid", String), column("visto", DateTime(timezone=True)), name="lote"
+        ).data([(sid, datetime.fromtimestamp(visto, UTC)) for sid, visto in pendentes.items()])
+        stmt = (
+            update(SessaoAtividade)
+            .where(SessaoAtividade.sid == lote.c.sid)
+            .values(ultima_atividade=func.greatest(SessaoAtividade.ultima_atividade, lote.c.visto))
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(stmt)
+        except Exception:
+            logger.exception("Falha gravando atividade de %d sessões", len(pendentes))
+            # devolve para a próxima rodada sem sobrescrever o que chegou depois
+            for sid, valor in pendentes.items():
+                self._pendentes.setdefault(sid, valor)
+
+    async def _periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo)
+            await self.descarregar()
+
+    def iniciar(self) -> None:
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.get_running_loop().create_task(self._periodicamente())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._tarefa
+            self._tarefa = None
+        await self.descarregar()
+
+
+revogacoes = Revogacoes(
+    bits=settings.REVOGACAO_BLOOM_BITS,
+    hashes=settings.REVOGACAO_BLOOM_HASHES,
+    reconstruir_segundos=settings.REVOGACAO_RECONSTRUIR_SEGUNDOS,
+)
+rastreador_atividade = RastreadorAtividade(intervalo_segundos=settings.ATIVIDADE_FLUSH_SEGUNDOS)
@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+from collections.abc import Collection
 from typing import Annotated
 
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.auth.dependencies import CurrentUser, get_current_user
+from app.auth.dependencies import CurrentUser, bearer_scheme, get_current_user
 from app.auth.jwt import InvalidTokenError, create_access_token, create_refresh_token, decode_token
-from app.auth.passwords import verify_password
+from app.auth.models import TokenRevogado
+from app.auth.passwords import verify_password_async
+from app.auth.principal import principal_cache, principal_de
 from app.auth.schemas import GroupOut, LoginIn, MeOut, RefreshOut, TokenOut, UserOut
+from app.auth.services import SessaoService
 from app.core.services import UserService
 from app.config import settings
 from app.core.models import User
@@ -39,10 +45,12 @@ def _clear_refresh_cookie(response: Response) -> None:
     response.delete_cookie(key=REFRESH_COOKIE, path=REFRESH_PATH)
 
 
-async def _user_to_out(user: User, session: AsyncSession) -> UserOut:
+async def _user_to_out(
+    user: User, session: AsyncSession, scopes: Collection[str] | None = None
+) -> UserOut:
     from app.core.services import UserService
     groups = [GroupOut(id=g.id, name=g.name) for g in user.groups]
-    scopes = await UserService.get_scopes(session, user.id)
+    scopes = sorted(scopes) if scopes is not None else await UserService.get_scopes(session, user.id)
     return UserOut(
         id=user.id,
         username=user.username,
@@ -62,9 +70,13 @@ async def login(
     response: Response,
     session: Annotated[AsyncSession, Depends(get_session)],
 ) -> TokenOut:
-    stmt = select(User).where(User.username == payload.username)
+    stmt = select(User).options(selectinload(User.groups)).where(User.username == payload.username)
     user = (await session.execute(stmt)).scalar_one_or_none()
-    if user is None or not verify_password(payload.password, user.password):
+    # Encerra a transação antes do PBKDF2 (centenas de ms): a conexão volta ao pool
+    # e a próxima consulta pega outra. Numa troca de turno os logins simultâneos
+    # esperariam o hash segurando conexões e esgotariam o pool para o resto da API.
+    await session.commit()
+    if user is None or not await verify_password_async(payload.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha inválidos",
@@ -73,20 +85,24 @@ async def login(
         raise HTTPException(status_code=403, detail="Usuário inativo")
 
     scopes = await UserService.get_scopes(session, user.id)
+    # já temos tudo em mãos: as próximas requests do usuário não vão ao banco
+    principal_cache.guardar(principal_de(user, scopes))
+    sid = await SessaoService.abrir(session, user.id)
     access = create_access_token(
         subject=user.id,
         is_superuser=user.is_superuser,
         groups=[g.name for g in user.groups],
         scopes=scopes,
         evento_id=None,
+        sessao=sid,
     )
-    refresh = create_refresh_token(user.id)
+    refresh = create_refresh_token(user.id, sessao=sid)
     _set_refresh_cookie(response, refresh)
 
     return TokenOut(
         access_token=access,
         token_type="bearer",
-        user=await _user_to_out(user, session),
+        user=await _user_to_out(user, session, scopes),
         expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
     )
 
@@ -112,21 +128,41 @@ async def refresh(
     except (KeyError, TypeError, ValueError) as exc:
         raise HTTPException(status_code=401, detail="Token malformado") from exc
 
-    user = await session.get(User, user_id)
+    # refresh é raro: consulta exata no banco, sem passar pelo filtro
+    jti = payload.get("jti")
+    if jti and await SessaoService.revogado(session, jti):
+        _clear_refresh_cookie(response)
+        raise HTTPException(status_code=401, detail="Refresh token revogado")
+
+    sid = payload.get("sid")
+    if sid and await SessaoService.inativa(session, sid):
+        await SessaoService.revogar(session, payload, TokenRevogado.MOTIVO_INATIVIDADE)
+        # o 401 abaixo faria rollback da revogação
+        await session.commit()
+        _clear_refresh_cookie(response)
+        raise HTTPException(status_code=401, detail="Sessão expirada por inatividade")
+
+    user = await session.get(User, user_id, options=[selectinload(User.groups)])
     if user is None or not user.is_active:
         _clear_refresh_cookie(response)
         raise HTTPException(status_code=401, detail="Usuário não encontrado")
 
+    if not sid:
+        # refresh emitido antes das sessões existirem
+        sid = await SessaoService.abrir(session, user.id)
     scopes = await UserService.get_scopes(session, user.id)
+    principal_cache.guardar(principal_de(user, scopes))
     access = create_access_token(
         subject=user.id,
         is_superuser=user.is_superuser,
         groups=[g.name for g in user.groups],
         scopes=scopes,
         evento_id=None,
+        sessao=sid,
     )
-    # rotaciona refresh token (sliding)
-    new_refresh = create_refresh_token(user.id)
+    # rotaciona refresh token (sliding); o anterior não pode ser reutilizado
+    await SessaoService.revogar(session, payload, TokenRevogado.MOTIVO_ROTACAO)
+    new_refresh = create_refresh_token(user.id, sessao=sid)
     _set_refresh_cookie(response, new_refresh)
 
     return RefreshOut(
@@ -141,10 +177,31 @@ async def me(
     current: CurrentUser,
     session: Annotated[AsyncSession, Depends(get_session)],
 ) -> MeOut:
-    return MeOut(**(await _user_to_out(current, session)).model_dump())
+    # CurrentUser é o principal em cache; o perfil completo (com grupos) vem do banco
+    user = await session.get(User, current.id, options=[selectinload(User.groups)])
+    if user is None:
+        raise HTTPException(status_code=401, detail="Usuário inexistente ou inativo")
+    return MeOut(**(await _user_to_out(user, session, current.scopes)).model_dump())
 
 
 @router.post("/logout", status_code=204)
-async def logout(response: Response) -> None:
+async def logout(
+    response: Response,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)] = None,
+    refresh_token: Annotated[str | None, Cookie(alias=REFRESH_COOKIE)] = None,
+) -> None:
+    # revoga o que vier (access no header, refresh no cookie); token inválido já não vale nada
+    for token in (credentials.credentials if credentials else None, refresh_token):
+        if not token:
+            continue
+        try:
+            payload = decode_token(token)
+        except InvalidTokenError:
+            continue
+        await SessaoService.revogar(session, payload, TokenRevogado.MOTIVO_LOGOUT)
+        if payload.get("sid"):
+            # o cookie do refresh só vai para REFRESH_PATH; encerrar a sessão derruba ele também
+            await SessaoService.encerrar(session, payload["sid"])
     _clear_refresh_cookie(response)
     return None
\ No newline at end of file
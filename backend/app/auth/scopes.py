@@ -61,4 +61,34 @@ def groups_to_scopes(groups: list[str], is_superuser: bool = False) -> list[str]
             scopes.add(f"{module}:read")
     # todo usuário autenticado pode ler core
     scopes.add("core:read")
-    return sorted(scopes)
\ No newline at end of file
+    return sorted(scopes)
+
+# Bit de cada scope na claim compacta `sc` do access token. Só acrescente no
+# final: mudar a posição de um scope muda o significado de tokens já emitidos.
+SCOPES_BITS: tuple[str, ...] = (
+    "core:read", "core:write",
+    "finance:read", "finance:write",
+    "inventory:read", "inventory:write",
+    "lodging:read", "lodging:write",
+    "pos:read", "pos:write",
+    "admin:read", "admin:write",
+    "reports:read", "reports:write",
+)
+_BIT_DO_SCOPE = {scope: 1 << i for i, scope in enumerate(SCOPES_BITS)}
+
+
+def scopes_para_mascara(scopes: list[str]) -> tuple[int, list[str]]:
+    """(máscara dos scopes conhecidos, scopes fora de SCOPES_BITS)."""
+    mascara = 0
+    extras: list[str] = []
+    for scope in scopes:
+        bit = _BIT_DO_SCOPE.get(scope)
+        if bit is None:
+            extras.append(scope)
+        else:
+            mascara |= bit
+    return mascara, extras
+
+
+def mascara_para_scopes(mascara: int) -> list[str]:
+    return [scope for i, scope in enumerate(SCOPES_BITS) if mascara >> i & 1]
@@ -0,0 +1,78 @@
+"""Serviços do módulo auth - sessões de login e revogação de tokens."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.jwt import novo_jti
+from app.auth.models import SessaoAtividade, TokenRevogado
+from app.auth.revogacao import rastreador_atividade, revogacoes
+from app.config import settings
+
+
+class SessaoService:
+    @staticmethod
+    async def abrir(session: AsyncSession, user_id: int) -> str:
+        """Registra uma sessão de login e devolve o `sid` que vai nos tokens."""
+        sid = novo_jti()
+        session.add(SessaoAtividade(sid=sid, user_id=user_id))
+        await session.flush()
+        return sid
+
+    @staticmethod
+    async def encerrar(session: AsyncSession, sid: str) -> None:
+        """Logout: sem a linha da sessão o próximo refresh com este `sid` é recusado."""
+        await session.execute(delete(SessaoAtividade).where(SessaoAtividade.sid == sid))
+
+    @staticmethod
+    async def revogar(session: AsyncSession, payload: dict[str, Any], motivo: str) -> None:
+        """Invalida o token até o `exp` dele.
+
+        O filtro deste worker é atualizado na hora; os demais recebem o `jti`
+        pelo NOTIFY quando a transação for confirmada.
+        """
+        jti = payload.get("jti")
+        if not jti:
+            # token emitido antes da revogação existir: expira sozinho
+            return
+        try:
+            user_id = int(payload["sub"])
+        except (KeyError, TypeError, ValueError):
+            user_id = None
+        exp = payload.get("exp")
+        expira_em = (
+            datetime.fromtimestamp(exp, UTC)
+            if isinstance(exp, (int, float))
+            else datetime.now(UTC)
+        )
+        await session.execute(
+            pg_insert(TokenRevogado)
+            .values(jti=jti, user_id=user_id, motivo=motivo, expira_em=expira_em)
+            .on_conflict_do_nothing(index_elements=[TokenRevogado.jti])
+        )
+        revogacoes.adicionar(jti)
+
+    @staticmethod
+    async def revogado(session: AsyncSession, jti: str) -> bool:
+        """Confirmação exata no banco, usada só quando o filtro diz "talvez"."""
+        stmt = select(TokenRevogado.jti).where(TokenRevogado.jti == jti)
+        return (await session.execute(stmt)).scalar_one_or_none() is not None
+
+    @staticmethod
+    async def inativa(session: AsyncSession, sid: str) -> bool:
+        """Sessão sem atividade há mais de INACTIVITY_TIMEOUT_SECONDS (ou inexistente)."""
+        ultima = await session.scalar(
+            select(SessaoAtividade.ultima_atividade).where(SessaoAtividade.sid == sid)
+        )
+        if ultima is None:
+            return True
+        visto = ultima.timestamp()
+        local = rastreador_atividade.ultima_local(sid)
+        if local is not None:
+            visto = max(visto, local)
+        return datetime.now(UTC).timestamp() - visto > settings.INACTIVITY_TIMEOUT_SECONDS
@@ -0,0 +1,113 @@
+"""Verificação rápida do access token - caminho quente de toda request autenticada.
+
+- A chave HMAC é preparada uma vez (`hmac.new(...)` + `.copy()` por token), sem
+  passar pelo python-jose (que refaz o parse da chave e valida claims em Python).
+- Tokens já verificados ficam num LRU por worker, indexado pelo próprio token,
+  até o `exp`: o mesmo token chega várias vezes por minuto do mesmo cliente.
+- A claim `sc` (bitmask, ver SCOPES_BITS) é expandida uma vez e o payload
+  memorizado já traz `scopes` como frozenset.
+
+Só HS256/HS384/HS512; outros algoritmos caem no `decode_token` do jose.
+O payload devolvido é compartilhado entre requests: não altere.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.auth.jwt import InvalidTokenError, decode_token
+from app.auth.scopes import mascara_para_scopes
+from app.config import settings
+
+_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+def _b64decode(segmento: str) -> bytes:
+    return base64.urlsafe_b64decode(segmento + "=" * (-len(segmento) % 4))
+
+
+class VerificadorJWT:
+    def __init__(self, *, segredo: str, algoritmo: str, tamanho_cache: int) -> None:
+        self.algoritmo = algoritmo
+        self.tamanho_cache = tamanho_cache
+        digest = _DIGESTS.get(algoritmo)
+        self._hmac = hmac.new(segredo.encode(), digestmod=digest) if digest is not None else None
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def verificar(self, token: str) -> dict[str, Any]:
+        payload = self._cache.get(token)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                self._cache.move_to_end(token)
+                self.acertos += 1
+                return payload
+            del self._cache[token]
+        self.faltas += 1
+
+        payload = self._decodificar(token)
+        self._cache[token] = payload
+        if len(self._cache) > self.tamanho_cache:
+            self._cache.popitem(last=False)
+        return payload
+
+    def _decodificar(self, token: str) -> dict[str, Any]:
+        if self._hmac is None:
+            payload = decode_token(token)
+        else:
+            try:
+                cabecalho_b64, corpo_b64, assinatura_b64 = token.split(".")
+                cabecalho = json.loads(_b64decode(cabecalho_b64))
+                assinatura = _b64decode(assinatura_b64)
+            except ValueError as exc:  # inclui binascii.Error e JSONDecodeError
+                raise InvalidTokenError("Token malformado") from exc
+            if not isinstance(cabecalho, dict) or cabecalho.get("alg") != self.algoritmo:
+                raise InvalidTokenError("Algoritmo inesperado")
+            mac = self._hmac.copy()
+            mac.update(f"{cabecalho_b64}.{corpo_b64}".encode("ascii"))
+            if not hmac.compare_digest(mac.digest(), assinatura):
+                raise InvalidTokenError("Assinatura inválida")
+            try:
+                payload = json.loads(_b64decode(corpo_b64))
+            except ValueError as exc:
+                raise InvalidTokenError("Token malformado") from exc
+            if not isinstance(payload, dict):
+                raise InvalidTokenError("Token malformado")
+
+        agora = time.time()
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= agora:
+            raise InvalidTokenError("Token expirado")
+        nbf = payload.get("nbf")
+        if isinstance(nbf, (int, float)) and nbf > agora:
+            raise InvalidTokenError("Token ainda não é válido")
+
+        scopes = set(payload.get("scopes") or ())
+        if "sc" in payload:
+            scopes.update(mascara_para_scopes(int(payload["sc"])))
+        payload["scopes"] = frozenset(scopes)
+        return payload
+
+    def limpar(self) -> None:
+        self._cache.clear()
+
+    def metricas(self) -> dict[str, int]:
+        return {"entradas": len(self._cache), "acertos": self.acertos, "faltas": self.faltas}
+
+
+verificador = VerificadorJWT(
+    segredo=settings.JWT_SECRET_KEY,
+    algoritmo=settings.JWT_ALGORITHM,
+    tamanho_cache=settings.JWT_CACHE_MAXIMO,
+)
+
+
+def verificar_access_token(token: str) -> dict[str, Any]:
+    return verificador.verificar(token)
@@ -46,16 +46,16 @@ class User(Base):
     groups: Mapped[list[Group]] = relationship(
         secondary="auth_user_groups",
         back_populates="users",
-        lazy="selectin",
+        lazy="raise",
     )
 
     roles: Mapped[list["Role"]] = relationship(
         secondary="user_role",
-        lazy="selectin",
+        lazy="raise",
     )
 
     user_permissions: Mapped[list["UserPermission"]] = relationship(
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -68,7 +68,7 @@ class Group(Base):
     users: Mapped[list[User]] = relationship(
         secondary="auth_user_groups",
         back_populates="groups",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -125,25 +125,27 @@ class Evento(Base):
     responsavel_geral_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("auth_user.id"), nullable=True
     )
-    responsavel_geral: Mapped[User | None] = relationship(lazy="selectin")
+    responsavel_geral: Mapped[User | None] = relationship(lazy="raise")
 
     centro_custo_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("core_centrocusto.id"), nullable=True
     )
-    centro_custo: Mapped[CentroCusto | None] = relationship(lazy="selectin")
+    centro_custo: Mapped[CentroCusto | None] = relationship(lazy="raise")
 
 
 # --------------------------- core_auditlog ---------------------------
 
 
 class AuditLog(Base):
+    # Particionada por mês em created_at (PK no banco: id, created_at); partições
+    # e retenção em AuditLogService.manter_particoes
     __tablename__ = "core_auditlog"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     user_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("auth_user.id"), nullable=True
     )
-    user: Mapped[User | None] = relationship(lazy="selectin")
+    user: Mapped[User | None] = relationship(lazy="raise")
 
     method: Mapped[str] = mapped_column(String(10))
     path: Mapped[str] = mapped_column(String(2048))
@@ -152,7 +154,7 @@ class AuditLog(Base):
     ip_address: Mapped[str | None] = mapped_column(String(39), nullable=True)
     user_agent: Mapped[str] = mapped_column(Text, default="")
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
 
 
@@ -166,7 +168,7 @@ class ConfiguracaoEvento(Base):
     evento_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("core_evento.id", ondelete="CASCADE"), nullable=False, unique=True
     )
-    evento: Mapped[Evento] = relationship(lazy="selectin")
+    evento: Mapped[Evento] = relationship(lazy="raise")
 
     permite_vendas_pos: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     permite_edicao_estoque_pos: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
@@ -220,7 +222,7 @@ class Role(Base):
 
     permissions: Mapped[list["Permission"]] = relationship(
         secondary="role_permission",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -239,7 +241,7 @@ class UserPermission(Base):
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id", ondelete="CASCADE"), nullable=False)
     permission_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("permission.id", ondelete="CASCADE"), nullable=False)
 
-    permission: Mapped["Permission"] = relationship(lazy="selectin")
+    permission: Mapped["Permission"] = relationship(lazy="raise")
 
 
 class UserRole(Base):
@@ -249,4 +251,4 @@ class UserRole(Base):
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id", ondelete="CASCADE"), nullable=False)
     role_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("role.id", ondelete="CASCADE"), nullable=False)
 
-    role: Mapped["Role"] = relationship(lazy="selectin", overlaps="roles")
\ No newline at end of file
+    role: Mapped["Role"] = relationship(lazy="raise", overlaps="roles")
\ No newline at end of file
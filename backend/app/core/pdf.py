@@ -0,0 +1,83 @@
+"""Pool de processos WeasyPrint compartilhado pelos relatórios em PDF.
+
+Um único ProcessPoolExecutor por worker do uvicorn (RELATORIO_PDF_WORKERS
+processos) atende o fechamento de turno do PDV e o DRE do financeiro. Cada
+processo importa o WeasyPrint e monta a configuração de fontes uma vez, no
+initializer; as folhas de estilo passadas a `folha_de_estilo` são analisadas
+na primeira renderização que as usa e ficam em cache no processo.
+
+Se um processo do pool morre (OOM, crash do WeasyPrint) o executor fica
+quebrado para sempre; `executar` o descarta e a próxima chamada cria outro.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from app.config import settings
+
+_executor: ProcessPoolExecutor | None = None
+
+# Estado de cada processo do pool, preenchido por _inicializar_processo.
+_font_config = None
+
+
+def _inicializar_processo() -> None:
+    """Initializer do pool: import do WeasyPrint e fontes uma vez por processo."""
+    global _font_config
+    from weasyprint.text.fonts import FontConfiguration
+
+    _font_config = FontConfiguration()
+
+
+def font_config():
+    """FontConfiguration do processo atual (no processo filho, a do initializer)."""
+    if _font_config is None:
+        _inicializar_processo()
+    return _font_config
+
+
+@functools.cache
+def folha_de_estilo(css: str):
+    """CSS analisado uma vez por processo e reaproveitado nas renderizações seguintes."""
+    from weasyprint import CSS
+
+    return CSS(string=css, font_config=font_config())
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.RELATORIO_PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_processo,
+        )
+    return _executor
+
+
+def encerrar_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=False)
+        _executor = None
+
+
+async def executar(funcao: Callable[..., Any], *args: Any) -> Any:
+    """Roda `funcao(*args)` num processo do pool, sem bloquear o event loop."""
+    global _executor
+    executor = _get_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, funcao, *args)
+    except BrokenProcessPool:
+        # outra chamada pode já ter trocado o pool; só descarta o que quebrou
+        if _executor is executor:
+            _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
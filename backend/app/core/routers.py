@@ -8,8 +8,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.auth.dependencies import CurrentUser, EventoAtualId, require_admin_or_responsavel, require_scopes
+from app.auth.principal import invalidar_apos_commit
 from app.core import schemas, services
 from app.core.models import Evento
 from app.core.schemas import (
@@ -36,6 +38,7 @@ from app.core.schemas import (
     GroupOut,
     UserPermissionsOut,
 )
+from app.db.paginacao import decode_cursor, encode_cursor
 from app.db.session import get_session
 
 router = APIRouter(prefix="/core", tags=["core"])
@@ -283,6 +286,7 @@ async def user_editar(
     except NoResultFound as exc:
         raise HTTPException(404, "Usuário não encontrado") from exc
     user = await services.UserService.update(session, user, payload.model_dump(exclude_unset=True))
+    invalidar_apos_commit(session, user.id)
     return UserOut.model_validate(user)
 
 
@@ -298,6 +302,7 @@ async def user_deletar(
         raise HTTPException(404, "Usuário não encontrado") from exc
     user.is_active = False
     await session.flush()
+    invalidar_apos_commit(session, user.id)
     return None
 
 
@@ -339,7 +344,7 @@ async def roles_lista(
 ) -> list[RoleOut]:
     from sqlalchemy import select
     from app.core.models import Role
-    result = await session.execute(select(Role).order_by(Role.nome))
+    result = await session.execute(select(Role).options(selectinload(Role.permissions)).order_by(Role.nome))
     return [RoleOut.model_validate(x) for x in result.scalars().all()]
 
 
@@ -410,6 +415,7 @@ async def user_permission_adicionar(
     up = UserPermission(user_id=user_id, permission_id=perm_id)
     session.add(up)
     await session.flush()
+    invalidar_apos_commit(session, user_id)
     return None
 
 
@@ -428,6 +434,7 @@ async def user_permission_remover(
     if up:
         await session.delete(up)
         await session.flush()
+        invalidar_apos_commit(session, user_id)
     return None
 
 
@@ -450,6 +457,7 @@ async def user_role_adicionar(
     ur = UserRole(user_id=user_id, role_id=role_id)
     session.add(ur)
     await session.flush()
+    invalidar_apos_commit(session, user_id)
     return None
 
 
@@ -468,6 +476,7 @@ async def user_role_remover(
     if ur:
         await session.delete(ur)
         await session.flush()
+        invalidar_apos_commit(session, user_id)
     return None
 
 
@@ -488,6 +497,8 @@ async def role_permissions_sync(
     for pid in permission_ids:
         session.add(RolePermission(role_id=role_id, permission_id=pid))
     await session.flush()
+    # afeta todo usuário com o papel
+    invalidar_apos_commit(session)
     return None
 
 
@@ -507,7 +518,14 @@ async def audit_logs_lista(
     status_code: int | None = Query(default=None),
     data_inicio: str | None = Query(default=None),
     data_fim: str | None = Query(default=None),
+    cursor: str | None = Query(default=None, description="next_cursor da página anterior (ignora page)"),
+    incluir_total: bool = Query(default=True, description="Calcula o total exato (COUNT)"),
 ) -> PaginatedAuditLogs:
+    """Auditoria da mais recente para a mais antiga.
+
+    Com `cursor` a paginação é por keyset em (created_at, id), apoiada pelos
+    índices ix_auditlog_*; com filtro de data só as partições do período são lidas.
+    """
     items, total = await services.AuditLogService.list_paginated(
         session,
         page=page,
@@ -517,7 +535,14 @@ async def audit_logs_lista(
         status_code=status_code,
         data_inicio=data_inicio,
         data_fim=data_fim,
+        cursor=decode_cursor(cursor) if cursor is not None else None,
+        incluir_total=incluir_total,
     )
+    items = list(items)
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
     logs_out = []
     for item in items:
         out = AuditLogOut.model_validate(item)
@@ -528,4 +553,5 @@ async def audit_logs_lista(
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
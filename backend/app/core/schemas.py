@@ -136,9 +136,12 @@ class AuditLogOut(BaseModel):
 
 class PaginatedAuditLogs(BaseModel):
     items: list[AuditLogOut]
-    total: int
+    # None quando incluir_total=false
+    total: int | None
     page: int
     page_size: int
+    # Cursor opaco para a próxima página (keyset); None na última página
+    next_cursor: str | None = None
 
 
 class UserSimpleOut(BaseModel):
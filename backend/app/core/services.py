@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
+import logging
+import re
 from collections.abc import Sequence
+from datetime import UTC, date, datetime
 from decimal import Decimal
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text, tuple_
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.core.models import CentroCusto, ConfiguracaoEvento, ConfiguracaoSistema, Evento, User
 from app.core.schemas import EventoCreate, EventoUpdate
 
+logger = logging.getLogger("maanaim.core")
+
 
 class EventoService:
     """Operações sobre Evento (ciclo) - ancora central do sistema."""
@@ -189,7 +194,7 @@ class UserService:
     @staticmethod
     async def list_all(session: AsyncSession) -> Sequence[User]:
         from app.core.models import User
-        stmt = select(User).order_by(User.first_name, User.last_name)
+        stmt = select(User).options(selectinload(User.groups)).order_by(User.first_name, User.last_name)
         result = await session.execute(stmt)
         return result.scalars().all()
 
@@ -203,7 +208,8 @@ class UserService:
     @staticmethod
     async def get(session: AsyncSession, user_id: int) -> User:
         from app.core.models import User
-        user = await session.get(User, user_id)
+        # populate_existing: o usuário pode já estar no identity map (CurrentUser) sem os grupos
+        user = await session.get(User, user_id, options=[selectinload(User.groups)], populate_existing=True)
         if user is None:
             raise NoResultFound(f"User {user_id} não encontrado")
         return user
@@ -238,20 +244,22 @@ class UserService:
     @staticmethod
     async def create(session: AsyncSession, payload: dict) -> User:
         from app.core.models import User, Group
-        from app.auth.passwords import hash_password
+        from app.auth.passwords import hash_password_async
         user = User(
             username=payload["username"],
             first_name=payload.get("first_name", ""),
             last_name=payload.get("last_name", ""),
             email=payload.get("email", ""),
-            password=hash_password(payload["password"]),
+            password=await hash_password_async(payload["password"]),
             is_active=payload.get("is_active", True),
             is_superuser=payload.get("is_superuser", False),
             is_staff=payload.get("is_staff", False),
         )
         if payload.get("group_ids"):
             groups = await session.execute(select(Group).where(Group.id.in_(payload["group_ids"])))
-            user.groups = groups.scalars().all()
+            user.groups = list(groups.scalars().all())
+        else:
+            user.groups = []
         session.add(user)
         await session.flush()
         return user
@@ -270,12 +278,17 @@ class UserService:
 
     @staticmethod
     async def reset_password(session: AsyncSession, user: User, new_password: str) -> None:
-        from app.auth.passwords import hash_password
-        user.password = hash_password(new_password)
+        from app.auth.passwords import hash_password_async
+        user.password = await hash_password_async(new_password)
         await session.flush()
 
 
 class AuditLogService:
+    # core_auditlog é particionada por mês em created_at (migração 0018)
+    PARTICAO_PREFIXO = "core_auditlog_p"
+    PARTICAO_PADRAO = "core_auditlog_padrao"
+    _PARTICAO_RE = re.compile(r"^core_auditlog_p(\d{4})(\d{2})$")
+
     @staticmethod
     async def list_paginated(
         session: AsyncSession,
@@ -286,24 +299,128 @@ class AuditLogService:
         status_code: int | None = None,
         data_inicio: str | None = None,
         data_fim: str | None = None,
-    ) -> tuple[Sequence, int]:
+        cursor: tuple[datetime, int] | None = None,
+        incluir_total: bool = True,
+    ) -> tuple[Sequence, int | None]:
+        """Registros do mais recente para o mais antigo.
+
+        Devolve até `page_size + 1` itens: o excedente indica que há próxima
+        página. Com `cursor` (created_at, id) a busca é por keyset e ignora `page`.
+        """
         from app.core.models import AuditLog
-        base = select(AuditLog)
+        filtros = []
         if user_id is not None:
-            base = base.where(AuditLog.user_id == user_id)
+            filtros.append(AuditLog.user_id == user_id)
         if method is not None:
-            base = base.where(AuditLog.method == method.upper())
+            filtros.append(AuditLog.method == method.upper())
         if status_code is not None:
-            base = base.where(AuditLog.status_code == status_code)
+            filtros.append(AuditLog.status_code == status_code)
         if data_inicio is not None:
-            base = base.where(AuditLog.created_at >= data_inicio)
+            filtros.append(AuditLog.created_at >= data_inicio)
         if data_fim is not None:
-            base = base.where(AuditLog.created_at <= data_fim)
+            filtros.append(AuditLog.created_at <= data_fim)
+
+        total = None
+        if incluir_total:
+            total = (
+                await session.execute(select(func.count()).select_from(AuditLog).where(*filtros))
+            ).scalar() or 0
+
+        stmt = (
+            select(AuditLog)
+            .options(joinedload(AuditLog.user))
+            .where(*filtros)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .limit(page_size + 1)
+        )
+        if cursor is not None:
+            stmt = stmt.where(tuple_(AuditLog.created_at, AuditLog.id) < cursor)
+        else:
+            stmt = stmt.offset((page - 1) * page_size)
+        items = (await session.execute(stmt)).scalars().all()
+        return items, total
+
+    @staticmethod
+    def _mes(ano: int, mes: int) -> date:
+        ano, mes = ano + (mes - 1) // 12, (mes - 1) % 12 + 1
+        return date(ano, mes, 1)
 
-        # count first
-        count_q = select(func.count()).select_from(base.subquery())
-        total = (await session.execute(count_q)).scalar() or 0
+    @staticmethod
+    async def manter_particoes(
+        session: AsyncSession,
+        meses_a_frente: int,
+        retencao_meses: int,
+        hoje: date | None = None,
+    ) -> dict[str, list[str]]:
+        """Cria as partições mensais até `meses_a_frente` e descarta as que
+        terminaram há mais de `retencao_meses`. Idempotente; o advisory lock
+        serializa workers rodando ao mesmo tempo.
+        """
+        hoje = hoje or datetime.now(UTC).date()
+        mes = AuditLogService._mes
+        await session.execute(text("SELECT pg_advisory_xact_lock(hashtext('core_auditlog_particoes'))"))
+
+        existentes = set(
+            (
+                await session.execute(
+                    text(
+                        "SELECT c.relname FROM pg_inherits i "
+                        "JOIN pg_class c ON c.oid = i.inhrelid "
+                        "JOIN pg_class p ON p.oid = i.inhparent "
+                        "WHERE p.relname = 'core_auditlog'"
+                    )
+                )
+            ).scalars()
+        )
 
-        base = base.order_by(AuditLog.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-        items = (await session.execute(base)).scalars().all()
-        return items, total
+        criadas: list[str] = []
+        for deslocamento in range(meses_a_frente + 1):
+            inicio = mes(hoje.year, hoje.month + deslocamento)
+            nome = f"{AuditLogService.PARTICAO_PREFIXO}{inicio:%Y%m}"
+            if nome in existentes:
+                continue
+            fim = mes(inicio.year, inicio.month + 1)
+            limites = f"FROM ('{inicio} 00:00:00+00') TO ('{fim} 00:00:00+00')"
+            no_padrao = (
+                await session.execute(
+                    text(
+                        f"SELECT EXISTS (SELECT 1 FROM {AuditLogService.PARTICAO_PADRAO} "
+                        "WHERE created_at >= :inicio AND created_at < :fim)"
+                    ),
+                    {"inicio": inicio, "fim": fim},
+                )
+            ).scalar()
+            if not no_padrao:
+                await session.execute(
+                    text(f"CREATE TABLE IF NOT EXISTS {nome} PARTITION OF core_auditlog FOR VALUES {limites}")
+                )
+            else:
+                # O job ficou parado e o mês caiu na partição padrão: o CREATE ... PARTITION OF
+                # falharia. A partição nasce avulsa, recebe as linhas do mês e é anexada
+                # (o ATTACH confere que a padrão não tem mais nada no intervalo).
+                await session.execute(
+                    text(f"CREATE TABLE {nome} (LIKE core_auditlog INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                )
+                await session.execute(
+                    text(
+                        f"WITH movidas AS (DELETE FROM {AuditLogService.PARTICAO_PADRAO} "
+                        "WHERE created_at >= :inicio AND created_at < :fim RETURNING *) "
+                        f"INSERT INTO {nome} SELECT * FROM movidas"
+                    ),
+                    {"inicio": inicio, "fim": fim},
+                )
+                await session.execute(text(f"ALTER TABLE core_auditlog ATTACH PARTITION {nome} FOR VALUES {limites}"))
+                logger.warning("Linhas de auditoria movidas da partição padrão para %s", nome)
+            criadas.append(nome)
+
+        # mês corrente + retencao_meses completos anteriores
+        corte = mes(hoje.year, hoje.month - retencao_meses)
+        removidas: list[str] = []
+        for nome in sorted(existentes):
+            encontrado = AuditLogService._PARTICAO_RE.match(nome)
+            if encontrado is None:
+                continue  # partição padrão
+            if date(int(encontrado[1]), int(encontrado[2]), 1) < corte:
+                await session.execute(text(f"DROP TABLE IF EXISTS {nome}"))
+                removidas.append(nome)
+        return {"criadas": criadas, "removidas": removidas}
@@ -6,4 +6,9 @@ from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
-    """Base declarativa comum a todos os módulos."""
\ No newline at end of file
+    """Base declarativa comum a todos os módulos.
+
+    Relacionamentos são declarados com `lazy="raise"`: nada é carregado
+    implicitamente. Cada serviço/endpoint pede o que vai ler com
+    selectinload/joinedload (ver tests/test_planos_carga.py).
+    """
\ No newline at end of file
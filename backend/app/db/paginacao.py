@@ -0,0 +1,27 @@
+"""Cursor opaco da paginação por keyset (timestamp, id), usado pelas listagens longas.
+
+O cursor é `{"d": <isoformat>, "i": <id>}` em base64 url-safe sem padding; a
+consulta continua com `tuple_(coluna_data, id) < decode_cursor(cursor)`.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def encode_cursor(momento: datetime, id_: int) -> str:
+    raw = json.dumps({"d": momento.isoformat(), "i": id_}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(400, "Cursor inválido") from exc
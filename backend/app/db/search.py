@@ -0,0 +1,42 @@
+"""Busca textual de produtos apoiada em pg_trgm + unaccent.
+
+Os índices GIN (migração 0014) são criados sobre a expressão
+`f_unaccent(lower(col1 || ' ' || col2 ...))`; `documento_busca` monta exatamente
+a mesma expressão para que o planner use o índice. O termo é normalizado no
+Python (minúsculas, sem acentos) e casado por substring, como o antigo ILIKE,
+mas agora "acucar" encontra "Açúcar". A relevância vem de word_similarity.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+
+from sqlalchemy import String, func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+# Separador como literal SQL (não bind param): a expressão precisa ser idêntica
+# à do índice, senão o planner volta ao seq scan.
+_SEPARADOR = literal_column("' '", String)
+
+
+def normalizar_termo(termo: str) -> str:
+    """Minúsculas e sem acentos - espelha f_unaccent(lower(...)) no banco."""
+    decomposto = unicodedata.normalize("NFKD", termo.strip().lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def documento_busca(*colunas: ColumnElement[str]) -> ColumnElement[str]:
+    concatenado = colunas[0]
+    for coluna in colunas[1:]:
+        concatenado = concatenado.op("||")(_SEPARADOR).op("||")(coluna)
+    return func.f_unaccent(func.lower(concatenado), type_=String)
+
+
+def filtro_busca(documento: ColumnElement[str], termo: str) -> ColumnElement[bool]:
+    normalizado = normalizar_termo(termo)
+    escapado = normalizado.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return documento.like(f"%{escapado}%", escape="\\")
+
+
+def rank_busca(documento: ColumnElement[str], termo: str) -> ColumnElement[float]:
+    return func.word_similarity(normalizar_termo(termo), documento)
@@ -2,20 +2,114 @@
 
 from __future__ import annotations
 
+import time
+import uuid
 from collections.abc import AsyncIterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
+
+@dataclass
+class EsperaPool:
+    """Tempo de checkout (espera por conexão livre + abertura + pre-ping), por worker."""
+
+    checkouts: int = 0
+    segundos: float = 0.0
+    maximo: float = 0.0
+    lentos: int = 0
+    timeouts: int = 0
+
+    LENTO_SEGUNDOS = 0.010
+
+    def registrar(self, segundos: float) -> None:
+        self.checkouts += 1
+        self.segundos += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+        if segundos >= self.LENTO_SEGUNDOS:
+            self.lentos += 1
+
+
+espera_pool = EsperaPool()
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que mede cada checkout (global e na request atual)."""
+
+    def connect(self):  # type: ignore[override]
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            espera_pool.timeouts += 1
+            raise
+        finally:
+            segundos = time.perf_counter() - inicio
+            espera_pool.registrar(segundos)
+            contagem = contagem_sql.get()
+            if contagem is not None:
+                contagem.espera_pool += segundos
+
+
+def _connect_args() -> dict[str, Any]:
+    if settings.DB_PGBOUNCER:
+        # em modo transaction cada transação pode cair numa conexão de servidor
+        # diferente: nada de cache de prepared statements nem nomes sequenciais
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.is_dev,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    echo=settings.is_dev if settings.DB_ECHO is None else settings.DB_ECHO,
+    poolclass=PoolMedido,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=_connect_args(),
 )
 
+
+def dsn_direta() -> str:
+    """DSN para asyncpg puro (LISTEN/NOTIFY), nunca via PgBouncer em modo transaction."""
+    url = make_url(settings.DATABASE_URL_DIRETA) if settings.DATABASE_URL_DIRETA else engine.url
+    # asyncpg puro não entende o sufixo "+asyncpg" do dialeto SQLAlchemy
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def metricas_pool() -> dict[str, float | int]:
+    pool = engine.pool
+    return {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "abertas": pool.size() + pool.overflow(),
+        "checkouts": espera_pool.checkouts,
+        "espera_media_ms": round(espera_pool.segundos / espera_pool.checkouts * 1000, 2)
+        if espera_pool.checkouts
+        else 0.0,
+        "espera_max_ms": round(espera_pool.maximo * 1000, 2),
+        "checkouts_lentos": espera_pool.lentos,
+        "timeouts": espera_pool.timeouts,
+    }
+
 async_session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
     engine,
     expire_on_commit=False,
@@ -31,4 +125,47 @@ async def get_session() -> AsyncIterator[AsyncSession]:
             await session.commit()
         except Exception:
             await session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+
+# --------------------------- Contagem de SQL por request ---------------------------
+
+
+@dataclass
+class ContagemSQL:
+    statements: int = 0
+    segundos: float = 0.0
+    espera_pool: float = 0.0
+
+
+# Preenchida pelo QueryCounterMiddleware. O greenlet do driver herda o contexto
+# da task do request, então os listeners abaixo enxergam a contagem certa.
+contagem_sql: ContextVar[ContagemSQL | None] = ContextVar("contagem_sql", default=None)
+
+_INICIOS = "maanaim_inicio_sql"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _antes_do_cursor(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    contagem = contagem_sql.get()
+    if contagem is None:
+        return
+    contagem.statements += 1
+    conn.info.setdefault(_INICIOS, []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _depois_do_cursor(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    contagem = contagem_sql.get()
+    inicios = conn.info.get(_INICIOS)
+    if contagem is None or not inicios:
+        return
+    contagem.segundos += time.perf_counter() - inicios.pop()
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _erro_no_cursor(contexto) -> None:
+    # statement que falhou não passa pelo after_cursor_execute
+    inicios = contexto.connection.info.get(_INICIOS) if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
@@ -0,0 +1,73 @@
+"""Exportações em streaming (CSV/NDJSON) do módulo finance.
+
+As linhas chegam de um cursor do servidor (`AsyncSession.stream` com
+`yield_per`) e saem em blocos de LOTE linhas: o worker segura no máximo um
+lote em memória, qualquer que seja o tamanho da exportação.
+
+O cursor roda numa sessão própria (`com_sessao_propria`), aberta quando o
+download começa e fechada junto com o gerador (último bloco ou cliente que
+desistiu). Ela segura uma conexão do pool e uma transação durante todo o download, por isso
+no máximo EXPORTACAO_CONCORRENCIA exportações rodam ao mesmo tempo por worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.session import async_session_factory
+
+LOTE = 500
+BOM = "\ufeff"  # Excel só reconhece UTF-8 no CSV com BOM
+
+_vagas = asyncio.Semaphore(settings.EXPORTACAO_CONCORRENCIA)
+
+
+async def com_sessao_propria(linhas: Callable[[AsyncSession], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """Itera `linhas(sessão)` numa sessão só desta exportação.
+
+    Não depende de quando o FastAPI encerra a sessão da request (get_session):
+    o corpo em streaming tem a própria, que só pega conexão depois de uma vaga.
+    """
+    async with _vagas, async_session_factory() as session:
+        async for linha in linhas(session):
+            yield linha
+
+
+async def csv_em_blocos(
+    linhas: AsyncIterator[Sequence[Any]], *, cabecalho: Sequence[str] | None = None
+) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write(BOM)
+    if cabecalho:
+        writer.writerow(cabecalho)
+    pendentes = 0
+    async for linha in linhas:
+        writer.writerow(linha)
+        pendentes += 1
+        if pendentes == LOTE:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pendentes = 0
+    yield buf.getvalue()
+
+
+async def ndjson_em_blocos(objetos: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    bloco: list[str] = []
+    async for objeto in objetos:
+        # Decimal e date viram string: sem perda de centavos no consumidor
+        bloco.append(json.dumps(objeto, default=str, ensure_ascii=False))
+        if len(bloco) == LOTE:
+            yield "\n".join(bloco) + "\n"
+            bloco.clear()
+    if bloco:
+        yield "\n".join(bloco) + "\n"
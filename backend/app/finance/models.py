@@ -5,6 +5,7 @@ Tabelas:
 - finance_contacaixa
 - finance_lancamentofinanceiro
 - finance_anexolancamento
+- finance_resumo_diario (nova, mantida por trigger)
 """
 
 from __future__ import annotations
@@ -19,6 +20,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Integer,
     Numeric,
     String,
     Text,
@@ -44,7 +46,7 @@ class CategoriaFinanceira(Base):
     tipo: Mapped[str] = mapped_column(String(10))
 
     lancamentos: Mapped[list[LancamentoFinanceiro]] = relationship(
-        back_populates="categoria", lazy="selectin"
+        back_populates="categoria", lazy="raise"
     )
 
 
@@ -56,7 +58,7 @@ class ContaCaixa(Base):
     ativo: Mapped[bool] = mapped_column(Boolean, default=True)
 
     lancamentos: Mapped[list[LancamentoFinanceiro]] = relationship(
-        back_populates="conta", lazy="selectin"
+        back_populates="conta", lazy="raise"
     )
 
 
@@ -75,18 +77,18 @@ class LancamentoFinanceiro(Base):
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     evento_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("core_evento.id"), nullable=False)
-    evento: Mapped[Evento] = relationship(lazy="selectin")
+    evento: Mapped[Evento] = relationship(lazy="raise")
 
     tipo: Mapped[str] = mapped_column(String(10))
     categoria_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("finance_categoriafinanceira.id"), nullable=False
     )
-    categoria: Mapped[CategoriaFinanceira] = relationship(back_populates="lancamentos", lazy="selectin")
+    categoria: Mapped[CategoriaFinanceira] = relationship(back_populates="lancamentos", lazy="raise")
 
     conta_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("finance_contacaixa.id"), nullable=False
     )
-    conta: Mapped[ContaCaixa] = relationship(back_populates="lancamentos", lazy="selectin")
+    conta: Mapped[ContaCaixa] = relationship(back_populates="lancamentos", lazy="raise")
 
     data: Mapped[date] = mapped_column(Date)
     descricao: Mapped[str] = mapped_column(String(255))
@@ -94,9 +96,17 @@ class LancamentoFinanceiro(Base):
     forma_pagamento: Mapped[str] = mapped_column(String(10))
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"), nullable=False)
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
     setor_origem: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Venda do PDV que originou o lançamento (substitui a busca por texto na descrição)
+    venda_pdv_id: Mapped[int | None] = mapped_column(
+        BigInteger, ForeignKey("pos_vendamobile.id", ondelete="SET NULL"), nullable=True
+    )
+    # Turno de caixa cuja consolidação gerou o lançamento (anexo do PDF de fechamento)
+    turno_caixa_id: Mapped[int | None] = mapped_column(
+        BigInteger, ForeignKey("pos_turnocaixa.id", ondelete="SET NULL"), nullable=True
+    )
     pessoa: Mapped[str | None] = mapped_column(String(150), nullable=True)
     assinatura_b64: Mapped[str | None] = mapped_column(Text, nullable=True)
 
@@ -105,14 +115,14 @@ class LancamentoFinanceiro(Base):
     atualizado_por_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("auth_user.id"), nullable=True
     )
-    atualizado_por: Mapped[User | None] = relationship(lazy="selectin", foreign_keys=[atualizado_por_id])
+    atualizado_por: Mapped[User | None] = relationship(lazy="raise", foreign_keys=[atualizado_por_id])
 
     atualizado_em: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow, onupdate=func.now()
     )
 
     anexos: Mapped[list[AnexoLancamento]] = relationship(
-        back_populates="lancamento", lazy="selectin", cascade="all, delete-orphan"
+        back_populates="lancamento", lazy="raise", cascade="all, delete-orphan"
     )
 
 
@@ -123,12 +133,33 @@ class AnexoLancamento(Base):
     lancamento_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("finance_lancamentofinanceiro.id"), nullable=False
     )
-    lancamento: Mapped[LancamentoFinanceiro] = relationship(back_populates="anexos")
+    lancamento: Mapped[LancamentoFinanceiro] = relationship(back_populates="anexos", lazy="raise")
 
     arquivo: Mapped[str] = mapped_column(String(500))  # caminho relativo em MEDIA_ROOT
     descricao: Mapped[str] = mapped_column(String(255), default="")
 
     enviado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"), nullable=False)
-    enviado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[enviado_por_id])
+    enviado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[enviado_por_id])
+
+    enviado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow)
+
+class ResumoFinanceiroDiario(Base):
+    """Soma e contagem dos lançamentos por dia e dimensão (fonte dos relatórios).
 
-    enviado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow)
\ No newline at end of file
+    Mantida pelo trigger trg_lancamento_resumo (migração 0020) em todo
+    INSERT/UPDATE/DELETE de finance_lancamentofinanceiro, venha de onde vier;
+    a aplicação só lê. `scripts.finance_resumo` reconstrói a partir dos lançamentos.
+    """
+
+    __tablename__ = "finance_resumo_diario"
+
+    evento_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("core_evento.id", ondelete="CASCADE"), primary_key=True
+    )
+    data: Mapped[date] = mapped_column(Date, primary_key=True)
+    tipo: Mapped[str] = mapped_column(String(10), primary_key=True)
+    categoria_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    conta_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    forma_pagamento: Mapped[str] = mapped_column(String(10), primary_key=True)
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+    quantidade: Mapped[int] = mapped_column(Integer)
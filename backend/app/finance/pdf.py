@@ -0,0 +1,244 @@
+"""PDF do DRE renderizado fora do event loop e guardado em disco.
+
+O HTML é montado no worker do uvicorn (barato) e o WeasyPrint roda no pool de
+processos compartilhado (app/core/pdf.py), que analisa a folha de estilo e a
+configuração de fontes uma única vez por processo. O PDF fica em
+media/finance/dre com nome `dre_<evento>_<início>_<fim>_<hash>.pdf`, em que o
+hash cobre o HTML e o CSS: mudou um lançamento do período (ou o nome do evento,
+ou o layout), muda o hash e o arquivo é gerado de novo; senão o download sai
+direto do disco.
+
+Uma versão substituída não é apagada na hora (pode haver download dela em
+curso): cada renderização remove as versões antigas de qualquer DRE que não
+foram servidas nem geradas nos últimos RELATORIO_DRE_VERSOES_ANTIGAS_SEGUNDOS.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import time
+from datetime import date
+
+from app.config import settings
+from app.core import pdf as pool_pdf
+
+# Renderizações em curso neste worker, por caminho: downloads simultâneos do
+# mesmo DRE esperam o mesmo processo em vez de renderizar duas vezes.
+_em_andamento: dict[str, asyncio.Future[None]] = {}
+
+DRE_CSS = """
+@page {
+  size: A4 portrait;
+  margin: 2cm;
+  @bottom-right {
+    content: "Página " counter(page) " de " counter(pages);
+    font-size: 10pt;
+    color: #666;
+  }
+}
+body { font-family: Arial, sans-serif; color: #333; font-size: 12pt; }
+h1 { color: #206bc4; text-align: center; margin-bottom: 5px; }
+.header-info { text-align: center; margin-bottom: 30px; color: #555; font-size: 11pt; }
+table { width: 100%; border-collapse: collapse; margin-bottom: 20px; font-size: 11pt; }
+th, td { padding: 8px 10px; border-bottom: 1px solid #e0e0e0; }
+th { background-color: #f8f9fa; text-align: left; font-weight: bold; }
+.text-right { text-align: right; }
+.text-strong { font-weight: bold; }
+.text-success { color: #2fb344; }
+.text-danger { color: #d63939; }
+.bg-light { background-color: #f8f9fa; }
+.summary-box { border: 1px solid #ddd; padding: 15px; margin-bottom: 30px; border-radius: 4px; }
+.summary-row { display: flex; justify-content: space-between; margin-bottom: 10px; }
+.summary-row:last-child {
+  margin-bottom: 0;
+  padding-top: 10px;
+  border-top: 2px solid #ddd;
+  font-size: 14pt;
+  font-weight: bold;
+}
+"""
+
+
+def _media_dir() -> str:
+    return "/app/media" if os.path.exists("/app/media") else "./media"
+
+
+def format_currency(val) -> str:
+    try:
+        return f"{float(val):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    except (ValueError, TypeError):
+        return "0,00"
+
+
+def _periodo_br(data_inicio: date | None, data_fim: date | None) -> str:
+    di_br = data_inicio.strftime("%d/%m/%Y") if data_inicio else None
+    df_br = data_fim.strftime("%d/%m/%Y") if data_fim else None
+    if di_br and df_br:
+        return f"{di_br} a {df_br}"
+    if di_br:
+        return f"A partir de {di_br}"
+    if df_br:
+        return f"Até {df_br}"
+    return "Todo o período"
+
+
+def _linhas_categoria(linhas: list[dict], rotulo_total: str, total, classe: str, vazio: str) -> str:
+    if not linhas:
+        return f"<tr><td colspan='2' style='text-align: center; color: #777;'>{vazio}</td></tr>"
+    html = "".join(
+        f"<tr><td>{r['categoria'] or '(Sem categoria)'}</td><td class='text-right'>{format_currency(r['total'])}</td></tr>"
+        for r in linhas
+    )
+    return html + (
+        f"<tr><td class='text-strong'>{rotulo_total}</td>"
+        f"<td class='text-right text-strong {classe}'>{format_currency(total)}</td></tr>"
+    )
+
+
+def montar_html_dre(
+    data: dict, evento_nome: str, data_inicio: date | None, data_fim: date | None
+) -> str:
+    """HTML do DRE no formato original do Django (versão 1.0), sem o CSS (DRE_CSS)."""
+    rows_rec = _linhas_categoria(
+        data["receitas_por_categoria"], "Total de Receitas", data["total_receitas"],
+        "text-success", "Nenhuma receita no período.",
+    )
+    rows_desp = _linhas_categoria(
+        data["despesas_por_categoria"], "Total de Despesas", data["total_despesas"],
+        "text-danger", "Nenhuma despesa no período.",
+    )
+    resultado_liquido = data["resultado_liquido"]
+    resultado_class = "text-success" if float(resultado_liquido) >= 0 else "text-danger"
+
+    return f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+  <meta charset="UTF-8">
+  <title>DRE - {evento_nome}</title>
+</head>
+<body>
+  <h1>Demonstrativo de Resultado do Exercício (DRE)</h1>
+  <div class="header-info">
+    <strong>Evento:</strong> {evento_nome}<br>
+    <strong>Período:</strong> {_periodo_br(data_inicio, data_fim)}
+  </div>
+
+  <div class="summary-box bg-light">
+    <div class="summary-row text-success">
+      <span>Total Receitas (+)</span>
+      <span>R$ {format_currency(data['total_receitas'])}</span>
+    </div>
+    <div class="summary-row text-danger">
+      <span>Total Despesas (-)</span>
+      <span>R$ {format_currency(data['total_despesas'])}</span>
+    </div>
+    <div class="summary-row {resultado_class}">
+      <span>Resultado Líquido</span>
+      <span>R$ {format_currency(resultado_liquido)}</span>
+    </div>
+  </div>
+
+  <h3>Receitas por Categoria</h3>
+  <table>
+    <thead>
+      <tr><th>Categoria</th><th class="text-right">Total (R$)</th></tr>
+    </thead>
+    <tbody>
+      {rows_rec}
+    </tbody>
+  </table>
+
+  <h3 style="margin-top: 30px;">Despesas por Categoria</h3>
+  <table>
+    <thead>
+      <tr><th>Categoria</th><th class="text-right">Total (R$)</th></tr>
+    </thead>
+    <tbody>
+      {rows_desp}
+    </tbody>
+  </table>
+</body>
+</html>"""
+
+
+def _versoes_antigas(diretorio: str, idade_segundos: float) -> list[str]:
+    """PDFs substituídos por outra versão do mesmo DRE e parados há mais de `idade_segundos`.
+
+    A versão mais recente de cada evento/período (pelo mtime, que `gerar` renova
+    a cada download servido do disco) nunca entra na lista.
+    """
+    limite = time.time() - idade_segundos
+    por_dre: dict[str, list[tuple[float, str]]] = {}
+    with contextlib.suppress(FileNotFoundError), os.scandir(diretorio) as entradas:
+        for entrada in entradas:
+            if not (entrada.name.startswith("dre_") and entrada.name.endswith(".pdf")):
+                continue
+            # outro worker pode ter apagado o arquivo entre o scandir e o stat
+            with contextlib.suppress(FileNotFoundError):
+                versao = (entrada.stat().st_mtime, entrada.path)
+                por_dre.setdefault(entrada.name.rsplit("_", 1)[0], []).append(versao)
+    antigas: list[str] = []
+    for versoes in por_dre.values():
+        versoes.sort()
+        antigas.extend(caminho for mtime, caminho in versoes[:-1] if mtime < limite)
+    return antigas
+
+
+def _renderizar(html_str: str, caminho: str, idade_versoes_antigas: float) -> None:
+    """Executado no processo filho: grava o PDF e apaga versões substituídas há tempo."""
+    from weasyprint import HTML
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    HTML(string=html_str).write_pdf(
+        temporario, stylesheets=[pool_pdf.folha_de_estilo(DRE_CSS)], font_config=pool_pdf.font_config()
+    )
+    # os.replace é atômico: outro worker nunca serve um PDF pela metade
+    os.replace(temporario, caminho)
+    for antigo in _versoes_antigas(os.path.dirname(caminho), idade_versoes_antigas):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(antigo)
+
+
+class DrePdfService:
+    """Gera (ou reaproveita do disco) o PDF do DRE de um evento/período."""
+
+    @staticmethod
+    def prefixo(evento_id: int, data_inicio: date | None, data_fim: date | None) -> str:
+        inicio = data_inicio.isoformat() if data_inicio else "inicio"
+        fim = data_fim.isoformat() if data_fim else "fim"
+        return os.path.join(_media_dir(), "finance", "dre", f"dre_{evento_id}_{inicio}_{fim}_")
+
+    @staticmethod
+    def caminho(evento_id: int, data_inicio: date | None, data_fim: date | None, html_str: str) -> str:
+        """Caminho no cache; o hash é a versão dos dados (HTML + CSS do DRE)."""
+        versao = hashlib.sha256((DRE_CSS + html_str).encode()).hexdigest()[:32]
+        return f"{DrePdfService.prefixo(evento_id, data_inicio, data_fim)}{versao}.pdf"
+
+    @staticmethod
+    async def gerar(
+        data: dict, evento_id: int, evento_nome: str, data_inicio: date | None, data_fim: date | None
+    ) -> str:
+        """Devolve o caminho do PDF, renderizando no pool só se a versão não está em disco."""
+        html_str = montar_html_dre(data, evento_nome, data_inicio, data_fim)
+        caminho = DrePdfService.caminho(evento_id, data_inicio, data_fim, html_str)
+        if os.path.exists(caminho):
+            # mtime renovado: a versão em uso nunca é tratada como antiga
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(caminho)
+                return caminho
+
+        futuro = _em_andamento.get(caminho)
+        if futuro is None:
+            futuro = asyncio.ensure_future(
+                pool_pdf.executar(
+                    _renderizar, html_str, caminho, settings.RELATORIO_DRE_VERSOES_ANTIGAS_SEGUNDOS
+                )
+            )
+            _em_andamento[caminho] = futuro
+            futuro.add_done_callback(lambda _f: _em_andamento.pop(caminho, None))
+        # shield: cliente que desiste do download não cancela a espera dos demais
+        await asyncio.shield(futuro)
+        return caminho
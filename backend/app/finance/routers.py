@@ -6,14 +6,15 @@ from datetime import date
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from weasyprint import HTML
 
 from app.auth.dependencies import CurrentUser, EventoAtualId, require_scopes
 from app.db.session import get_session
 from app.finance import schemas, services
+from app.finance.exportacao import com_sessao_propria, csv_em_blocos, ndjson_em_blocos
+from app.finance.pdf import DrePdfService
 from app.finance.models import LancamentoFinanceiro
 from app.finance.schemas import (
     CategoriaFinanceiraCreate,
@@ -36,6 +37,19 @@ from app.finance.schemas import (
 router = APIRouter(prefix="/finance", tags=["finance"])
 
 
+async def _exportacao(
+    session: AsyncSession, blocos, nome_arquivo: str, media_type: str
+) -> StreamingResponse:
+    # A sessão da request só serviu à autenticação/consultas prévias: devolve a conexão
+    # antes do download em vez de segurá-la até o teardown das dependências.
+    await session.commit()
+    return StreamingResponse(
+        blocos,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}"'},
+    )
+
+
 def _require_evento(evento_id: int | None) -> int:
     if evento_id is None:
         raise HTTPException(
@@ -197,6 +211,36 @@ async def lancamentos_lista(
     )
 
 
+@router.get("/lancamentos/csv")
+async def lancamentos_csv(
+    current: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    evento_id: EventoAtualId,
+    tipo: str | None = Query(None),
+    categoria_id: int | None = Query(None),
+    conta_id: int | None = Query(None),
+    data_inicio: str | None = Query(None),
+    data_fim: str | None = Query(None),
+) -> StreamingResponse:
+    """Todos os lançamentos dos filtros da listagem, em CSV gerado em streaming."""
+    ev_id = _require_evento(evento_id)
+    filtros = dict(
+        tipo=tipo,
+        categoria_id=categoria_id,
+        conta_id=conta_id,
+        data_inicio=_parse_date(data_inicio),
+        data_fim=_parse_date(data_fim),
+    )
+    linhas = com_sessao_propria(lambda s: services.LancamentoService.exportar(s, ev_id, **filtros))
+    filename = f"lancamentos_{ev_id}_{data_inicio or 'inicio'}_{data_fim or 'fim'}.csv"
+    return await _exportacao(
+        session,
+        csv_em_blocos(linhas, cabecalho=services.LancamentoService.EXPORTACAO_COLUNAS),
+        filename,
+        "text/csv; charset=utf-8",
+    )
+
+
 @router.post("/lancamentos", response_model=LancamentoOut, status_code=201)
 async def lancamento_criar(
     current: Annotated[CurrentUser, Depends(require_scopes("finance:write"))],
@@ -361,206 +405,6 @@ def _parse_date(val: str | None) -> date | None:
         raise HTTPException(status_code=422, detail=f"Data inválida: {val}")
 
 
-def format_currency(val) -> str:
-    try:
-        return f"{float(val):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    except (ValueError, TypeError):
-        return "0,00"
-
-
-def format_date_br(iso_str: str | None) -> str | None:
-    if not iso_str:
-        return None
-    try:
-        parts = iso_str.split("-")
-        if len(parts) == 3:
-            return f"{parts[2]}/{parts[1]}/{parts[0]}"
-    except Exception:
-        pass
-    return iso_str
-
-
-def _render_dre_pdf(data: dict, evento_nome: str) -> str:
-    """Gera HTML para o PDF do DRE no formato original do Django (versão 1.0)."""
-    rows_rec = "".join(
-        f"<tr><td>{r['categoria'] or '(Sem categoria)'}</td><td class='text-right'>{format_currency(r['total'])}</td></tr>"
-        for r in data["receitas_por_categoria"]
-    )
-    if not rows_rec:
-        rows_rec = "<tr><td colspan='2' style='text-align: center; color: #777;'>Nenhuma receita no período.</td></tr>"
-    else:
-        rows_rec += f"<tr><td class='text-strong'>Total de Receitas</td><td class='text-right text-strong text-success'>{format_currency(data['total_receitas'])}</td></tr>"
-
-    rows_desp = "".join(
-        f"<tr><td>{r['categoria'] or '(Sem categoria)'}</td><td class='text-right'>{format_currency(r['total'])}</td></tr>"
-        for r in data["despesas_por_categoria"]
-    )
-    if not rows_desp:
-        rows_desp = "<tr><td colspan='2' style='text-align: center; color: #777;'>Nenhuma despesa no período.</td></tr>"
-    else:
-        rows_desp += f"<tr><td class='text-strong'>Total de Despesas</td><td class='text-right text-strong text-danger'>{format_currency(data['total_despesas'])}</td></tr>"
-
-    di_br = format_date_br(data["data_inicio"])
-    df_br = format_date_br(data["data_fim"])
-    if di_br and df_br:
-        periodo_str = f"{di_br} a {df_br}"
-    elif di_br:
-        periodo_str = f"A partir de {di_br}"
-    elif df_br:
-        periodo_str = f"Até {df_br}"
-    else:
-        periodo_str = "Todo o período"
-
-    resultado_liquido = data["resultado_liquido"]
-    resultado_class = "text-success" if float(resultado_liquido) >= 0 else "text-danger"
-
-    return f"""<!DOCTYPE html>
-<html lang="pt-br">
-<head>
-  <meta charset="UTF-8">
-  <title>DRE - {evento_nome}</title>
-  <style>
-    @page {{
-      size: A4 portrait;
-      margin: 2cm;
-      @bottom-right {{
-        content: "Página " counter(page) " de " counter(pages);
-        font-size: 10pt;
-        color: #666;
-      }}
-    }}
-
-    body {{
-      font-family: Arial, sans-serif;
-      color: #333;
-      font-size: 12pt;
-    }}
-
-    h1 {{
-      color: #206bc4;
-      text-align: center;
-      margin-bottom: 5px;
-    }}
-
-    .header-info {{
-      text-align: center;
-      margin-bottom: 30px;
-      color: #555;
-      font-size: 11pt;
-    }}
-
-    table {{
-      width: 100%;
-      border-collapse: collapse;
-      margin-bottom: 20px;
-      font-size: 11pt;
-    }}
-
-    th,
-    td {{
-      padding: 8px 10px;
-      border-bottom: 1px solid #e0e0e0;
-    }}
-
-    th {{
-      background-color: #f8f9fa;
-      text-align: left;
-      font-weight: bold;
-    }}
-
-    .text-right {{
-      text-align: right;
-    }}
-
-    .text-strong {{
-      font-weight: bold;
-    }}
-
-    .text-success {{
-      color: #2fb344;
-    }}
-
-    .text-danger {{
-      color: #d63939;
-    }}
-
-    .bg-light {{
-      background-color: #f8f9fa;
-    }}
-
-    .summary-box {{
-      border: 1px solid #ddd;
-      padding: 15px;
-      margin-bottom: 30px;
-      border-radius: 4px;
-    }}
-
-    .summary-row {{
-      display: flex;
-      justify-content: space-between;
-      margin-bottom: 10px;
-    }}
-
-    .summary-row:last-child {{
-      margin-bottom: 0;
-      padding-top: 10px;
-      border-top: 2px solid #ddd;
-      font-size: 14pt;
-      font-weight: bold;
-    }}
-  </style>
-</head>
-<body>
-  <h1>Demonstrativo de Resultado do Exercício (DRE)</h1>
-  <div class="header-info">
-    <strong>Evento:</strong> {evento_nome}<br>
-    <strong>Período:</strong> {periodo_str}
-  </div>
-
-  <div class="summary-box bg-light">
-    <div class="summary-row text-success">
-      <span>Total Receitas (+)</span>
-      <span>R$ {format_currency(data['total_receitas'])}</span>
-    </div>
-    <div class="summary-row text-danger">
-      <span>Total Despesas (-)</span>
-      <span>R$ {format_currency(data['total_despesas'])}</span>
-    </div>
-    <div class="summary-row {resultado_class}">
-      <span>Resultado Líquido</span>
-      <span>R$ {format_currency(resultado_liquido)}</span>
-    </div>
-  </div>
-
-  <h3>Receitas por Categoria</h3>
-  <table>
-    <thead>
-      <tr>
-        <th>Categoria</th>
-        <th class="text-right">Total (R$)</th>
-      </tr>
-    </thead>
-    <tbody>
-      {rows_rec}
-    </tbody>
-  </table>
-
-  <h3 style="margin-top: 30px;">Despesas por Categoria</h3>
-  <table>
-    <thead>
-      <tr>
-        <th>Categoria</th>
-        <th class="text-right">Total (R$)</th>
-      </tr>
-    </thead>
-    <tbody>
-      {rows_desp}
-    </tbody>
-  </table>
-</body>
-</html>"""
-
-
 @router.get("/relatorios/dre", response_model=DREOut)
 async def relatorio_dre(
     current: CurrentUser,
@@ -617,6 +461,50 @@ async def relatorio_oficial(
     return OfficialReportOut(**data)
 
 
+@router.get("/relatorios/oficial/csv")
+async def relatorio_oficial_csv(
+    current: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    evento_id: EventoAtualId,
+    data_inicio: str | None = Query(None),
+    data_fim: str | None = Query(None),
+) -> StreamingResponse:
+    """Relatório oficial em CSV (receitas e depois despesas), gerado em streaming."""
+    ev_id = _require_evento(evento_id)
+    di, df = _parse_date(data_inicio), _parse_date(data_fim)
+    linhas = com_sessao_propria(
+        lambda s: services.ReportService.official_linhas(s, ev_id, data_inicio=di, data_fim=df)
+    )
+    filename = f"oficial_{ev_id}_{data_inicio or 'inicio'}_{data_fim or 'fim'}.csv"
+    return await _exportacao(
+        session,
+        csv_em_blocos(
+            linhas, cabecalho=["tipo", "id", "data", "descricao", "categoria", "valor", "forma_pagamento"]
+        ),
+        filename,
+        "text/csv; charset=utf-8",
+    )
+
+
+@router.get("/relatorios/oficial/ndjson")
+async def relatorio_oficial_ndjson(
+    current: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    evento_id: EventoAtualId,
+    data_inicio: str | None = Query(None),
+    data_fim: str | None = Query(None),
+) -> StreamingResponse:
+    """Relatório oficial em NDJSON (um lançamento por linha), gerado em streaming."""
+    ev_id = _require_evento(evento_id)
+    di, df = _parse_date(data_inicio), _parse_date(data_fim)
+    linhas = com_sessao_propria(
+        lambda s: services.ReportService.official_linhas(s, ev_id, data_inicio=di, data_fim=df)
+    )
+    objetos = (row._asdict() async for row in linhas)
+    filename = f"oficial_{ev_id}_{data_inicio or 'inicio'}_{data_fim or 'fim'}.ndjson"
+    return await _exportacao(session, ndjson_em_blocos(objetos), filename, "application/x-ndjson")
+
+
 @router.get("/relatorios/dre/pdf")
 async def relatorio_dre_pdf(
     current: CurrentUser,
@@ -625,30 +513,22 @@ async def relatorio_dre_pdf(
     data_inicio: str | None = Query(None),
     data_fim: str | None = Query(None),
 ) -> Response:
-    """Exporta DRE como PDF via WeasyPrint."""
+    """Exporta DRE como PDF; repetições do mesmo período saem do cache em disco."""
     ev_id = _require_evento(evento_id)
     di, df = _parse_date(data_inicio), _parse_date(data_fim)
     data = await services.ReportService.dre(session, ev_id, data_inicio=di, data_fim=df)
-    data["data_inicio"] = data_inicio or ""
-    data["data_fim"] = data_fim or ""
 
     from app.core.models import Evento
     evento = await session.get(Evento, ev_id)
     evento_nome = evento.nome if evento else "Todos"
 
-    html_str = _render_dre_pdf(data, evento_nome)
-
     try:
-        pdf_bytes = HTML(string=html_str).write_pdf()
+        caminho = await DrePdfService.gerar(data, ev_id, evento_nome, di, df)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Erro ao gerar PDF: {exc}")
 
     filename = f"dre_{ev_id}_{data_inicio or 'inicio'}_{data_fim or 'fim'}.pdf"
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    return FileResponse(caminho, media_type="application/pdf", filename=filename)
 
 
 @router.get("/relatorios/dre/csv")
@@ -658,7 +538,7 @@ async def relatorio_dre_csv(
     evento_id: EventoAtualId,
     data_inicio: str | None = Query(None),
     data_fim: str | None = Query(None),
-) -> Response:
+) -> StreamingResponse:
     """Exporta DRE como CSV."""
     ev_id = _require_evento(evento_id)
     di, df = _parse_date(data_inicio), _parse_date(data_fim)
@@ -668,30 +548,22 @@ async def relatorio_dre_csv(
     evento = await session.get(Evento, ev_id)
     evento_nome = evento.nome if evento else "Todos"
 
-    import csv, io
-
-    buf = io.StringIO()
-    buf.write("\ufeff")  # BOM
-    writer = csv.writer(buf)
-    writer.writerow(["DRE - Demonstrativo de Resultado do Exercicio"])
-    writer.writerow([f"Evento: {evento_nome}"])
-    writer.writerow([f"Periodo: {data_inicio or '-'} a {data_fim or '-'}"])
-    writer.writerow([])
-    writer.writerow(["Receitas por Categoria", "Total"])
-    for r in data["receitas_por_categoria"]:
-        writer.writerow([r["categoria"] or "(Sem categoria)", float(r["total"])])
-    writer.writerow(["TOTAL RECEITAS", float(data["total_receitas"])])
-    writer.writerow([])
-    writer.writerow(["Despesas por Categoria", "Total"])
-    for d in data["despesas_por_categoria"]:
-        writer.writerow([d["categoria"] or "(Sem categoria)", float(d["total"])])
-    writer.writerow(["TOTAL DESPESAS", float(data["total_despesas"])])
-    writer.writerow([])
-    writer.writerow(["RESULTADO LIQUIDO", float(data["resultado_liquido"])])
+    async def linhas():
+        yield ["DRE - Demonstrativo de Resultado do Exercicio"]
+        yield [f"Evento: {evento_nome}"]
+        yield [f"Periodo: {data_inicio or '-'} a {data_fim or '-'}"]
+        yield []
+        yield ["Receitas por Categoria", "Total"]
+        for r in data["receitas_por_categoria"]:
+            yield [r["categoria"] or "(Sem categoria)", float(r["total"])]
+        yield ["TOTAL RECEITAS", float(data["total_receitas"])]
+        yield []
+        yield ["Despesas por Categoria", "Total"]
+        for d in data["despesas_por_categoria"]:
+            yield [d["categoria"] or "(Sem categoria)", float(d["total"])]
+        yield ["TOTAL DESPESAS", float(data["total_despesas"])]
+        yield []
+        yield ["RESULTADO LIQUIDO", float(data["resultado_liquido"])]
 
     filename = f"dre_{ev_id}_{data_inicio or 'inicio'}_{data_fim or 'fim'}.csv"
-    return Response(
-        content=buf.getvalue(),
-        media_type="text/csv; charset=utf-8",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
\ No newline at end of file
+    return await _exportacao(session, csv_em_blocos(linhas()), filename, "text/csv; charset=utf-8")
\ No newline at end of file
@@ -2,21 +2,25 @@
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import case, func, select
+from sqlalchemy import case, delete, func, insert, select, text
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.finance.models import (
     CategoriaFinanceira,
     ContaCaixa,
     LancamentoFinanceiro,
+    ResumoFinanceiroDiario,
 )
+from app.finance.exportacao import LOTE
 from app.finance.schemas import LancamentoCreate, LancamentoUpdate
-from app.core.models import Evento
+from app.core.models import Evento, User
 
 
 class CategoriaService:
@@ -102,9 +106,13 @@ class ContaService:
 class LancamentoService:
     """Operações de LancamentoFinanceiro escopadas por evento."""
 
+    EXPORTACAO_COLUNAS = (
+        "id", "data", "tipo", "categoria", "conta", "descricao", "valor",
+        "forma_pagamento", "pessoa", "setor_origem", "criado_por",
+    )
+
     @staticmethod
-    async def list(
-        session: AsyncSession,
+    def _filtros(
         evento_id: int,
         *,
         tipo: str | None = None,
@@ -112,10 +120,7 @@ class LancamentoService:
         conta_id: int | None = None,
         data_inicio: date | None = None,
         data_fim: date | None = None,
-        page: int = 1,
-        page_size: int = 50,
-    ) -> tuple[Sequence[LancamentoFinanceiro], int]:
-        """Retorna (items, total) paginado."""
+    ) -> list:
         filters = [LancamentoFinanceiro.evento_id == evento_id]
         if tipo:
             filters.append(LancamentoFinanceiro.tipo == tipo)
@@ -127,12 +132,37 @@ class LancamentoService:
             filters.append(LancamentoFinanceiro.data >= data_inicio)
         if data_fim:
             filters.append(LancamentoFinanceiro.data <= data_fim)
+        return filters
+
+    @staticmethod
+    async def list(
+        session: AsyncSession,
+        evento_id: int,
+        *,
+        tipo: str | None = None,
+        categoria_id: int | None = None,
+        conta_id: int | None = None,
+        data_inicio: date | None = None,
+        data_fim: date | None = None,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> tuple[Sequence[LancamentoFinanceiro], int]:
+        """Retorna (items, total) paginado."""
+        filters = LancamentoService._filtros(
+            evento_id,
+            tipo=tipo,
+            categoria_id=categoria_id,
+            conta_id=conta_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+        )
 
         count_stmt = select(func.count()).select_from(LancamentoFinanceiro).where(*filters)
         total = (await session.execute(count_stmt)).scalar_one()
 
         stmt = (
             select(LancamentoFinanceiro)
+            .options(selectinload(LancamentoFinanceiro.anexos))
             .where(*filters)
             .order_by(LancamentoFinanceiro.data.desc(), LancamentoFinanceiro.id.desc())
             .offset((page - 1) * page_size)
@@ -141,9 +171,41 @@ class LancamentoService:
         items = (await session.execute(stmt)).scalars().all()
         return items, total
 
+    @staticmethod
+    async def exportar(session: AsyncSession, evento_id: int, **filtros) -> AsyncIterator[Row]:
+        """Todos os lançamentos dos filtros de `list`, em EXPORTACAO_COLUNAS.
+
+        Cursor do servidor lido de LOTE em LOTE; só colunas, sem objetos ORM.
+        """
+        stmt = (
+            select(
+                LancamentoFinanceiro.id,
+                LancamentoFinanceiro.data,
+                LancamentoFinanceiro.tipo,
+                CategoriaFinanceira.nome,
+                ContaCaixa.nome,
+                LancamentoFinanceiro.descricao,
+                LancamentoFinanceiro.valor,
+                LancamentoFinanceiro.forma_pagamento,
+                LancamentoFinanceiro.pessoa,
+                LancamentoFinanceiro.setor_origem,
+                User.username,
+            )
+            .join(CategoriaFinanceira, LancamentoFinanceiro.categoria_id == CategoriaFinanceira.id)
+            .join(ContaCaixa, LancamentoFinanceiro.conta_id == ContaCaixa.id)
+            .outerjoin(User, LancamentoFinanceiro.criado_por_id == User.id)
+            .where(*LancamentoService._filtros(evento_id, **filtros))
+            .order_by(LancamentoFinanceiro.data, LancamentoFinanceiro.id)
+            .execution_options(yield_per=LOTE)
+        )
+        async for row in await session.stream(stmt):
+            yield row
+
     @staticmethod
     async def get(session: AsyncSession, lancamento_id: int) -> LancamentoFinanceiro:
-        lanc = await session.get(LancamentoFinanceiro, lancamento_id)
+        lanc = await session.get(
+            LancamentoFinanceiro, lancamento_id, options=[selectinload(LancamentoFinanceiro.anexos)]
+        )
         if lanc is None:
             raise NoResultFound(f"Lançamento {lancamento_id} não encontrado")
         return lanc
@@ -222,42 +284,103 @@ class LancamentoService:
         session: AsyncSession,
         evento_id: int,
     ) -> dict[str, object]:
-        """KPIs agregados por evento - equivalente a apps/finance/views/dashboard.py."""
-        stmt = select(LancamentoFinanceiro).where(LancamentoFinanceiro.evento_id == evento_id)
-        lancs = (await session.execute(stmt)).scalars().all()
-
-        receitas = sum((l.valor for l in lancs if l.tipo == LancamentoFinanceiro.RECEITA), Decimal("0"))
-        despesas = sum((l.valor for l in lancs if l.tipo == LancamentoFinanceiro.DESPESA), Decimal("0"))
-
+        """KPIs agregados por evento - equivalente a apps/finance/views/dashboard.py.
+
+        Duas consultas com GROUP BY sobre o resumo diário, sem carregar
+        lançamentos: o custo não cresce com o número de lançamentos do evento.
+        """
+        zero = Decimal("0")
+        resumo = ResumoFinanceiroDiario
+        filtro = resumo.evento_id == evento_id
+
+        # tipo x forma de pagamento: dá os totais e a quebra por forma
+        receitas = despesas = zero
+        total_lancamentos = 0
         por_forma: dict[str, Decimal] = {}
+        rows = await session.execute(
+            select(resumo.tipo, resumo.forma_pagamento, func.sum(resumo.quantidade), func.sum(resumo.total))
+            .where(filtro)
+            .group_by(resumo.tipo, resumo.forma_pagamento)
+        )
+        for tipo, forma, quantidade, total in rows.all():
+            total_lancamentos += quantidade
+            if tipo == LancamentoFinanceiro.RECEITA:
+                receitas += total
+            elif tipo == LancamentoFinanceiro.DESPESA:
+                despesas += total
+            por_forma[forma] = por_forma.get(forma, zero) + total
+
+        # categorias homônimas somam juntas, como no legado (chave é o nome)
         por_cat: dict[str, Decimal] = {}
-        for l in lancs:
-            por_forma[l.forma_pagamento] = por_forma.get(l.forma_pagamento, Decimal("0")) + l.valor
-            if l.categoria is not None:
-                nome = l.categoria.nome
-                por_cat[nome] = por_cat.get(nome, Decimal("0")) + l.valor
+        rows = await session.execute(
+            select(CategoriaFinanceira.nome, func.sum(resumo.total))
+            .join(CategoriaFinanceira, resumo.categoria_id == CategoriaFinanceira.id)
+            .where(filtro)
+            .group_by(resumo.categoria_id, CategoriaFinanceira.nome)
+        )
+        for nome, total in rows.all():
+            por_cat[nome] = por_cat.get(nome, zero) + total
 
         return {
             "receitas": receitas,
             "despesas": despesas,
             "saldo": receitas - despesas,
-            "total_lancamentos": len(lancs),
+            "total_lancamentos": total_lancamentos,
             "por_forma_pagamento": por_forma,
             "por_categoria": por_cat,
         }
 
 
+class ResumoFinanceiroService:
+    """Resumo diário (finance_resumo_diario) que alimenta dashboard e relatórios."""
+
+    DIMENSOES = ("evento_id", "data", "tipo", "categoria_id", "conta_id", "forma_pagamento")
+
+    @staticmethod
+    async def reconstruir(session: AsyncSession, evento_id: int | None = None) -> int:
+        """Refaz o resumo a partir dos lançamentos (backfill ou conferência).
+
+        Trava escritas em lançamentos até o commit para o trigger não aplicar
+        deltas sobre linhas que estão sendo refeitas. Retorna as linhas geradas.
+        """
+        lanc = LancamentoFinanceiro
+        await session.execute(text("LOCK TABLE finance_lancamentofinanceiro IN SHARE MODE"))
+
+        apagar = delete(ResumoFinanceiroDiario)
+        origem = select(
+            *(getattr(lanc, coluna) for coluna in ResumoFinanceiroService.DIMENSOES),
+            func.sum(lanc.valor),
+            func.count(),
+        ).group_by(*(getattr(lanc, coluna) for coluna in ResumoFinanceiroService.DIMENSOES))
+        if evento_id is not None:
+            apagar = apagar.where(ResumoFinanceiroDiario.evento_id == evento_id)
+            origem = origem.where(lanc.evento_id == evento_id)
+
+        await session.execute(apagar)
+        resultado = await session.execute(
+            insert(ResumoFinanceiroDiario).from_select(
+                [*ResumoFinanceiroService.DIMENSOES, "total", "quantidade"], origem
+            )
+        )
+        return resultado.rowcount
+
+
 class ReportService:
-    """Relatórios financeiros — DRE, fluxo de caixa, conciliação, relatório oficial."""
+    """Relatórios financeiros — DRE, fluxo de caixa, conciliação, relatório oficial.
+
+    DRE, fluxo e conciliação leem o resumo diário (ResumoFinanceiroDiario), não
+    os lançamentos; o relatório oficial lista lançamentos, então lê a tabela base.
+    """
 
     @staticmethod
-    def _build_base_stmt(evento_id: int, *, data_inicio: date | None = None, data_fim: date | None = None):
-        stmt = select(LancamentoFinanceiro).where(LancamentoFinanceiro.evento_id == evento_id)
+    def _periodo(coluna, data_inicio: date | None, data_fim: date | None) -> list:
+        """Predicados do período; com (evento_id, data, ...) indexado viram range scan."""
+        filtros = []
         if data_inicio:
-            stmt = stmt.where(LancamentoFinanceiro.data >= data_inicio)
+            filtros.append(coluna >= data_inicio)
         if data_fim:
-            stmt = stmt.where(LancamentoFinanceiro.data <= data_fim)
-        return stmt
+            filtros.append(coluna <= data_fim)
+        return filtros
 
     @staticmethod
     async def dre(
@@ -268,42 +391,37 @@ class ReportService:
         data_fim: date | None = None,
     ) -> dict[str, object]:
         """DRE — agrega receitas/despesas por categoria, com total e margem."""
-        # Totais
-        rec_agg = await session.execute(
-            select(func.coalesce(func.sum(LancamentoFinanceiro.valor), 0))
-            .where(LancamentoFinanceiro.evento_id == evento_id, LancamentoFinanceiro.tipo == LancamentoFinanceiro.RECEITA)
-        )
-        total_receitas = rec_agg.scalar_one()
-
-        desp_agg = await session.execute(
-            select(func.coalesce(func.sum(LancamentoFinanceiro.valor), 0))
-            .where(LancamentoFinanceiro.evento_id == evento_id, LancamentoFinanceiro.tipo == LancamentoFinanceiro.DESPESA)
-        )
-        total_despesas = desp_agg.scalar_one()
-
-        resultado = total_receitas - total_despesas
-        margem = (float(resultado) / float(total_receitas)) * 100 if total_receitas else None
-
-        # Agrupa receitas/despesas por categoria via join
+        # Uma consulta ao resumo diário: os totais saem da soma das categorias
         rows = await session.execute(
             select(
-                LancamentoFinanceiro.tipo,
-                func.coalesce(CategoriaFinanceira.nome, "Sem categoria").label("cat_nome"),
-                func.sum(LancamentoFinanceiro.valor).label("total"),
+                ResumoFinanceiroDiario.tipo,
+                CategoriaFinanceira.nome.label("cat_nome"),
+                func.sum(ResumoFinanceiroDiario.total).label("total"),
             )
-            .join(CategoriaFinanceira, LancamentoFinanceiro.categoria_id == CategoriaFinanceira.id)
-            .where(LancamentoFinanceiro.evento_id == evento_id)
-            .group_by(LancamentoFinanceiro.tipo, CategoriaFinanceira.nome)
-            .order_by(func.sum(LancamentoFinanceiro.valor).desc())
+            .join(CategoriaFinanceira, ResumoFinanceiroDiario.categoria_id == CategoriaFinanceira.id)
+            .where(
+                ResumoFinanceiroDiario.evento_id == evento_id,
+                *ReportService._periodo(ResumoFinanceiroDiario.data, data_inicio, data_fim),
+            )
+            .group_by(ResumoFinanceiroDiario.tipo, CategoriaFinanceira.nome)
+            .order_by(func.sum(ResumoFinanceiroDiario.total).desc())
         )
+        total_receitas = Decimal("0")
+        total_despesas = Decimal("0")
         receitas_cat, despesas_cat = [], []
         for row in rows:
             item = {"categoria": row.cat_nome, "total": row.total}
             if row.tipo == LancamentoFinanceiro.RECEITA:
+                total_receitas += row.total
                 receitas_cat.append(item)
             else:
+                if row.tipo == LancamentoFinanceiro.DESPESA:
+                    total_despesas += row.total
                 despesas_cat.append(item)
 
+        resultado = total_receitas - total_despesas
+        margem = (float(resultado) / float(total_receitas)) * 100 if total_receitas else None
+
         return {
             "data_inicio": data_inicio,
             "data_fim": data_fim,
@@ -324,23 +442,22 @@ class ReportService:
         data_fim: date | None = None,
     ) -> dict[str, object]:
         """Fluxo de caixa diário com saldo acumulado."""
-        base = ReportService._build_base_stmt(evento_id, data_inicio=data_inicio, data_fim=data_fim)
-
+        resumo = ResumoFinanceiroDiario
         rows = await session.execute(
             select(
-                LancamentoFinanceiro.data,
+                resumo.data,
                 func.coalesce(
-                    func.sum(case((LancamentoFinanceiro.tipo == LancamentoFinanceiro.RECEITA, LancamentoFinanceiro.valor), else_=0)),
+                    func.sum(case((resumo.tipo == LancamentoFinanceiro.RECEITA, resumo.total), else_=0)),
                     0,
                 ).label("receitas"),
                 func.coalesce(
-                    func.sum(case((LancamentoFinanceiro.tipo == LancamentoFinanceiro.DESPESA, LancamentoFinanceiro.valor), else_=0)),
+                    func.sum(case((resumo.tipo == LancamentoFinanceiro.DESPESA, resumo.total), else_=0)),
                     0,
                 ).label("despesas"),
             )
-            .where(LancamentoFinanceiro.evento_id == evento_id)
-            .group_by(LancamentoFinanceiro.data)
-            .order_by(LancamentoFinanceiro.data)
+            .where(resumo.evento_id == evento_id, *ReportService._periodo(resumo.data, data_inicio, data_fim))
+            .group_by(resumo.data)
+            .order_by(resumo.data)
         )
 
         linhas = []
@@ -377,12 +494,15 @@ class ReportService:
         """Conciliação por forma de pagamento."""
         rows = await session.execute(
             select(
-                LancamentoFinanceiro.forma_pagamento,
-                LancamentoFinanceiro.tipo,
-                func.sum(LancamentoFinanceiro.valor).label("total"),
+                ResumoFinanceiroDiario.forma_pagamento,
+                ResumoFinanceiroDiario.tipo,
+                func.sum(ResumoFinanceiroDiario.total).label("total"),
             )
-            .where(LancamentoFinanceiro.evento_id == evento_id)
-            .group_by(LancamentoFinanceiro.forma_pagamento, LancamentoFinanceiro.tipo)
+            .where(
+                ResumoFinanceiroDiario.evento_id == evento_id,
+                *ReportService._periodo(ResumoFinanceiroDiario.data, data_inicio, data_fim),
+            )
+            .group_by(ResumoFinanceiroDiario.forma_pagamento, ResumoFinanceiroDiario.tipo)
         )
 
         aggr: dict[str, dict[str, Decimal]] = {}
@@ -415,6 +535,38 @@ class ReportService:
             "saldo": total_rec - total_desp,
         }
 
+    @staticmethod
+    async def official_linhas(
+        session: AsyncSession,
+        evento_id: int,
+        *,
+        data_inicio: date | None = None,
+        data_fim: date | None = None,
+    ) -> AsyncIterator[Row]:
+        """Linhas do relatório oficial (receitas e depois despesas), via cursor do servidor."""
+        for tipo in (LancamentoFinanceiro.RECEITA, LancamentoFinanceiro.DESPESA):
+            stmt = (
+                select(
+                    LancamentoFinanceiro.tipo,
+                    LancamentoFinanceiro.id,
+                    LancamentoFinanceiro.data,
+                    LancamentoFinanceiro.descricao,
+                    CategoriaFinanceira.nome.label("categoria"),
+                    LancamentoFinanceiro.valor,
+                    LancamentoFinanceiro.forma_pagamento,
+                )
+                .join(CategoriaFinanceira, LancamentoFinanceiro.categoria_id == CategoriaFinanceira.id)
+                .where(
+                    LancamentoFinanceiro.evento_id == evento_id,
+                    LancamentoFinanceiro.tipo == tipo,
+                    *ReportService._periodo(LancamentoFinanceiro.data, data_inicio, data_fim),
+                )
+                .order_by(LancamentoFinanceiro.data, LancamentoFinanceiro.id)
+                .execution_options(yield_per=LOTE)
+            )
+            async for row in await session.stream(stmt):
+                yield row
+
     @staticmethod
     async def official_report(
         session: AsyncSession,
@@ -423,30 +575,39 @@ class ReportService:
         data_inicio: date | None = None,
         data_fim: date | None = None,
     ) -> dict[str, object]:
-        """Relatório oficial — listagem completa com totais, para impressão."""
-        base = ReportService._build_base_stmt(evento_id, data_inicio=data_inicio, data_fim=data_fim)
+        """Relatório oficial — listagem completa com totais, para impressão.
 
-        receitas_rows = await session.execute(
-            base.where(LancamentoFinanceiro.tipo == LancamentoFinanceiro.RECEITA)
-            .order_by(LancamentoFinanceiro.data, LancamentoFinanceiro.id)
-        )
-        despesas_rows = await session.execute(
-            base.where(LancamentoFinanceiro.tipo == LancamentoFinanceiro.DESPESA)
-            .order_by(LancamentoFinanceiro.data, LancamentoFinanceiro.id)
-        )
-
-        receitas = receitas_rows.scalars().all()
-        despesas = despesas_rows.scalars().all()
-
-        total_rec = sum((l.valor for l in receitas), Decimal("0"))
-        total_desp = sum((l.valor for l in despesas), Decimal("0"))
+        A resposta JSON precisa da lista inteira; para eventos grandes use as
+        exportações em streaming (`official_linhas`).
+        """
+        receitas: list[dict[str, object]] = []
+        despesas: list[dict[str, object]] = []
+        total_rec = Decimal("0")
+        total_desp = Decimal("0")
+        async for row in ReportService.official_linhas(
+            session, evento_id, data_inicio=data_inicio, data_fim=data_fim
+        ):
+            item = {
+                "id": row.id,
+                "data": row.data,
+                "descricao": row.descricao,
+                "categoria": row.categoria or "",
+                "valor": row.valor,
+                "forma_pagamento": row.forma_pagamento,
+            }
+            if row.tipo == LancamentoFinanceiro.RECEITA:
+                receitas.append(item)
+                total_rec += row.valor
+            else:
+                despesas.append(item)
+                total_desp += row.valor
 
         return {
-            "receitas": [{"id": l.id, "data": l.data, "descricao": l.descricao, "categoria": l.categoria.nome if l.categoria else "", "valor": l.valor, "forma_pagamento": l.forma_pagamento} for l in receitas],
-            "despesas": [{"id": l.id, "data": l.data, "descricao": l.descricao, "categoria": l.categoria.nome if l.categoria else "", "valor": l.valor, "forma_pagamento": l.forma_pagamento} for l in despesas],
+            "receitas": receitas,
+            "despesas": despesas,
             "total_receitas": total_rec,
             "total_despesas": total_desp,
             "saldo": total_rec - total_desp,
             "data_inicio": data_inicio,
             "data_fim": data_fim,
-        }
\ No newline at end of file
+        }
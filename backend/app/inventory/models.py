@@ -80,7 +80,7 @@ class Produto(Base):
     ativo: Mapped[bool] = mapped_column(Boolean, default=True)
 
     entradas: Mapped[list[EntradaEstoque]] = relationship(
-        back_populates="produto", lazy="selectin"
+        back_populates="produto", lazy="raise"
     )
 
 
@@ -94,7 +94,7 @@ class EntradaEstoque(Base):
     produto_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_produto.id"), nullable=False
     )
-    produto: Mapped[Produto] = relationship(back_populates="entradas", lazy="selectin")
+    produto: Mapped[Produto] = relationship(back_populates="entradas", lazy="raise")
 
     data: Mapped[date] = mapped_column(Date)
     quantidade: Mapped[Decimal] = mapped_column(Numeric(12, 2))
@@ -103,7 +103,7 @@ class EntradaEstoque(Base):
     observacao: Mapped[str] = mapped_column(String(255), default="")
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"), nullable=False)
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -159,7 +159,7 @@ class RequisicaoSaida(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     numero: Mapped[str] = mapped_column(String(30), unique=True, default="")
     evento_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("core_evento.id"))
-    evento: Mapped[Evento] = relationship(lazy="selectin")
+    evento: Mapped[Evento] = relationship(lazy="raise")
 
     area: Mapped[str] = mapped_column(String(80))
     data_solicitacao: Mapped[datetime] = mapped_column(
@@ -181,13 +181,13 @@ class RequisicaoSaida(Base):
     )
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     itens: Mapped[list[RequisicaoSaidaItem]] = relationship(
         back_populates="requisicao",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
         order_by="RequisicaoSaidaItem.id",
     )
@@ -201,12 +201,12 @@ class RequisicaoSaidaItem(Base):
     requisicao_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_requisicaosaida.id"), nullable=False
     )
-    requisicao: Mapped[RequisicaoSaida] = relationship(back_populates="itens")
+    requisicao: Mapped[RequisicaoSaida] = relationship(back_populates="itens", lazy="raise")
 
     produto_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_produto.id"), nullable=False
     )
-    produto: Mapped[Produto] = relationship(lazy="selectin")
+    produto: Mapped[Produto] = relationship(lazy="raise")
 
     local_origem_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("pos_localvenda.id"), nullable=True
@@ -236,11 +236,11 @@ class RequisicaoSaidaImpressao(Base):
     requisicao_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_requisicaosaida.id"), nullable=False
     )
-    requisicao: Mapped[RequisicaoSaida] = relationship(lazy="selectin")
+    requisicao: Mapped[RequisicaoSaida] = relationship(lazy="raise")
 
     impresso_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     impresso_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    impresso_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[impresso_por_id])
+    impresso_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[impresso_por_id])
     via: Mapped[str] = mapped_column(String(20), default=ORIGINAL)
 
 
@@ -280,19 +280,19 @@ class CotacaoCompra(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     numero: Mapped[str] = mapped_column(String(30), unique=True, default="")
     evento_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("core_evento.id"))
-    evento: Mapped[Evento] = relationship(lazy="selectin")
+    evento: Mapped[Evento] = relationship(lazy="raise")
 
     data_cotacao: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     status: Mapped[str] = mapped_column(String(12), default=ABERTA)
     observacao: Mapped[str] = mapped_column(String(255), default="")
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
     fornecedor_aprovado_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("inventory_fornecedor.id"), nullable=True
     )
-    fornecedor_aprovado: Mapped[Fornecedor | None] = relationship(lazy="selectin")
+    fornecedor_aprovado: Mapped[Fornecedor | None] = relationship(lazy="raise")
 
     valor_aprovado: Mapped[Decimal | None] = mapped_column(Numeric(14, 2), nullable=True)
     aprovado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -304,7 +304,7 @@ class CotacaoCompra(Base):
     lancamento_financeiro_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("finance_lancamentofinanceiro.id"), nullable=True
     )
-    lancamento_financeiro: Mapped[LancamentoFinanceiro | None] = relationship(lazy="selectin")
+    lancamento_financeiro: Mapped[LancamentoFinanceiro | None] = relationship(lazy="raise")
 
     fechado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     fechado_por_id: Mapped[int | None] = mapped_column(
@@ -313,12 +313,12 @@ class CotacaoCompra(Base):
 
     itens: Mapped[list[CotacaoCompraItem]] = relationship(
         back_populates="cotacao",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
         order_by="CotacaoCompraItem.id",
     )
     ordem_compra: Mapped[OrdemCompra | None] = relationship(
-        back_populates="cotacao", lazy="selectin", uselist=False
+        back_populates="cotacao", lazy="raise", uselist=False
     )
 
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -334,17 +334,17 @@ class CotacaoCompraItem(Base):
     cotacao_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_cotacaocompra.id"), nullable=False
     )
-    cotacao: Mapped[CotacaoCompra] = relationship(back_populates="itens")
+    cotacao: Mapped[CotacaoCompra] = relationship(back_populates="itens", lazy="raise")
 
     produto_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_produto.id"), nullable=False
     )
-    produto: Mapped[Produto] = relationship(lazy="selectin")
+    produto: Mapped[Produto] = relationship(lazy="raise")
 
     quantidade: Mapped[Decimal] = mapped_column(Numeric(12, 2))
     precos: Mapped[list[CotacaoCompraPreco]] = relationship(
         back_populates="item",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
         order_by="CotacaoCompraPreco.fornecedor_id",
     )
@@ -360,17 +360,17 @@ class CotacaoCompraPreco(Base):
     cotacao_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_cotacaocompra.id"), nullable=False
     )
-    cotacao: Mapped[CotacaoCompra] = relationship(lazy="selectin")
+    cotacao: Mapped[CotacaoCompra] = relationship(lazy="raise")
 
     item_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_cotacaocompraitem.id"), nullable=False
     )
-    item: Mapped[CotacaoCompraItem] = relationship(back_populates="precos")
+    item: Mapped[CotacaoCompraItem] = relationship(back_populates="precos", lazy="raise")
 
     fornecedor_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_fornecedor.id"), nullable=False
     )
-    fornecedor: Mapped[Fornecedor] = relationship(lazy="selectin")
+    fornecedor: Mapped[Fornecedor] = relationship(lazy="raise")
 
     valor_unitario: Mapped[Decimal] = mapped_column(Numeric(12, 2))
     valor_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0.00"))
@@ -387,11 +387,11 @@ class CotacaoCompraImpressao(Base):
     cotacao_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_cotacaocompra.id"), nullable=False
     )
-    cotacao: Mapped[CotacaoCompra] = relationship(lazy="selectin")
+    cotacao: Mapped[CotacaoCompra] = relationship(lazy="raise")
 
     impresso_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     impresso_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    impresso_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[impresso_por_id])
+    impresso_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[impresso_por_id])
     via: Mapped[str] = mapped_column(String(20), default=ORIGINAL)
 
 
@@ -413,12 +413,12 @@ class OrdemCompra(Base):
     cotacao_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_cotacaocompra.id"), nullable=False, unique=True
     )
-    cotacao: Mapped[CotacaoCompra] = relationship(back_populates="ordem_compra")
+    cotacao: Mapped[CotacaoCompra] = relationship(back_populates="ordem_compra", lazy="raise")
 
     fornecedor_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("inventory_fornecedor.id"), nullable=False
     )
-    fornecedor: Mapped[Fornecedor] = relationship(lazy="selectin")
+    fornecedor: Mapped[Fornecedor] = relationship(lazy="raise")
 
     mensagem: Mapped[str] = mapped_column(Text, default="")
     valor_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0.00"))
@@ -428,6 +428,6 @@ class OrdemCompra(Base):
     enviada_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -469,11 +469,17 @@ async def ordens_compra_lista(
 ) -> PaginatedOrdensCompra:
     from app.inventory.models import OrdemCompra
     from sqlalchemy import func, select
+    from sqlalchemy.orm import joinedload
     count_q = select(func.count()).select_from(OrdemCompra)
     total = (await session.execute(count_q)).scalar() or 0
 
     stmt = (
         select(OrdemCompra)
+        .options(
+            joinedload(OrdemCompra.fornecedor),
+            joinedload(OrdemCompra.criado_por),
+            joinedload(OrdemCompra.cotacao),
+        )
         .order_by(OrdemCompra.criado_em.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
@@ -16,7 +16,9 @@ from decimal import Decimal
 from sqlalchemy import func, select, update
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
+from app.db.search import documento_busca, filtro_busca, rank_busca
 from app.finance.models import LancamentoFinanceiro
 from app.inventory.models import (
     CotacaoCompra,
@@ -155,9 +157,9 @@ class ProdutoService:
         filters = []
         if ativo is not None:
             filters.append(Produto.ativo.is_(ativo))
-        if busca:
-            like = f"%{busca}%"
-            filters.append((Produto.nome.ilike(like)) | (Produto.sku.ilike(like)))
+        documento = documento_busca(Produto.nome, Produto.sku)
+        if busca and busca.strip():
+            filters.append(filtro_busca(documento, busca))
         if categoria:
             filters.append(Produto.categoria == categoria)
         if status == "baixo":
@@ -178,10 +180,14 @@ class ProdutoService:
             await session.execute(select(func.count()).select_from(Produto).where(*filters))
         ).scalar_one()
 
+        # Com busca, os mais relevantes primeiro (word_similarity); empate por nome.
+        ordem = [Produto.nome]
+        if busca and busca.strip():
+            ordem.insert(0, rank_busca(documento, busca).desc())
         stmt = (
             select(Produto)
             .where(*filters)
-            .order_by(Produto.nome)
+            .order_by(*ordem)
             .offset((page - 1) * page_size)
             .limit(page_size)
         )
@@ -268,6 +274,7 @@ class RequisicaoService:
         ).scalar_one()
         stmt = (
             select(RequisicaoSaida)
+            .options(selectinload(RequisicaoSaida.itens))
             .where(*filters)
             .order_by(RequisicaoSaida.id.desc())
             .offset((page - 1) * page_size)
@@ -277,7 +284,11 @@ class RequisicaoService:
 
     @staticmethod
     async def get(session: AsyncSession, requisicao_id: int) -> RequisicaoSaida:
-        r = await session.get(RequisicaoSaida, requisicao_id)
+        r = await session.get(
+            RequisicaoSaida,
+            requisicao_id,
+            options=[selectinload(RequisicaoSaida.itens).joinedload(RequisicaoSaidaItem.produto)],
+        )
         if r is None:
             raise NoResultFound(f"Requisição {requisicao_id} não encontrada")
         return r
@@ -481,6 +492,7 @@ class CotacaoService:
         ).scalar_one()
         stmt = (
             select(CotacaoCompra)
+            .options(selectinload(CotacaoCompra.itens).selectinload(CotacaoCompraItem.precos))
             .where(*filters)
             .order_by(CotacaoCompra.id.desc())
             .offset((page - 1) * page_size)
@@ -490,7 +502,16 @@ class CotacaoService:
 
     @staticmethod
     async def get(session: AsyncSession, cotacao_id: int) -> CotacaoCompra:
-        c = await session.get(CotacaoCompra, cotacao_id)
+        c = await session.get(
+            CotacaoCompra,
+            cotacao_id,
+            options=[
+                selectinload(CotacaoCompra.itens).options(
+                    joinedload(CotacaoCompraItem.produto),
+                    selectinload(CotacaoCompraItem.precos),
+                )
+            ],
+        )
         if c is None:
             raise NoResultFound(f"Cotação {cotacao_id} não encontrada")
         return c
@@ -581,8 +602,10 @@ class CotacaoService:
 
     @staticmethod
     async def cancelar(session: AsyncSession, cotacao: CotacaoCompra) -> CotacaoCompra:
-        if cotacao.status == CotacaoCompra.FECHADA and cotacao.ordem_compra is not None:
-            raise ValueError("Cotação fechada com ordem de compra não pode ser cancelada")
+        if cotacao.status == CotacaoCompra.FECHADA:
+            await session.refresh(cotacao, ["ordem_compra"])
+            if cotacao.ordem_compra is not None:
+                raise ValueError("Cotação fechada com ordem de compra não pode ser cancelada")
         cotacao.status = CotacaoCompra.CANCELADA
         await session.flush()
         return cotacao
@@ -54,7 +54,7 @@ class Chale(Base):
     observacoes: Mapped[str] = mapped_column(Text, default="")
 
     acoes: Mapped[list[AcaoChale]] = relationship(
-        back_populates="chale", lazy="selectin"
+        back_populates="chale", lazy="raise"
     )
 
 
@@ -85,10 +85,10 @@ class ReservaChale(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
     evento_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("core_evento.id"))
-    evento: Mapped[Evento] = relationship(lazy="selectin")
+    evento: Mapped[Evento] = relationship(lazy="raise")
 
     chale_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("lodging_chale.id"))
-    chale: Mapped[Chale] = relationship(lazy="selectin", back_populates=None)
+    chale: Mapped[Chale] = relationship(lazy="raise", back_populates=None)
 
     data_entrada: Mapped[date | None] = mapped_column(Date, nullable=True)
     data_saida: Mapped[date | None] = mapped_column(Date, nullable=True)
@@ -107,23 +107,23 @@ class ReservaChale(Base):
     conta_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("finance_contacaixa.id"), nullable=True
     )
-    conta: Mapped[ContaCaixa | None] = relationship(lazy="selectin")
+    conta: Mapped[ContaCaixa | None] = relationship(lazy="raise")
 
     lancamento_financeiro_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("finance_lancamentofinanceiro.id"), nullable=True
     )
-    lancamento_financeiro: Mapped[LancamentoFinanceiro | None] = relationship(lazy="selectin")
+    lancamento_financeiro: Mapped[LancamentoFinanceiro | None] = relationship(lazy="raise")
 
     observacoes: Mapped[str] = mapped_column(Text, default="")
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow)
 
     atualizado_por_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("auth_user.id"), nullable=True
     )
-    atualizado_por: Mapped[User | None] = relationship(lazy="selectin", foreign_keys=[atualizado_por_id])
+    atualizado_por: Mapped[User | None] = relationship(lazy="raise", foreign_keys=[atualizado_por_id])
     atualizado_em: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow, onupdate=func.now()
     )
@@ -147,10 +147,10 @@ class AcaoChale(Base):
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
     evento_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("core_evento.id"))
-    evento: Mapped[Evento] = relationship(lazy="selectin")
+    evento: Mapped[Evento] = relationship(lazy="raise")
 
     chale_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("lodging_chale.id"))
-    chale: Mapped[Chale] = relationship(back_populates="acoes", lazy="selectin")
+    chale: Mapped[Chale] = relationship(back_populates="acoes", lazy="raise")
 
     tipo: Mapped[str] = mapped_column(String(20))
     titulo: Mapped[str] = mapped_column(String(120))
@@ -160,13 +160,13 @@ class AcaoChale(Base):
     ativo: Mapped[bool] = mapped_column(Boolean, default=True)
 
     criado_por_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("auth_user.id"))
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
     criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow)
 
     atualizado_por_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("auth_user.id"), nullable=True
     )
-    atualizado_por: Mapped[User | None] = relationship(lazy="selectin", foreign_keys=[atualizado_por_id])
+    atualizado_por: Mapped[User | None] = relationship(lazy="raise", foreign_keys=[atualizado_por_id])
     atualizado_em: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow, onupdate=func.now()
     )
\ No newline at end of file
@@ -309,6 +309,8 @@ class ReservaChaleService:
 
         if await session.get(ContaCaixa, reserva.conta_id) is None:
             raise ValueError("Conta de caixa não encontrada")
+        # em geral já está no identity map (_validate_periodo) e não emite SQL
+        chale = await session.get(Chale, reserva.chale_id)
 
         lancamento = LancamentoFinanceiro(
             evento_id=reserva.evento_id,
@@ -316,7 +318,7 @@ class ReservaChaleService:
             categoria_id=cat.id,
             conta_id=reserva.conta_id,
             data=reserva.data_entrada,
-            descricao=f"Hospedagem {reserva.chale.codigo} - {reserva.responsavel_nome}",
+            descricao=f"Hospedagem {chale.codigo} - {reserva.responsavel_nome}",
             valor=reserva.valor_adicional,
             forma_pagamento=reserva.forma_pagamento,
             criado_por_id=user_id,
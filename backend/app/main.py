@@ -2,27 +2,63 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Annotated
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth.dependencies import require_scopes
+from app.auth.passwords import encerrar_executor as encerrar_executor_senhas
+from app.auth.principal import Principal, principal_cache
+from app.auth.revogacao import rastreador_atividade, revogacoes
+from app.auth.verificacao import verificador as verificador_jwt
 from app.auth.routers import router as auth_router
 from app.config import settings
+from app.core.pdf import encerrar_executor as encerrar_executor_pdf
 from app.core.routers import router as core_router
+from app.db.session import metricas_pool
 from app.finance.routers import router as finance_router
 from app.inventory.routers import router as inventory_router
 from app.lodging.routers import router as lodging_router
+from app.pos.relatorios import RelatorioTurnoService
 from app.pos.routers import router as pos_router
+from app.pos.stream import broker as pos_broker
 from app.volunteers.routers import router as volunteers_router
-from app.middleware.audit import AuditLogMiddleware
-from app.middleware.inactivity import InactivityLogoutMiddleware
+from app.middleware.audit import AuditLogMiddleware, audit_writer, manter_particoes_diariamente
+from app.middleware.sql import QueryCounterMiddleware
 
 logger = logging.getLogger("maanaim")
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    try:
+        await RelatorioTurnoService.retomar_pendentes()
+    except Exception:
+        logger.exception("Não foi possível retomar relatórios de turno pendentes")
+    particoes = asyncio.create_task(manter_particoes_diariamente())
+    revogacoes.iniciar()
+    rastreador_atividade.iniciar()
+    yield
+    particoes.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await particoes
+    await revogacoes.parar()
+    await rastreador_atividade.parar()
+    await pos_broker.parar()
+    await audit_writer.parar()
+    encerrar_executor_pdf()
+    encerrar_executor_senhas()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
+        lifespan=lifespan,
         title=settings.PROJECT_NAME,
         version="0.1.0",
         description="Backend Maanaim Manager - FastAPI",
@@ -39,7 +75,8 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
         expose_headers=["X-Evento-Id"],
     )
-    app.add_middleware(InactivityLogoutMiddleware)
+    # ASGI puros (sem BaseHTTPMiddleware): não criam task nem embrulham o corpo da resposta
+    app.add_middleware(QueryCounterMiddleware)
     app.add_middleware(AuditLogMiddleware)
 
     app.include_router(auth_router, prefix="/api/v1")
@@ -54,6 +91,19 @@ def create_app() -> FastAPI:
     async def health() -> dict[str, str]:
         return {"status": "ok", "project": settings.PROJECT_NAME, "environment": settings.ENVIRONMENT}
 
+    @app.get("/api/v1/health/metricas", tags=["health"])
+    async def health_metricas(
+        _admin: Annotated[Principal, Depends(require_scopes("admin:read"))],
+    ) -> dict[str, object]:
+        """Contadores internos por worker (pool, filas e caches); só para administradores."""
+        return {
+            "db_pool": metricas_pool(),
+            "audit": audit_writer.metricas(),
+            "principal_cache": principal_cache.metricas(),
+            "jwt_cache": verificador_jwt.metricas(),
+            "revogacoes": revogacoes.metricas(),
+        }
+
     @app.get("/", include_in_schema=False)
     async def root() -> dict[str, str]:
         return {"name": settings.PROJECT_NAME, "docs": "/docs"}
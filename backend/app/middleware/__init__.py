@@ -1 +1 @@
-"""Pacote middleware - audit e inactivity (substitutos dos middlewares Django)."""
\ No newline at end of file
+"""Pacote middleware - auditoria e contagem de SQL, ambos ASGI puros."""
@@ -1,76 +1,215 @@
-"""Middleware de auditoria - registra cada request em core_auditlog."""
+"""Middleware de auditoria - registra cada request em core_auditlog.
+
+O middleware só monta o registro e o coloca numa fila em memória; quem grava é
+o `AuditLogWriter`, uma task por worker que junta os registros e faz um único
+INSERT multi-row a cada AUDIT_LOTE_MAXIMO registros ou AUDIT_INTERVALO_MS.
+Assim a latência da request não inclui mais a escrita da auditoria nem ocupa
+uma segunda conexão do pool.
+
+Fila cheia (banco lento/fora) descarta o registro em vez de segurar a request;
+os contadores de `metricas()` mostram a pressão. No shutdown a fila é drenada.
+
+A tabela é particionada por mês: `manter_particoes_diariamente` cria as
+partições à frente e aplica a retenção (AUDIT_RETENCAO_MESES).
+"""
 
 from __future__ import annotations
 
-from typing import Awaitable, Callable
+import asyncio
+import contextvars
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import insert
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from app.config import settings
+from app.core.models import AuditLog
+from app.core.services import AuditLogService
+from app.db.session import async_session_factory, engine
 
-from app.db.session import async_session_factory
+logger = logging.getLogger("maanaim.audit")
 
+_FIM = None  # sentinela de encerramento na fila
+_UM_DIA = 24 * 60 * 60
 
-def _client_ip(request: Request) -> str | None:
-    fwd = request.headers.get("x-forwarded-for")
+_PREFIXOS_IGNORADOS = ("/docs", "/openapi", "/redoc", "/static", "/media")
+
+
+def _client_ip(scope: Scope, headers: Headers) -> str | None:
+    fwd = headers.get("x-forwarded-for")
     if fwd:
         return fwd.split(",")[0].strip()
-    if request.client is not None:
-        return request.client.host
+    client = scope.get("client")
+    if client is not None:
+        return client[0]
     return None
 
 
-class AuditLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        # não autentica aqui - só registra metadados pós-response
-        response = await call_next(request)
+class AuditLogWriter:
+    """Grava registros de auditoria em lote, fora do caminho da request."""
+
+    def __init__(self, *, tamanho_fila: int, tamanho_lote: int, intervalo_ms: int) -> None:
+        self.tamanho_fila = tamanho_fila
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo_ms / 1000
+        self._fila: asyncio.Queue[dict | None] | None = None
+        self._tarefa: asyncio.Task | None = None
+        self.enfileirados = 0
+        self.descartados = 0
+        self.gravados = 0
+        self.falhas = 0
+        self.lotes = 0
+
+    def iniciar(self) -> None:
+        if self._tarefa is None or self._tarefa.done():
+            self._fila = asyncio.Queue(maxsize=self.tamanho_fila)
+            # contexto vazio: a task nasce dentro de uma request e não deve herdar
+            # a contagem de SQL dela (QueryCounterMiddleware)
+            self._tarefa = asyncio.get_running_loop().create_task(
+                self._processar(), context=contextvars.Context()
+            )
+
+    def registrar(self, registro: dict) -> None:
+        self.iniciar()
+        try:
+            self._fila.put_nowait(registro)
+        except asyncio.QueueFull:
+            self.descartados += 1
+            if self.descartados % 1000 == 1:
+                logger.warning("Fila de auditoria cheia; %d registros descartados", self.descartados)
+            return
+        self.enfileirados += 1
+
+    def metricas(self) -> dict[str, int]:
+        return {
+            "fila": self._fila.qsize() if self._fila is not None else 0,
+            "enfileirados": self.enfileirados,
+            "descartados": self.descartados,
+            "gravados": self.gravados,
+            "falhas": self.falhas,
+            "lotes": self.lotes,
+        }
+
+    async def _processar(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            primeiro = await self._fila.get()
+            if primeiro is _FIM:
+                return
+            lote = [primeiro]
+            prazo = loop.time() + self.intervalo
+            encerrar = False
+            while len(lote) < self.tamanho_lote:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    registro = await asyncio.wait_for(self._fila.get(), restante)
+                except TimeoutError:
+                    break
+                if registro is _FIM:
+                    encerrar = True
+                    break
+                lote.append(registro)
+            await self._gravar(lote)
+            if encerrar:
+                return
+
+    async def _gravar(self, lote: list[dict]) -> None:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(AuditLog).values(lote))
+        except Exception:
+            self.falhas += len(lote)
+            logger.exception("Falha gravando lote de %d registros de auditoria", len(lote))
+            return
+        self.gravados += len(lote)
+        self.lotes += 1
 
+    async def parar(self, timeout: float = 10.0) -> None:
+        """Drena a fila e encerra a task (chamado no shutdown do worker)."""
+        if self._tarefa is None:
+            return
+        if not self._tarefa.done():
+            await self._fila.put(_FIM)
+            try:
+                await asyncio.wait_for(self._tarefa, timeout)
+            except TimeoutError:
+                logger.warning("Auditoria não drenou em %.0fs; %d registros perdidos", timeout, self._fila.qsize())
+        self._tarefa = None
+
+
+async def manter_particoes() -> dict[str, list[str]]:
+    async with async_session_factory() as session:
+        resultado = await AuditLogService.manter_particoes(
+            session,
+            meses_a_frente=settings.AUDIT_PARTICOES_A_FRENTE,
+            retencao_meses=settings.AUDIT_RETENCAO_MESES,
+        )
+        await session.commit()
+    if resultado["criadas"] or resultado["removidas"]:
+        logger.info(
+            "Partições de auditoria: criadas=%s removidas=%s", resultado["criadas"], resultado["removidas"]
+        )
+    return resultado
+
+
+async def manter_particoes_diariamente() -> None:
+    """Roda no startup e a cada 24h; falha só gera log e tenta de novo no dia seguinte."""
+    while True:
+        try:
+            await manter_particoes()
+        except Exception:
+            logger.exception("Falha mantendo partições de core_auditlog")
+        await asyncio.sleep(_UM_DIA)
+
+
+audit_writer = AuditLogWriter(
+    tamanho_fila=settings.AUDIT_FILA_MAXIMA,
+    tamanho_lote=settings.AUDIT_LOTE_MAXIMO,
+    intervalo_ms=settings.AUDIT_INTERVALO_MS,
+)
+
+
+class AuditLogMiddleware:
+    """Middleware ASGI puro - lê o status do `http.response.start` e não embrulha o corpo."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # ignora assets/docs/dev tools
-        path = request.url.path
-        if path.startswith("/docs") or path.startswith("/openapi") or path.startswith("/redoc"):
-            return response
-        if path.startswith("/static") or path.startswith("/media"):
-            return response
+        if scope["type"] != "http" or scope["path"].startswith(_PREFIXOS_IGNORADOS):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
+        # get_current_user grava o id em request.state (= scope["state"]): o JWT
+        # não é decodificado de novo aqui
+        estado = scope.setdefault("state", {})
         try:
-            async with async_session_factory() as session:
-                from app.core.models import AuditLog
-                from sqlalchemy import select
-                from app.core.models import User
-
-                user_id: int | None = None
-                auth = request.headers.get("Authorization", "")
-                if auth.lower().startswith("bearer "):
-                    try:
-                        from app.auth.jwt import decode_token, InvalidTokenError
-                        payload = decode_token(auth[7:])
-                        if payload.get("type") == "access":
-                            user_id = int(payload.get("sub", 0)) or None
-                    except (InvalidTokenError, ValueError):
-                        pass
-
-                view_name = ""
-                if hasattr(request, "scope") and "route" in request.scope:
-                    route = request.scope.get("route")
-                    if hasattr(route, "name"):
-                        view_name = route.name or ""
-
-                record = AuditLog(
-                    user_id=user_id,
-                    method=request.method,
-                    path=path,
-                    view_name=view_name,
-                    status_code=response.status_code,
-                    ip_address=_client_ip(request),
-                    user_agent=request.headers.get("user-agent", "")[:2048],
-                )
-                session.add(record)
-                await session.commit()
-        except Exception:  # nunca derrubar request
-            pass
-
-        return response
\ No newline at end of file
+            await self.app(scope, receive, _send)
+        finally:
+            headers = Headers(scope=scope)
+            route = scope.get("route")
+            audit_writer.registrar(
+                {
+                    "user_id": estado.get("user_id"),
+                    "method": scope["method"][:10],
+                    "path": scope["path"][:2048],
+                    "view_name": (getattr(route, "name", None) or "")[:255],
+                    "status_code": status_code,
+                    "ip_address": (_client_ip(scope, headers) or "")[:39] or None,
+                    "user_agent": headers.get("user-agent", "")[:2048],
+                    "created_at": datetime.now(UTC),
+                }
+            )
@@ -0,0 +1,96 @@
+"""Middleware de contagem de SQL - nº de statements e tempo de banco por request.
+
+Os números, junto com a espera por conexão do pool (métrica `pool`), saem no
+header `Server-Timing` (visível no DevTools do navegador) e num log
+estruturado em `maanaim.sql`. Cada rota tem um orçamento de statements
+(SQL_ORCAMENTO_PADRAO / SQL_ORCAMENTOS); estourar falha a request nos testes
+(ENVIRONMENT=test) e gera warning em dev/prod.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.db.session import ContagemSQL, contagem_sql
+
+logger = logging.getLogger("maanaim.sql")
+
+
+class OrcamentoSQLExcedido(RuntimeError):
+    """A rota emitiu mais statements do que o orçamento configurado."""
+
+
+def chave_rota(scope: Scope) -> str:
+    route = scope.get("route")
+    caminho = getattr(route, "path", None) or scope["path"]
+    return f"{scope['method']} {caminho}"
+
+
+def orcamento_da_rota(chave: str) -> int:
+    return settings.SQL_ORCAMENTOS.get(chave, settings.SQL_ORCAMENTO_PADRAO)
+
+
+class QueryCounterMiddleware:
+    """Middleware ASGI puro: a contagem vale para a própria task da request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        contagem = ContagemSQL()
+        status_code = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # em streaming o header sai antes do corpo: reflete o SQL até aqui
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={contagem.segundos * 1000:.1f};desc="{contagem.statements} statements", '
+                    f"pool;dur={contagem.espera_pool * 1000:.1f}",
+                )
+            await send(message)
+
+        token = contagem_sql.set(contagem)
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            contagem_sql.reset(token)
+
+        chave = chave_rota(scope)
+        db_ms = contagem.segundos * 1000
+        pool_ms = contagem.espera_pool * 1000
+        logger.info(
+            "%s status=%s sql=%d db_ms=%.1f pool_ms=%.1f",
+            chave,
+            status_code,
+            contagem.statements,
+            db_ms,
+            pool_ms,
+            extra={
+                "rota": chave,
+                "status_code": status_code,
+                "sql_statements": contagem.statements,
+                "sql_ms": round(db_ms, 1),
+                "pool_ms": round(pool_ms, 1),
+            },
+        )
+
+        orcamento = orcamento_da_rota(chave)
+        if contagem.statements > orcamento:
+            mensagem = f"{chave} emitiu {contagem.statements} statements SQL (orçamento: {orcamento})"
+            if settings.ENVIRONMENT == "test":
+                raise OrcamentoSQLExcedido(mensagem)
+            logger.warning(mensagem)
+
+
+__all__ = ["OrcamentoSQLExcedido", "QueryCounterMiddleware"]
@@ -114,6 +114,7 @@ class POSFinanceIntegration:
                 criado_por_id=user_id,
                 setor_origem="pos",
                 pessoa=local_nome,
+                venda_pdv_id=venda.id,
             )
             session.add(lanc)
             lancamentos.append(lanc)
@@ -127,15 +128,13 @@ class POSFinanceIntegration:
         local_id: int,
         user_id: int,
     ) -> LocalVenda:
-        import os
         from datetime import datetime, UTC
-        from weasyprint import HTML
-        from sqlalchemy import select, func
-        from sqlalchemy.orm import selectinload
+        from sqlalchemy import select
         
-        from app.pos.models import LocalVenda, TurnoCaixa, VendaMobile, PagamentoVenda, ItemVendaMobile
-        from app.finance.models import LancamentoFinanceiro, AnexoLancamento
-        from app.core.models import Evento, User
+        from app.pos.models import LocalVenda, TurnoCaixa
+        from app.pos.relatorios import RelatorioTurnoService
+        from app.pos.services import ResumoTurnoService
+        from app.finance.models import LancamentoFinanceiro
         
         # 1. Lock LocalVenda
         stmt_local = select(LocalVenda).where(LocalVenda.id == local_id).with_for_update()
@@ -156,211 +155,23 @@ class POSFinanceIntegration:
         turno.fechado_por_id = user_id
         turno.fechado = True
         
-        # Fetch Event name
-        evento_nome = "Geral"
-        evt_id = turno.evento_id or local.evento_id
-        if evt_id:
-            evt = await session.get(Evento, evt_id)
-            if evt:
-                evento_nome = evt.nome
-                
-        # 3. Get all sales for this turn
-        stmt_vendas = (
-            select(VendaMobile)
-            .options(selectinload(VendaMobile.pagamentos), selectinload(VendaMobile.itens))
-            .where(VendaMobile.turno_id == turno.id)
-        )
-        vendas = (await session.execute(stmt_vendas)).scalars().unique().all()
-        
-        total_vendas_sum = sum(v.total for v in vendas)
+        # 3. Totais do turno vêm do resumo corrente (mantido a cada venda)
+        resumo = await ResumoTurnoService.obter(session, turno.id)
+        total_vendas_sum = resumo["soma_total"]
         turno.valor_fechamento = total_vendas_sum
         
         # Group payments by type
         por_forma = {}
-        for v in vendas:
-            for p in v.pagamentos:
-                tipo_financeiro = POSFinanceIntegration.FORMA_MAP.get(p.tipo, LancamentoFinanceiro.OUTRO)
-                por_forma[tipo_financeiro] = por_forma.get(tipo_financeiro, Decimal("0.00")) + p.valor
+        for tipo, valor in resumo["por_forma"].items():
+            tipo_financeiro = POSFinanceIntegration.FORMA_MAP.get(tipo, LancamentoFinanceiro.OUTRO)
+            por_forma[tipo_financeiro] = por_forma.get(tipo_financeiro, Decimal("0.00")) + valor
                 
-        # Get items summary
-        stmt_items = (
-            select(
-                ItemVendaMobile.nome_produto,
-                ItemVendaMobile.familia_produto,
-                func.sum(ItemVendaMobile.quantidade).label("qtd"),
-                func.sum(ItemVendaMobile.total_item).label("total")
-            )
-            .join(VendaMobile, ItemVendaMobile.venda_id == VendaMobile.id)
-            .where(VendaMobile.turno_id == turno.id)
-            .group_by(ItemVendaMobile.nome_produto, ItemVendaMobile.familia_produto)
-            .order_by(ItemVendaMobile.nome_produto)
-        )
-        items_summary = (await session.execute(stmt_items)).all()
-        
-        # 4. Generate HTML and PDF
-        # Formatting functions
-        def format_currency(val) -> str:
-            return f"R$ {float(val):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            
-        def format_datetime_br(dt) -> str:
-            if not dt:
-                return ""
-            # simple BR formatting
-            return dt.strftime("%d/%m/%Y %H:%M:%S")
-            
-        rows_forma = "".join(
-            f"<tr><td>{forma}</td><td class='text-right'>{format_currency(valor)}</td></tr>"
-            for forma, valor in por_forma.items() if valor > 0
-        )
-        if not rows_forma:
-            rows_forma = "<tr><td colspan='2' style='text-align: center; color: #777;'>Nenhuma venda no período.</td></tr>"
-
-        rows_items = "".join(
-            f"<tr><td>{row[0]}</td><td>{row[1]}</td><td class='text-center'>{row[2]}</td><td class='text-right'>{format_currency(row[3])}</td></tr>"
-            for row in items_summary
-        )
-        if not rows_items:
-            rows_items = "<tr><td colspan='4' style='text-align: center; color: #777;'>Nenhum item vendido.</td></tr>"
-            
-        html_str = f"""<!DOCTYPE html>
-<html lang="pt-br">
-<head>
-  <meta charset="UTF-8">
-  <title>Fechamento de Caixa - {local.nome}</title>
-  <style>
-    @page {{
-      size: A4 portrait;
-      margin: 2cm;
-      @bottom-right {{
-        content: "Página " counter(page) " de " counter(pages);
-        font-size: 10pt;
-        color: #666;
-      }}
-    }}
-    body {{
-      font-family: Arial, sans-serif;
-      color: #333;
-      font-size: 11pt;
-    }}
-    h1 {{
-      color: #206bc4;
-      text-align: center;
-      margin-bottom: 5px;
-    }}
-    .header-info {{
-      text-align: center;
-      margin-bottom: 30px;
-      color: #555;
-      font-size: 10pt;
-      border-bottom: 2px solid #206bc4;
-      padding-bottom: 15px;
-    }}
-    .section-title {{
-      font-size: 13pt;
-      font-weight: bold;
-      color: #206bc4;
-      margin-top: 25px;
-      margin-bottom: 10px;
-      border-bottom: 1px solid #e0e0e0;
-      padding-bottom: 5px;
-    }}
-    table {{
-      width: 100%;
-      border-collapse: collapse;
-      margin-bottom: 20px;
-      font-size: 10pt;
-    }}
-    th, td {{
-      padding: 6px 8px;
-      border-bottom: 1px solid #e0e0e0;
-      text-align: left;
-    }}
-    th {{
-      background-color: #f8f9fa;
-      font-weight: bold;
-    }}
-    .text-right {{
-      text-align: right;
-    }}
-    .text-center {{
-      text-align: center;
-    }}
-    .text-strong {{
-      font-weight: bold;
-    }}
-    .total-box {{
-      background-color: #f8f9fa;
-      border: 1px solid #e0e0e0;
-      padding: 15px;
-      margin-top: 30px;
-      text-align: right;
-      font-size: 12pt;
-    }}
-  </style>
-</head>
-<body>
-  <h1>Relatório de Fechamento de Caixa</h1>
-  <div class="header-info">
-    <strong>PDV:</strong> {local.nome} &nbsp;&nbsp;|&nbsp;&nbsp; <strong>Evento:</strong> {evento_nome}<br>
-    <strong>Turno:</strong> #{turno.id} &nbsp;&nbsp;|&nbsp;&nbsp; <strong>Status:</strong> FECHADO<br>
-    <strong>Abertura:</strong> {format_datetime_br(turno.aberto_em)} ({turno.aberto_por.username if turno.aberto_por else 'Sistema'})<br>
-    <strong>Fechamento:</strong> {format_datetime_br(turno.fechado_em)} ({turno.fechado_por.username if turno.fechado_por else 'Sistema'})
-  </div>
-
-  <div class="section-title">Resumo por Forma de Pagamento</div>
-  <table>
-    <thead>
-      <tr>
-        <th>Forma de Pagamento</th>
-        <th class="text-right">Valor Total</th>
-      </tr>
-    </thead>
-    <tbody>
-      {rows_forma}
-      <tr class="text-strong">
-        <td>Total Geral</td>
-        <td class="text-right">{format_currency(total_vendas_sum)}</td>
-      </tr>
-    </tbody>
-  </table>
-
-  <div class="section-title">Itens Vendidos (Consolidado)</div>
-  <table>
-    <thead>
-      <tr>
-        <th>Produto</th>
-        <th>Família</th>
-        <th class="text-center">Quantidade</th>
-        <th class="text-right">Total</th>
-      </tr>
-    </thead>
-    <tbody>
-      {rows_items}
-    </tbody>
-  </table>
-
-  <div class="total-box">
-    <strong>Total do Caixa a Conciliar:</strong> <span class="text-strong" style="color: #2fb344; font-size: 14pt;">{format_currency(total_vendas_sum)}</span>
-  </div>
-</body>
-</html>
-"""
-        # Render PDF via WeasyPrint
-        pdf_bytes = HTML(string=html_str).write_pdf()
-        
-        # Save to media_dir/pos/fechamento_{turno.id}.pdf
-        media_dir = "/app/media" if os.path.exists("/app/media") else "./media"
-        pos_media_dir = os.path.join(media_dir, "pos")
-        os.makedirs(pos_media_dir, exist_ok=True)
-        
-        pdf_filename = f"fechamento_{turno.id}.pdf"
-        pdf_rel_path = f"pos/{pdf_filename}"
-        pdf_full_path = os.path.join(pos_media_dir, pdf_filename)
-        
-        with open(pdf_full_path, "wb") as f:
-            f.write(pdf_bytes)
-            
-        turno.relatorio_pdf = pdf_rel_path
+        # 4. O PDF de fechamento é gerado fora da requisição, depois do commit
+        turno.relatorio_pdf = None
+        turno.relatorio_status = TurnoCaixa.RELATORIO_PENDENTE
+        turno.relatorio_erro = None
+        # O anexo do PDF nos lançamentos só é criado quando o arquivo existir (gerar)
+        RelatorioTurnoService.agendar_apos_commit(session, turno.id)
         
         # 5. Create financial entries per payment method
         categoria = await POSFinanceIntegration._get_or_create_categoria_receita(session)
@@ -393,19 +204,9 @@ class POSFinanceIntegration:
                 criado_por_id=user_id,
                 setor_origem="pos",
                 pessoa=local.nome,
+                turno_caixa_id=turno.id,
             )
             session.add(lanc)
-            await session.flush() # get lanc.id
-            
-            # Add attachment (AnexoLancamento) pointing to the PDF
-            anexo = AnexoLancamento(
-                lancamento_id=lanc.id,
-                arquivo=pdf_rel_path,
-                descricao=f"Relatório de Fechamento de Caixa - Turno #{turno.id}",
-                enviado_por_id=user_id,
-                enviado_em=datetime.now(UTC),
-            )
-            session.add(anexo)
             
         # 6. Reset LocalVenda state
         local.caixa_aberto = False
@@ -2,6 +2,7 @@
 
 Espelha tabelas Django: pos_localvenda, pos_familiavenda, pos_produtolocal,
 pos_entradaestquelocal, pos_vendamobile, pos_pagamentovenda, pos_itemvendamobile.
+pos_turnocaixa e pos_resumoturnopagamento são exclusivas da stack nova.
 
 Mantém nomes de tabela Django para compatibilidade com dados existentes.
 """
@@ -64,23 +65,33 @@ class LocalVenda(Base):
     caixa_aberto_por_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("auth_user.id"), nullable=True
     )
-    caixa_aberto_por: Mapped[User | None] = relationship(lazy="selectin", foreign_keys=[caixa_aberto_por_id])
+    caixa_aberto_por: Mapped[User | None] = relationship(lazy="raise", foreign_keys=[caixa_aberto_por_id])
     caixa_atual_turno_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("pos_turnocaixa.id", ondelete="SET NULL"), nullable=True
     )
+    # Contador do catálogo do local, incrementado (trigger) a cada escrita em ProdutoLocal;
+    # catalogo_remocao_versao guarda a versão da última remoção. Ver ProdutoLocal.versao.
+    catalogo_versao: Mapped[int] = mapped_column(BigInteger, server_default="0", nullable=False)
+    catalogo_remocao_versao: Mapped[int] = mapped_column(BigInteger, server_default="0", nullable=False)
 
     criado_em: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
-    evento: Mapped[Evento | None] = relationship(lazy="selectin")
-    familias: Mapped[list["FamiliaVenda"]] = relationship(back_populates="local", lazy="selectin")
-    produtos: Mapped[list["ProdutoLocal"]] = relationship(back_populates="local", lazy="selectin")
+    evento: Mapped[Evento | None] = relationship(lazy="raise")
+    familias: Mapped[list["FamiliaVenda"]] = relationship(back_populates="local", lazy="raise")
+    produtos: Mapped[list["ProdutoLocal"]] = relationship(back_populates="local", lazy="raise")
 
 
 class TurnoCaixa(Base):
     __tablename__ = "pos_turnocaixa"
 
+    # Estados da geração assíncrona do PDF de fechamento (app.pos.relatorios)
+    RELATORIO_PENDENTE = "PENDENTE"
+    RELATORIO_PROCESSANDO = "PROCESSANDO"
+    RELATORIO_PRONTO = "PRONTO"
+    RELATORIO_ERRO = "ERRO"
+
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     local_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("pos_localvenda.id", ondelete="CASCADE"), nullable=False
@@ -96,10 +107,37 @@ class TurnoCaixa(Base):
     valor_fechamento: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
     fechado: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     relatorio_pdf: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    relatorio_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    relatorio_erro: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Quando o worker atual assumiu a geração; PROCESSANDO além do prazo volta para a fila
+    relatorio_reivindicado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Contadores correntes do turno - mantidos por ResumoTurnoService a cada venda/estorno.
+    quantidade_vendas: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    valor_vendas: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=Decimal("0.00"), server_default="0", nullable=False
+    )
+
+    local: Mapped["LocalVenda"] = relationship(lazy="raise", foreign_keys=[local_id])
+    aberto_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[aberto_por_id])
+    fechado_por: Mapped[User | None] = relationship(lazy="raise", foreign_keys=[fechado_por_id])
+
+
+class ResumoTurnoPagamento(Base):
+    """Total corrente de um turno por forma de pagamento (uma linha por turno/tipo)."""
+
+    __tablename__ = "pos_resumoturnopagamento"
 
-    local: Mapped["LocalVenda"] = relationship(lazy="selectin", foreign_keys=[local_id])
-    aberto_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[aberto_por_id])
-    fechado_por: Mapped[User | None] = relationship(lazy="selectin", foreign_keys=[fechado_por_id])
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    turno_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("pos_turnocaixa.id", ondelete="CASCADE"), nullable=False
+    )
+    tipo: Mapped[str] = mapped_column(String(20), nullable=False)
+    valor: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal("0.00"), nullable=False)
+    quantidade: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("turno_id", "tipo", name="uniq_resumo_turno_tipo"),
+    )
 
 
 class FamiliaVenda(Base):
@@ -115,8 +153,8 @@ class FamiliaVenda(Base):
         UniqueConstraint("local_id", "nome", name="uniq_familia_local_nome"),
     )
 
-    local: Mapped["LocalVenda"] = relationship(back_populates="familias", lazy="selectin")
-    produtos: Mapped[list["ProdutoLocal"]] = relationship(back_populates="familia", lazy="selectin")
+    local: Mapped["LocalVenda"] = relationship(back_populates="familias", lazy="raise")
+    produtos: Mapped[list["ProdutoLocal"]] = relationship(back_populates="familia", lazy="raise")
 
 
 class ProdutoLocal(Base):
@@ -142,14 +180,18 @@ class ProdutoLocal(Base):
     criado_em: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Versão do catálogo do PDV: a cada INSERT/UPDATE (inclusive baixas de estoque e
+    # renomeação de produto/família) um trigger incrementa LocalVenda.catalogo_versao,
+    # travando a linha do local até o commit, e grava o novo valor aqui.
+    versao: Mapped[int] = mapped_column(BigInteger, server_default="0", nullable=False)
 
     __table_args__ = (
         UniqueConstraint("produto_id", "local_id", name="uniq_produto_local"),
     )
 
-    local: Mapped["LocalVenda"] = relationship(back_populates="produtos", lazy="selectin")
-    familia: Mapped["FamiliaVenda | None"] = relationship(back_populates="produtos", lazy="selectin")
-    produto: Mapped[Produto] = relationship(lazy="selectin")
+    local: Mapped["LocalVenda"] = relationship(back_populates="produtos", lazy="raise")
+    familia: Mapped["FamiliaVenda | None"] = relationship(back_populates="produtos", lazy="raise")
+    produto: Mapped[Produto] = relationship(lazy="raise")
 
 
 class EntradaEstoqueLocal(Base):
@@ -171,8 +213,8 @@ class EntradaEstoqueLocal(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
-    produto_local: Mapped["ProdutoLocal"] = relationship(lazy="selectin")
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    produto_local: Mapped["ProdutoLocal"] = relationship(lazy="raise")
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
 
 class TransferenciaEstoqueLocal(Base):
@@ -195,8 +237,8 @@ class TransferenciaEstoqueLocal(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
-    produto_local: Mapped["ProdutoLocal"] = relationship(lazy="selectin")
-    criado_por: Mapped[User] = relationship(lazy="selectin", foreign_keys=[criado_por_id])
+    produto_local: Mapped["ProdutoLocal"] = relationship(lazy="raise")
+    criado_por: Mapped[User] = relationship(lazy="raise", foreign_keys=[criado_por_id])
 
 
 # ---------------------------------------------------------------------------
@@ -224,14 +266,14 @@ class VendaMobile(Base):
     total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     forma_pagamento: Mapped[str] = mapped_column(String(20), default="MISTO", nullable=False)
 
-    vendedor: Mapped[User] = relationship(lazy="selectin", foreign_keys=[vendedor_id])
-    local: Mapped["LocalVenda | None"] = relationship(lazy="selectin")
-    itens: Mapped[list["ItemVendaMobile"]] = relationship(back_populates="venda", lazy="selectin")
-    pagamentos: Mapped[list["PagamentoVenda"]] = relationship(back_populates="venda", lazy="selectin")
+    vendedor: Mapped[User] = relationship(lazy="raise", foreign_keys=[vendedor_id])
+    local: Mapped["LocalVenda | None"] = relationship(lazy="raise")
+    itens: Mapped[list["ItemVendaMobile"]] = relationship(back_populates="venda", lazy="raise")
+    pagamentos: Mapped[list["PagamentoVenda"]] = relationship(back_populates="venda", lazy="raise")
     turno_id: Mapped[int | None] = mapped_column(
         BigInteger, ForeignKey("pos_turnocaixa.id", ondelete="SET NULL"), nullable=True
     )
-    turno: Mapped[TurnoCaixa | None] = relationship(lazy="selectin")
+    turno: Mapped[TurnoCaixa | None] = relationship(lazy="raise")
 
 
 class PagamentoVenda(Base):
@@ -244,7 +286,7 @@ class PagamentoVenda(Base):
     tipo: Mapped[str] = mapped_column(String(20), nullable=False)
     valor: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
-    venda: Mapped["VendaMobile"] = relationship(back_populates="pagamentos")
+    venda: Mapped["VendaMobile"] = relationship(back_populates="pagamentos", lazy="raise")
 
 
 class ItemVendaMobile(Base):
@@ -266,5 +308,5 @@ class ItemVendaMobile(Base):
     desconto_perc: Mapped[Decimal] = mapped_column(Numeric(5, 2), default=Decimal("0.00"), nullable=False)
     total_item: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
-    venda: Mapped["VendaMobile"] = relationship(back_populates="itens")
-    produto_local: Mapped["ProdutoLocal | None"] = relationship(lazy="selectin")
+    venda: Mapped["VendaMobile"] = relationship(back_populates="itens", lazy="raise")
+    produto_local: Mapped["ProdutoLocal | None"] = relationship(lazy="raise")
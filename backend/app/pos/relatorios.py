@@ -0,0 +1,379 @@
+"""Relatório PDF de fechamento de turno do PDV, gerado fora da requisição.
+
+O fechamento do caixa (POSFinanceIntegration.consolidar_turno_e_fechar) só marca
+o turno com relatorio_status=PENDENTE e agenda a geração para depois do commit.
+A renderização WeasyPrint é CPU-bound e roda no pool de processos compartilhado
+com o DRE (app/core/pdf.py), sem travar o event loop nem segurar o lock de pos_localvenda. TurnoCaixa.relatorio_pdf é
+preenchido quando o arquivo fica pronto; o status pode ser consultado em
+GET /pos/turnos/{id}/relatorio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, event, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.config import settings
+from app.core import pdf as pool_pdf
+from app.core.models import Evento
+from app.db.session import async_session_factory
+from app.finance.models import AnexoLancamento, LancamentoFinanceiro
+from app.pos.models import ItemVendaMobile, LocalVenda, TurnoCaixa, VendaMobile
+
+logger = logging.getLogger("maanaim.pos.relatorios")
+
+# Referências fortes às tarefas agendadas (asyncio só guarda referências fracas).
+_tarefas: set[asyncio.Task] = set()
+
+
+def _media_dir() -> str:
+    return "/app/media" if os.path.exists("/app/media") else "./media"
+
+
+def _renderizar_pdf(html_str: str, caminho: str) -> None:
+    """Executado no processo filho: renderiza o HTML e grava o PDF em disco."""
+    from weasyprint import HTML
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    pdf_bytes = HTML(string=html_str).write_pdf()
+    with open(caminho, "wb") as f:
+        f.write(pdf_bytes)
+
+
+class RelatorioTurnoService:
+    """Agenda, gera e consulta o PDF de fechamento de um turno de caixa."""
+
+    @staticmethod
+    def caminho_relativo(turno_id: int) -> str:
+        return f"pos/fechamento_{turno_id}.pdf"
+
+    @staticmethod
+    def reivindicavel():
+        """Turnos que um worker pode assumir: PENDENTE, ou PROCESSANDO com o prazo vencido.
+
+        Um PROCESSANDO antigo é de um worker (ou processo do pool) que morreu no
+        meio da renderização; sem o prazo ele ficaria preso para sempre.
+        """
+        prazo = func.now() - timedelta(seconds=settings.RELATORIO_PDF_PRAZO_SEGUNDOS)
+        return or_(
+            TurnoCaixa.relatorio_status == TurnoCaixa.RELATORIO_PENDENTE,
+            and_(
+                TurnoCaixa.relatorio_status == TurnoCaixa.RELATORIO_PROCESSANDO,
+                or_(
+                    TurnoCaixa.relatorio_reivindicado_em.is_(None),
+                    TurnoCaixa.relatorio_reivindicado_em < prazo,
+                ),
+            ),
+        )
+
+    @staticmethod
+    def agendar_apos_commit(session: AsyncSession, turno_id: int) -> None:
+        """Dispara a geração só se a transação do fechamento for confirmada."""
+
+        def _agendar(_sync_session) -> None:
+            RelatorioTurnoService.agendar(turno_id)
+
+        event.listen(session.sync_session, "after_commit", _agendar, once=True)
+
+    @staticmethod
+    def agendar(turno_id: int) -> None:
+        tarefa = asyncio.get_running_loop().create_task(RelatorioTurnoService.gerar(turno_id))
+        _tarefas.add(tarefa)
+        tarefa.add_done_callback(_tarefas.discard)
+
+    @staticmethod
+    async def retomar_pendentes() -> None:
+        """Reagenda turnos PENDENTE ou presos em PROCESSANDO (ex.: reinício do servidor)."""
+        async with async_session_factory() as session:
+            ids = (
+                await session.execute(
+                    select(TurnoCaixa.id).where(RelatorioTurnoService.reivindicavel())
+                )
+            ).scalars().all()
+        for turno_id in ids:
+            RelatorioTurnoService.agendar(turno_id)
+
+    @staticmethod
+    async def gerar(turno_id: int) -> None:
+        """Reivindica o turno (PENDENTE → PROCESSANDO), renderiza e publica o PDF.
+
+        A reivindicação é um UPDATE condicional, então vários workers do uvicorn
+        podem tentar o mesmo turno sem gerar o arquivo duas vezes. Os lançamentos
+        da consolidação só recebem o anexo depois que o arquivo existe.
+        """
+        async with async_session_factory() as session:
+            reivindicado = (
+                await session.execute(
+                    update(TurnoCaixa)
+                    .where(
+                        TurnoCaixa.id == turno_id,
+                        RelatorioTurnoService.reivindicavel(),
+                    )
+                    .values(
+                        relatorio_status=TurnoCaixa.RELATORIO_PROCESSANDO,
+                        relatorio_reivindicado_em=func.now(),
+                    )
+                    .returning(TurnoCaixa.id)
+                )
+            ).scalar_one_or_none()
+            await session.commit()
+            if reivindicado is None:
+                return
+
+            try:
+                html_str = await RelatorioTurnoService.montar_html(session, turno_id)
+                relativo = RelatorioTurnoService.caminho_relativo(turno_id)
+                await pool_pdf.executar(_renderizar_pdf, html_str, os.path.join(_media_dir(), relativo))
+                valores = {
+                    "relatorio_status": TurnoCaixa.RELATORIO_PRONTO,
+                    "relatorio_pdf": relativo,
+                    "relatorio_erro": None,
+                }
+            except Exception as exc:
+                logger.exception("Falha ao gerar relatório do turno %s", turno_id)
+                await session.rollback()
+                valores = {"relatorio_status": TurnoCaixa.RELATORIO_ERRO, "relatorio_erro": str(exc)[:500]}
+
+            await session.execute(update(TurnoCaixa).where(TurnoCaixa.id == turno_id).values(**valores))
+            if valores["relatorio_status"] == TurnoCaixa.RELATORIO_PRONTO:
+                await RelatorioTurnoService.anexar(session, turno_id, valores["relatorio_pdf"])
+            await session.commit()
+
+    @staticmethod
+    async def anexar(session: AsyncSession, turno_id: int, relativo: str) -> None:
+        """Anexa o PDF pronto aos lançamentos da consolidação do turno (uma vez por lançamento)."""
+        ja_anexado = (
+            select(AnexoLancamento.id)
+            .where(
+                AnexoLancamento.lancamento_id == LancamentoFinanceiro.id,
+                AnexoLancamento.arquivo == relativo,
+            )
+            .exists()
+        )
+        origem = (
+            select(
+                LancamentoFinanceiro.id,
+                literal(relativo),
+                literal(f"Relatório de Fechamento de Caixa - Turno #{turno_id}"),
+                TurnoCaixa.fechado_por_id,
+                func.now(),
+            )
+            .join(TurnoCaixa, TurnoCaixa.id == LancamentoFinanceiro.turno_caixa_id)
+            .where(LancamentoFinanceiro.turno_caixa_id == turno_id, ~ja_anexado)
+        )
+        await session.execute(
+            AnexoLancamento.__table__.insert().from_select(
+                ["lancamento_id", "arquivo", "descricao", "enviado_por_id", "enviado_em"], origem
+            )
+        )
+
+    @staticmethod
+    async def status(session: AsyncSession, turno_id: int) -> dict[str, object]:
+        turno = await session.get(TurnoCaixa, turno_id)
+        if turno is None:
+            raise ValueError("Turno de caixa não encontrado")
+        return {
+            "turno_id": turno.id,
+            "status": turno.relatorio_status,
+            "relatorio_pdf": turno.relatorio_pdf,
+            "erro": turno.relatorio_erro,
+        }
+
+    @staticmethod
+    async def montar_html(session: AsyncSession, turno_id: int) -> str:
+        from app.pos.finance_integration import POSFinanceIntegration
+        from app.pos.services import ResumoTurnoService
+
+        turno = await session.get(
+            TurnoCaixa,
+            turno_id,
+            options=[joinedload(TurnoCaixa.aberto_por), joinedload(TurnoCaixa.fechado_por)],
+        )
+        if turno is None:
+            raise ValueError("Turno de caixa não encontrado")
+        local = await session.get(LocalVenda, turno.local_id)
+
+        evento_nome = "Geral"
+        evt_id = turno.evento_id or local.evento_id
+        if evt_id:
+            evt = await session.get(Evento, evt_id)
+            if evt:
+                evento_nome = evt.nome
+
+        resumo = await ResumoTurnoService.obter(session, turno.id)
+        total_vendas_sum = resumo["soma_total"]
+        por_forma: dict[str, Decimal] = {}
+        for tipo, valor in resumo["por_forma"].items():
+            tipo_financeiro = POSFinanceIntegration.FORMA_MAP.get(tipo, LancamentoFinanceiro.OUTRO)
+            por_forma[tipo_financeiro] = por_forma.get(tipo_financeiro, Decimal("0.00")) + valor
+
+        # Get items summary
+        stmt_items = (
+            select(
+                ItemVendaMobile.nome_produto,
+                ItemVendaMobile.familia_produto,
+                func.sum(ItemVendaMobile.quantidade).label("qtd"),
+                func.sum(ItemVendaMobile.total_item).label("total")
+            )
+            .join(VendaMobile, ItemVendaMobile.venda_id == VendaMobile.id)
+            .where(VendaMobile.turno_id == turno.id)
+            .group_by(ItemVendaMobile.nome_produto, ItemVendaMobile.familia_produto)
+            .order_by(ItemVendaMobile.nome_produto)
+        )
+        items_summary = (await session.execute(stmt_items)).all()
+        
+        # Formatting functions
+        def format_currency(val) -> str:
+            return f"R$ {float(val):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            
+        def format_datetime_br(dt) -> str:
+            if not dt:
+                return ""
+            # simple BR formatting
+            return dt.strftime("%d/%m/%Y %H:%M:%S")
+            
+        rows_forma = "".join(
+            f"<tr><td>{forma}</td><td class='text-right'>{format_currency(valor)}</td></tr>"
+            for forma, valor in por_forma.items() if valor > 0
+        )
+        if not rows_forma:
+            rows_forma = "<tr><td colspan='2' style='text-align: center; color: #777;'>Nenhuma venda no período.</td></tr>"
+
+        rows_items = "".join(
+            f"<tr><td>{row[0]}</td><td>{row[1]}</td><td class='text-center'>{row[2]}</td><td class='text-right'>{format_currency(row[3])}</td></tr>"
+            for row in items_summary
+        )
+        if not rows_items:
+            rows_items = "<tr><td colspan='4' style='text-align: center; color: #777;'>Nenhum item vendido.</td></tr>"
+            
+        html_str = f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+  <meta charset="UTF-8">
+  <title>Fechamento de Caixa - {local.nome}</title>
+  <style>
+    @page {{
+      size: A4 portrait;
+      margin: 2cm;
+      @bottom-right {{
+        content: "Página " counter(page) " de " counter(pages);
+        font-size: 10pt;
+        color: #666;
+      }}
+    }}
+    body {{
+      font-family: Arial, sans-serif;
+      color: #333;
+      font-size: 11pt;
+    }}
+    h1 {{
+      color: #206bc4;
+      text-align: center;
+      margin-bottom: 5px;
+    }}
+    .header-info {{
+      text-align: center;
+      margin-bottom: 30px;
+      color: #555;
+      font-size: 10pt;
+      border-bottom: 2px solid #206bc4;
+      padding-bottom: 15px;
+    }}
+    .section-title {{
+      font-size: 13pt;
+      font-weight: bold;
+      color: #206bc4;
+      margin-top: 25px;
+      margin-bottom: 10px;
+      border-bottom: 1px solid #e0e0e0;
+      padding-bottom: 5px;
+    }}
+    table {{
+      width: 100%;
+      border-collapse: collapse;
+      margin-bottom: 20px;
+      font-size: 10pt;
+    }}
+    th, td {{
+      padding: 6px 8px;
+      border-bottom: 1px solid #e0e0e0;
+      text-align: left;
+    }}
+    th {{
+      background-color: #f8f9fa;
+      font-weight: bold;
+    }}
+    .text-right {{
+      text-align: right;
+    }}
+    .text-center {{
+      text-align: center;
+    }}
+    .text-strong {{
+      font-weight: bold;
+    }}
+    .total-box {{
+      background-color: #f8f9fa;
+      border: 1px solid #e0e0e0;
+      padding: 15px;
+      margin-top: 30px;
+      text-align: right;
+      font-size: 12pt;
+    }}
+  </style>
+</head>
+<body>
+  <h1>Relatório de Fechamento de Caixa</h1>
+  <div class="header-info">
+    <strong>PDV:</strong> {local.nome} &nbsp;&nbsp;|&nbsp;&nbsp; <strong>Evento:</strong> {evento_nome}<br>
+    <strong>Turno:</strong> #{turno.id} &nbsp;&nbsp;|&nbsp;&nbsp; <strong>Status:</strong> FECHADO<br>
+    <strong>Abertura:</strong> {format_datetime_br(turno.aberto_em)} ({turno.aberto_por.username if turno.aberto_por else 'Sistema'})<br>
+    <strong>Fechamento:</strong> {format_datetime_br(turno.fechado_em)} ({turno.fechado_por.username if turno.fechado_por else 'Sistema'})
+  </div>
+
+  <div class="section-title">Resumo por Forma de Pagamento</div>
+  <table>
+    <thead>
+      <tr>
+        <th>Forma de Pagamento</th>
+        <th class="text-right">Valor Total</th>
+      </tr>
+    </thead>
+    <tbody>
+      {rows_forma}
+      <tr class="text-strong">
+        <td>Total Geral</td>
+        <td class="text-right">{format_currency(total_vendas_sum)}</td>
+      </tr>
+    </tbody>
+  </table>
+
+  <div class="section-title">Itens Vendidos (Consolidado)</div>
+  <table>
+    <thead>
+      <tr>
+        <th>Produto</th>
+        <th>Família</th>
+        <th class="text-center">Quantidade</th>
+        <th class="text-right">Total</th>
+      </tr>
+    </thead>
+    <tbody>
+      {rows_items}
+    </tbody>
+  </table>
+
+  <div class="total-box">
+    <strong>Total do Caixa a Conciliar:</strong> <span class="text-strong" style="color: #2fb344; font-size: 14pt;">{format_currency(total_vendas_sum)}</span>
+  </div>
+</body>
+</html>
+"""
+        return html_str
@@ -2,17 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
 from datetime import UTC, datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, or_, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.auth.dependencies import CurrentUser, EventoAtualId, require_scopes
+from app.auth.dependencies import (
+    CurrentUser,
+    EventoAtualId,
+    TokenPayload,
+    bearer_scheme,
+    get_current_user,
+    get_token_payload,
+    require_scopes,
+)
+from app.auth.jwt import InvalidTokenError, create_stream_ticket, decode_token
+from app.auth.principal import Principal
+from app.config import settings
+from app.db.paginacao import decode_cursor, encode_cursor
+from app.db.search import documento_busca, filtro_busca
 from app.db.session import get_session
-from app.finance.models import LancamentoFinanceiro
 from app.pos.models import (
     EntradaEstoqueLocal,
     FamiliaVenda,
@@ -21,7 +38,9 @@ from app.pos.models import (
     ProdutoLocal,
     VendaMobile,
 )
+from app.pos.relatorios import RelatorioTurnoService
 from app.pos.schemas import (
+    CatalogoPDV,
     EntradaEstoqueLocalCreate,
     EntradaEstoqueLocalOut,
     FamiliaVendaCreate,
@@ -34,12 +53,22 @@ from app.pos.schemas import (
     ProdutoLocalCreate,
     ProdutoLocalOut,
     ProdutoLocalUpdate,
+    RelatorioTurnoStatus,
     TransferenciaEstoqueLocalCreate,
     TransferenciaEstoqueLocalOut,
     VendaCreate,
+    VendaLoteCreate,
+    VendaLoteOut,
     VendaOut,
 )
-from app.pos.services import TransferenciaEstoqueLocalService, VendaService
+from app.pos.services import (
+    CatalogoPDVService,
+    PDVDashboardService,
+    ResumoTurnoService,
+    TransferenciaEstoqueLocalService,
+    VendaService,
+)
+from app.pos.stream import broker, formatar_sse
 
 router = APIRouter(prefix="/pos", tags=["pos"])
 
@@ -87,213 +116,9 @@ async def pos_dashboard(
     mes: str | None = Query(default=None),
     evento_filtro_id: int | None = Query(default=None),
 ):
-    from decimal import Decimal
-
-    from app.core.models import Evento
-
     eid = evento_filtro_id if evento_filtro_id is not None else _require_evento(evento_id)
-
-    # 1. Fetch matching sales for KPIs and Vendas tab
-    stmt = (
-        select(VendaMobile)
-        .options(
-            selectinload(VendaMobile.itens)
-            .selectinload(ItemVendaMobile.produto_local)
-            .selectinload(ProdutoLocal.produto),
-            selectinload(VendaMobile.pagamentos),
-        )
-        .where(VendaMobile.evento_id == eid)
-    )
-    if local_id is not None:
-        stmt = stmt.where(VendaMobile.local_id == local_id)
-    if mes is not None and mes != "Todos":
-        stmt = stmt.where(func.extract("month", VendaMobile.data_hora) == int(mes))
-
-    vendas = (await session.execute(stmt)).scalars().unique().all()
-
-    # 2. Fetch products for Estoque tab
-    prod_stmt = (
-        select(ProdutoLocal)
-        .join(LocalVenda, ProdutoLocal.local_id == LocalVenda.id)
-        .options(
-            selectinload(ProdutoLocal.produto),
-            selectinload(ProdutoLocal.familia),
-        )
-        .where(LocalVenda.evento_id == eid)
-    )
-    if local_id is not None:
-        prod_stmt = prod_stmt.where(ProdutoLocal.local_id == local_id)
-
-    produtos_local = (await session.execute(prod_stmt)).scalars().all()
-
-    # --- Calculations ---
-    # Visão Geral KPIs
-    receita_total = sum(v.total for v in vendas)
-    itens_vendidos = sum(sum(item.quantidade for item in v.itens) for v in vendas)
-    itens_estoque = sum(p.estoque_atual for p in produtos_local)
-    valor_estoque_venda = sum(p.estoque_atual * p.preco_venda for p in produtos_local)
-
-    # Faturamento por Evento (R$)
-    evt_stmt = (
-        select(Evento.nome, func.sum(VendaMobile.total))
-        .join(VendaMobile, Evento.id == VendaMobile.evento_id)
-    )
-    if local_id is not None:
-        evt_stmt = evt_stmt.where(VendaMobile.local_id == local_id)
-    if mes is not None and mes != "Todos":
-        evt_stmt = evt_stmt.where(func.extract("month", VendaMobile.data_hora) == int(mes))
-    evt_stmt = evt_stmt.group_by(Evento.nome)
-
-    evt_rows = (await session.execute(evt_stmt)).all()
-    faturamento_por_evento = {r[0]: Decimal(str(r[1])) for r in evt_rows}
-
-    # Vendas por Mês (R$)
-    mes_stmt = (
-        select(func.extract("month", VendaMobile.data_hora), func.sum(VendaMobile.total))
-        .where(VendaMobile.evento_id == eid)
-    )
-    if local_id is not None:
-        mes_stmt = mes_stmt.where(VendaMobile.local_id == local_id)
-    mes_stmt = mes_stmt.group_by(func.extract("month", VendaMobile.data_hora))
-
-    mes_rows = (await session.execute(mes_stmt)).all()
-    nomes_meses_abrev = {
-        1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
-        7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"
-    }
-    vendas_por_mes = {}
-    for r in mes_rows:
-        m_idx = int(r[0])
-        if m_idx in nomes_meses_abrev:
-            vendas_por_mes[nomes_meses_abrev[m_idx]] = Decimal(str(r[1]))
-
-    # Top/Bottom 10 mais/menos vendidos (Qtd e Receita)
-    qtd_por_prod = {}
-    rec_por_prod = {}
-    for pl in produtos_local:
-        if pl.produto:
-            qtd_por_prod[pl.produto.nome] = 0
-            rec_por_prod[pl.produto.nome] = Decimal("0.00")
-
-    for v in vendas:
-        for item in v.itens:
-            nome = item.nome_produto
-            if nome not in qtd_por_prod:
-                qtd_por_prod[nome] = 0
-                rec_por_prod[nome] = Decimal("0.00")
-            qtd_por_prod[nome] += item.quantidade
-            rec_por_prod[nome] += item.total_item
-
-    sorted_prods = sorted(qtd_por_prod.keys(), key=lambda k: qtd_por_prod[k], reverse=True)
-    top_10_mais_vendidos = [
-        {"nome": name, "qtd": qtd_por_prod[name], "receita": rec_por_prod[name]}
-        for name in sorted_prods[:10]
-    ]
-
-    sorted_prods_asc = sorted(qtd_por_prod.keys(), key=lambda k: qtd_por_prod[k])
-    top_10_menos_vendidos = [
-        {"nome": name, "qtd": qtd_por_prod[name], "receita": rec_por_prod[name]}
-        for name in sorted_prods_asc[:10]
-    ]
-
-    # Vendas Tab KPIs
-    total_vendas = len(vendas)
-    ticket_medio = receita_total / total_vendas if total_vendas > 0 else Decimal("0.00")
-
-    custo_total_vendas = Decimal("0.00")
-    for v in vendas:
-        for item in v.itens:
-            custo_unit = Decimal("0.00")
-            if item.produto_local and item.produto_local.produto:
-                custo_unit = item.produto_local.produto.custo_medio_atual
-            custo_total_vendas += custo_unit * item.quantidade
-
-    lucro_liquido = receita_total - custo_total_vendas
-
-    # Vendas por Pagamento (R$)
-    vendas_por_pagamento = {"DINHEIRO": Decimal("0.00"), "DÉBITO": Decimal("0.00"), "CRÉDITO": Decimal("0.00"), "PIX": Decimal("0.00")}
-    for v in vendas:
-        for p in v.pagamentos:
-            tipo = p.tipo.upper()
-            if tipo in vendas_por_pagamento:
-                vendas_por_pagamento[tipo] += p.valor
-
-    # Receita por Família (R$)
-    receita_por_familia = {}
-    for v in vendas:
-        for item in v.itens:
-            fam = item.familia_produto or "Sem Família"
-            receita_por_familia[fam] = receita_por_familia.get(fam, Decimal("0.00")) + item.total_item
-
-    # Top 10 Margem de Lucro (%)
-    margem_por_produto = []
-    for pl in produtos_local:
-        if pl.produto and pl.preco_venda > 0 and pl.produto.custo_medio_atual > 0:
-            margem = ((pl.preco_venda - pl.produto.custo_medio_atual) / pl.produto.custo_medio_atual) * 100
-            margem_por_produto.append({
-                "nome": pl.produto.nome,
-                "margem": margem
-            })
-    top_10_margem_lucro = sorted(margem_por_produto, key=lambda x: x["margem"], reverse=True)[:10]
-
-    # Estoque Tab KPIs
-    custo_total_estoque = sum(p.estoque_atual * (p.produto.custo_medio_atual if p.produto else 0) for p in produtos_local)
-    valor_potencial_venda = valor_estoque_venda
-
-    # Estoque por Família (Qtd e Custo)
-    estoque_por_familia_qtd = {}
-    custo_por_familia_valor = {}
-    for pl in produtos_local:
-        fam = pl.familia.nome if pl.familia else "Sem Família"
-        custo = pl.produto.custo_medio_atual if pl.produto else Decimal("0.00")
-        estoque_por_familia_qtd[fam] = estoque_por_familia_qtd.get(fam, Decimal("0.00")) + pl.estoque_atual
-        custo_por_familia_valor[fam] = custo_por_familia_valor.get(fam, Decimal("0.00")) + (pl.estoque_atual * custo)
-
-    # Produtos com Baixo Estoque
-    produtos_baixo_estoque = []
-    for pl in produtos_local:
-        if pl.produto and pl.estoque_atual <= pl.ponto_reabastecimento:
-            status = "Ruptura de Estoque" if pl.estoque_atual < pl.estoque_minimo else "Reabastecer"
-            produtos_baixo_estoque.append({
-                "codigo": pl.produto.sku or str(pl.produto.id),
-                "nome": pl.produto.nome,
-                "familia": pl.familia.nome if pl.familia else "Sem Família",
-                "status": status,
-                "estoque": pl.estoque_atual
-            })
-    produtos_baixo_estoque = sorted(produtos_baixo_estoque, key=lambda x: x["estoque"])
-
-    return PDVDashboard(
-        total_vendas_hoje=receita_total,
-        quantidade_vendas_hoje=total_vendas,
-        ticket_medio=ticket_medio,
-        top_produtos=top_10_mais_vendidos,
-        vendas_por_pagamento=vendas_por_pagamento,
-
-        receita_total=receita_total,
-        itens_vendidos=itens_vendidos,
-        itens_estoque=itens_estoque,
-        valor_estoque_venda=valor_estoque_venda,
-        faturamento_por_evento=faturamento_por_evento,
-        vendas_por_mes=vendas_por_mes,
-        top_10_mais_vendidos=top_10_mais_vendidos,
-        top_10_menos_vendidos=top_10_menos_vendidos,
-
-        lucro_liquido=lucro_liquido,
-        receita_operacional=receita_total,
-        total_vendas=total_vendas,
-        receita_por_familia=receita_por_familia,
-        ranking_mais_vendidos=top_10_mais_vendidos,
-        top_10_margem_lucro=top_10_margem_lucro,
-
-        custo_total_estoque=custo_total_estoque,
-        itens_fisicos_totais=itens_estoque,
-        valor_potencial_venda=valor_potencial_venda,
-        estoque_por_familia_qtd=estoque_por_familia_qtd,
-        custo_por_familia_valor=custo_por_familia_valor,
-        produtos_baixo_estoque=produtos_baixo_estoque,
-    )
-
+    data = await PDVDashboardService.dashboard(session, eid, local_id=local_id, mes=mes)
+    return PDVDashboard(**data)
 
 
 # ---------------------------------------------------------------------------
@@ -401,6 +226,92 @@ async def fechar_caixa(
         raise HTTPException(status_code=500, detail=f"Erro interno ao fechar caixa: {e}")
 
 
+@router.get("/turnos/{turno_id}/relatorio", response_model=RelatorioTurnoStatus)
+async def status_relatorio_turno(
+    turno_id: int,
+    user: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """Consulta a geração do PDF de fechamento (preenchido após o fechamento)."""
+    try:
+        return await RelatorioTurnoService.status(session, turno_id)
+    except ValueError as exc:
+        raise HTTPException(404, str(exc)) from exc
+
+
+async def _usuario_do_stream(
+    request: Request,
+    local_id: int,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
+    ticket: str | None = Query(default=None, description="Ticket de POST /pos/stream/ticket"),
+) -> Principal:
+    """Bearer (clientes fetch) ou `?ticket=` (EventSource do navegador não envia headers)."""
+    if ticket is None:
+        payload = await get_token_payload(credentials)
+    else:
+        try:
+            payload = decode_token(ticket)
+        except InvalidTokenError as exc:
+            raise HTTPException(401, "Ticket inválido ou expirado") from exc
+        if payload.get("type") != "pos_stream" or payload.get("local_id") != local_id:
+            raise HTTPException(401, "Ticket não vale para este local")
+    return await get_current_user(request, payload, session)
+
+
+@router.post("/stream/ticket")
+async def stream_ticket(local_id: int, user: CurrentUser, payload: TokenPayload) -> dict[str, object]:
+    """Ticket de curta duração para `new EventSource('/pos/stream?local_id=..&ticket=..')`.
+
+    Só vale na abertura da conexão: ao reconectar depois de um erro o cliente
+    pede outro ticket.
+    """
+    return {
+        "ticket": create_stream_ticket(user.id, local_id=local_id, sessao=payload.get("sid")),
+        "expira_em_segundos": settings.POS_STREAM_TICKET_SEGUNDOS,
+    }
+
+
+@router.get("/stream")
+async def stream_pdv(
+    local_id: int,
+    request: Request,
+    user: Annotated[Principal, Depends(_usuario_do_stream)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """SSE com estoque, preço e abertura/fechamento de caixa do local.
+
+    Eventos: `produto` (operacao INSERT/UPDATE/DELETE, id, estoque_atual,
+    preco_venda, ativo, versao; em INSERT/DELETE o terminal busca o catálogo
+    com `?desde`), `caixa` (caixa_aberto, turno_id) e `resync` (o terminal deve
+    recarregar o catálogo, ex.: após reconexão do LISTEN).
+    """
+    existe = (
+        await session.execute(select(LocalVenda.id).where(LocalVenda.id == local_id))
+    ).scalar_one_or_none()
+    if existe is None:
+        raise HTTPException(404, "Local não encontrado")
+    # O stream pode durar horas: não segura uma conexão do pool enquanto isso.
+    await session.close()
+
+    async def eventos():
+        async with broker.assinar(local_id) as fila:
+            yield ": conectado\n\n"
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(fila.get(), timeout=15)
+                except TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield formatar_sse(evento)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/locais/{local_id}/caixa-atual")
 async def obter_resumo_caixa_atual(
     local_id: int,
@@ -417,27 +328,13 @@ async def obter_resumo_caixa_atual(
             "por_forma": {},
         }
 
-    stmt = select(VendaMobile).where(
-        VendaMobile.turno_id == local.caixa_atual_turno_id,
-    )
-    result = await session.execute(stmt)
-    vendas = result.scalars().all()
-
-    total_vendas = len(vendas)
-    soma_total = float(sum(v.total for v in vendas))
-
-    por_forma = {}
-    for v in vendas:
-        for p in v.pagamentos:
-            tipo = p.tipo
-            por_forma[tipo] = por_forma.get(tipo, 0.0) + float(p.valor)
-
+    resumo = await ResumoTurnoService.obter(session, local.caixa_atual_turno_id)
     return {
         "caixa_aberto": True,
         "aberto_em": local.caixa_aberto_em,
-        "total_vendas": total_vendas,
-        "soma_total": soma_total,
-        "por_forma": por_forma,
+        "total_vendas": resumo["total_vendas"],
+        "soma_total": float(resumo["soma_total"]),
+        "por_forma": {tipo: float(valor) for tipo, valor in resumo["por_forma"].items()},
     }
 
 
@@ -522,6 +419,33 @@ async def listar_produtos_local(
     return out
 
 
+@router.get("/locais/{local_id}/catalogo", response_model=CatalogoPDV)
+async def catalogo_local(
+    local_id: int,
+    user: CurrentUser,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    response: Response,
+    desde: int | None = Query(default=None, ge=0, description="Versão já conhecida: devolve só o delta"),
+    if_none_match: str | None = Header(default=None),
+):
+    """Catálogo compacto para boot/sincronização dos terminais do PDV.
+
+    O ETag é a versão do catálogo; com If-None-Match igual à versão atual a
+    resposta é 304 sem montar nada.
+    """
+    versao = await CatalogoPDVService.versao(session, local_id)
+    if versao is None:
+        raise HTTPException(404, "Local não encontrado")
+    headers = {"ETag": f'"{local_id}-{versao}"', "Cache-Control": "private, no-cache"}
+    if if_none_match is not None and headers["ETag"] in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    data = await CatalogoPDVService.catalogo(session, local_id, versao, desde=desde)
+    headers["ETag"] = f'"{local_id}-{data["versao"]}"'
+    response.headers.update(headers)
+    return data
+
+
 @router.post("/locais/{local_id}/produtos", response_model=ProdutoLocalOut, status_code=201)
 async def criar_produto_local(
     local_id: int,
@@ -650,46 +574,64 @@ async def listar_vendas(
     local_id: int | None = None,
     familia: str | None = Query(default=None),
     produto: str | None = Query(default=None),
+    cursor: str | None = Query(default=None, description="next_cursor da página anterior (ignora page)"),
+    incluir_total: bool = Query(default=True, description="Calcula o total exato (COUNT)"),
 ):
+    """Lista vendas da mais recente para a mais antiga.
+
+    Com `cursor` a paginação é por keyset em (data_hora, id), apoiada pelo índice
+    ix_vendamobile_evento_local_data: o custo não cresce com a profundidade da
+    página. `page` (OFFSET) continua aceito para clientes antigos.
+    """
     eid = _require_evento(evento_id)
-    base = select(VendaMobile).where(VendaMobile.evento_id == eid)
-    count_base = select(func.count()).select_from(VendaMobile).where(VendaMobile.evento_id == eid)
+    filtros = [VendaMobile.evento_id == eid]
     if local_id is not None:
-        base = base.where(VendaMobile.local_id == local_id)
-        count_base = count_base.where(VendaMobile.local_id == local_id)
+        filtros.append(VendaMobile.local_id == local_id)
 
     item_filters = []
     if familia:
         item_filters.append(ItemVendaMobile.familia_produto == familia)
-    if produto:
-        termo = f"%{produto.strip()}%"
+    if produto and produto.strip():
         item_filters.append(
-            or_(
-                ItemVendaMobile.nome_produto.ilike(termo),
-                ItemVendaMobile.codigo_produto.ilike(termo),
+            filtro_busca(
+                documento_busca(ItemVendaMobile.nome_produto, ItemVendaMobile.codigo_produto),
+                produto,
             )
         )
     if item_filters:
-        base = base.join(ItemVendaMobile, ItemVendaMobile.venda_id == VendaMobile.id).where(*item_filters).distinct()
-        count_base = (
-            select(func.count(func.distinct(VendaMobile.id)))
-            .select_from(VendaMobile)
-            .join(ItemVendaMobile, ItemVendaMobile.venda_id == VendaMobile.id)
-            .where(VendaMobile.evento_id == eid, *item_filters)
+        # EXISTS em vez de JOIN + DISTINCT: cada venda aparece uma vez e o COUNT dispensa DISTINCT
+        filtros.append(
+            select(ItemVendaMobile.id)
+            .where(ItemVendaMobile.venda_id == VendaMobile.id, *item_filters)
+            .exists()
         )
-        if local_id is not None:
-            count_base = count_base.where(VendaMobile.local_id == local_id)
 
-    total = (await session.execute(count_base)).scalar_one()
-    offset = (page - 1) * page_size
-    result = await session.execute(
-        base.options(selectinload(VendaMobile.itens), selectinload(VendaMobile.pagamentos))
-        .order_by(VendaMobile.data_hora.desc())
-        .offset(offset)
-        .limit(page_size)
+    total = None
+    if incluir_total:
+        total = (
+            await session.execute(select(func.count()).select_from(VendaMobile).where(*filtros))
+        ).scalar_one()
+
+    stmt = (
+        select(VendaMobile)
+        .options(selectinload(VendaMobile.itens), selectinload(VendaMobile.pagamentos))
+        .where(*filtros)
+        .order_by(VendaMobile.data_hora.desc(), VendaMobile.id.desc())
+        .limit(page_size + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(tuple_(VendaMobile.data_hora, VendaMobile.id) < decode_cursor(cursor))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+    items = list((await session.execute(stmt)).scalars().all())
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1].data_hora, items[-1].id)
+    return PaginatedVendas(
+        items=items, total=total, page=page, page_size=page_size, next_cursor=next_cursor
     )
-    items = result.scalars().unique().all()
-    return PaginatedVendas(items=items, total=total, page=page, page_size=page_size)
 
 
 @router.delete("/vendas/{venda_id}", status_code=204)
@@ -699,52 +641,12 @@ async def deletar_venda(
     evento_id: EventoAtualId,
     session: Annotated[AsyncSession, Depends(get_session)],
 ):
-    result = await session.execute(
-        select(VendaMobile)
-        .options(selectinload(VendaMobile.itens), selectinload(VendaMobile.pagamentos))
-        .where(VendaMobile.id == venda_id, VendaMobile.evento_id == _require_evento(evento_id))
-    )
-    venda = result.scalars().unique().first()
-    if venda is None:
-        raise HTTPException(404, "Venda não encontrada")
-
-    if venda.turno_id:
-        from app.pos.models import TurnoCaixa
-        turno = await session.get(TurnoCaixa, venda.turno_id)
-        if turno and turno.fechado:
-            raise HTTPException(400, "Não é possível excluir uma venda de um caixa já fechado")
-
-    for item in venda.itens:
-        if item.produto_local_id is None:
-            continue
-        pl = (
-            await session.execute(
-                select(ProdutoLocal)
-                .where(ProdutoLocal.id == item.produto_local_id)
-                .with_for_update()
-            )
-        ).scalar_one_or_none()
-        if pl is not None:
-            pl.estoque_atual += item.quantidade
-
-    lancamentos = (
-        await session.execute(
-            select(LancamentoFinanceiro).where(
-                LancamentoFinanceiro.evento_id == venda.evento_id,
-                LancamentoFinanceiro.setor_origem == "pos",
-                LancamentoFinanceiro.descricao.ilike(f"%Venda PDV #{venda.id_referencia[:8]}%"),
-            )
-        )
-    ).scalars().all()
-    for lancamento in lancamentos:
-        await session.delete(lancamento)
-
-    for pagamento in list(venda.pagamentos):
-        await session.delete(pagamento)
-    for item in list(venda.itens):
-        await session.delete(item)
-    await session.delete(venda)
-    await session.flush()
+    try:
+        await VendaService.excluir(session, venda_id=venda_id, evento_id=_require_evento(evento_id))
+    except NoResultFound as exc:
+        raise HTTPException(404, "Venda não encontrada") from exc
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
     return None
 
 
@@ -765,6 +667,30 @@ async def criar_venda(
     return venda
 
 
+@router.post("/vendas/lote", response_model=VendaLoteOut)
+async def criar_vendas_lote(
+    user: Annotated[CurrentUser, Depends(require_scopes("pos:write"))],
+    evento_id: EventoAtualId,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    payload: VendaLoteCreate,
+):
+    """Replay offline do PDV: cria várias vendas de uma vez, com status por venda."""
+    eid = _require_evento(evento_id)
+    try:
+        resultados = await VendaService.criar_lote(
+            session, evento_id=eid, vendedor_id=user.id, vendas=payload.vendas
+        )
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
+    contagem = Counter(resultado["status"] for resultado in resultados)
+    return VendaLoteOut(
+        resultados=resultados,
+        criadas=contagem[VendaService.LOTE_CRIADA],
+        duplicadas=contagem[VendaService.LOTE_DUPLICADA],
+        rejeitadas=contagem[VendaService.LOTE_REJEITADA],
+    )
+
+
 @router.get("/vendas/{venda_id}", response_model=VendaOut)
 async def obter_venda(
     venda_id: int,
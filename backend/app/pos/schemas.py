@@ -97,6 +97,28 @@ class ProdutoLocalOut(_BaseModel):
     familia_nome: str = ""
 
 
+class CatalogoItem(BaseModel):
+    id: int
+    produto_id: int
+    nome: str
+    sku: str
+    familia_id: int | None
+    familia: str
+    preco_venda: Decimal
+    estoque_atual: Decimal
+    ativo: bool
+    versao: int
+
+
+class CatalogoPDV(BaseModel):
+    """Catálogo compacto do PDV. Com `completo=false` traz só o delta desde `desde`."""
+
+    local_id: int
+    versao: int
+    completo: bool
+    itens: list[CatalogoItem]
+
+
 class ProdutoLocalCreate(BaseModel):
     produto_id: int
     familia_id: int | None = None
@@ -159,6 +181,13 @@ class TransferenciaEstoqueLocalOut(_BaseModel):
     criado_em: datetime
 
 
+class RelatorioTurnoStatus(BaseModel):
+    turno_id: int
+    status: str | None = Field(default=None, description="PENDENTE | PROCESSANDO | PRONTO | ERRO")
+    relatorio_pdf: str | None = None
+    erro: str | None = None
+
+
 # --------------------------- VendaMobile ---------------------------
 
 
@@ -202,6 +231,26 @@ class VendaCreate(BaseModel):
     pagamentos: list[PagamentoIn] = Field(min_length=1)
 
 
+class VendaLoteCreate(BaseModel):
+    """Lote de vendas reenviado pelo PDV ao voltar a ficar online."""
+
+    vendas: list[VendaCreate] = Field(min_length=1, max_length=500)
+
+
+class VendaLoteResultado(BaseModel):
+    id_referencia: str
+    status: str = Field(description="criada | duplicada | rejeitada")
+    venda_id: int | None = None
+    motivo: str | None = None
+
+
+class VendaLoteOut(BaseModel):
+    resultados: list[VendaLoteResultado]
+    criadas: int
+    duplicadas: int
+    rejeitadas: int
+
+
 class ItemVendaOut(_BaseModel):
     id: int
     produto_local_id: int | None
@@ -236,9 +285,12 @@ class VendaOut(_BaseModel):
 
 class PaginatedVendas(BaseModel):
     items: list[VendaOut]
-    total: int
+    # None quando a listagem é pedida com incluir_total=false
+    total: int | None
     page: int
     page_size: int
+    # Cursor opaco para a próxima página (keyset); None na última página
+    next_cursor: str | None = None
 
 
 # --------------------------- PDV Dashboard ---------------------------
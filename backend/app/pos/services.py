@@ -1,7 +1,10 @@
 """Services do módulo POS (PDV).
 
-VendaService - cria venda, valida estoque, baixa sub-estoque, registra pagamentos.
+VendaService - cria venda (ou lote de vendas), valida estoque, baixa sub-estoque, registra pagamentos.
+ResumoTurnoService - totais correntes do turno de caixa (por forma de pagamento).
 EntradaLocalService - entrada de mercadoria em sub-estoque local.
+PDVDashboardService - KPIs do dashboard do PDV calculados por agregação SQL.
+CatalogoPDVService - catálogo versionado do PDV (ETag / delta) para os terminais.
 """
 
 from __future__ import annotations
@@ -9,20 +12,28 @@ from __future__ import annotations
 from datetime import datetime, UTC
 from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import Integer, any_, case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.models import ConfiguracaoEvento, Evento
+from app.finance.models import AnexoLancamento, LancamentoFinanceiro
+from app.inventory.models import Produto
 from app.inventory.services import EstoqueService
 from app.pos.finance_integration import POSFinanceIntegration
 from app.pos.models import (
     EntradaEstoqueLocal,
+    FamiliaVenda,
     ItemVendaMobile,
     LocalVenda,
     PagamentoVenda,
     ProdutoLocal,
+    ResumoTurnoPagamento,
     TransferenciaEstoqueLocal,
+    TurnoCaixa,
     VendaMobile,
 )
 from app.pos.schemas import (
@@ -36,6 +47,10 @@ from app.pos.schemas import (
 class VendaService:
     """Cria e confirma vendas do PDV."""
 
+    LOTE_CRIADA = "criada"
+    LOTE_DUPLICADA = "duplicada"
+    LOTE_REJEITADA = "rejeitada"
+
     @staticmethod
     async def _validar_evento_para_venda(session: AsyncSession, evento_id: int) -> None:
         evento = await session.get(Evento, evento_id)
@@ -56,9 +71,9 @@ class VendaService:
             raise ValueError("Local de venda obrigatório")
         local = (
             await session.execute(
-                select(LocalVenda).where(
-                    LocalVenda.id == local_id,
-                ).with_for_update()
+                select(LocalVenda)
+                .where(LocalVenda.id == local_id)
+                .with_for_update()
             )
         ).scalar_one_or_none()
         if local is None:
@@ -69,6 +84,80 @@ class VendaService:
             raise ValueError("Caixa fechado - abra o caixa antes de vender")
         return local
 
+    @staticmethod
+    async def _travar_produtos(session: AsyncSession, produto_ids: list[int]) -> dict[int, ProdutoLocal]:
+        """Trava os ProdutoLocal informados num único SELECT ... FOR UPDATE.
+
+        Os locks saem em ordem de id (evita deadlock entre caixas concorrentes).
+        Produto e família vêm por JOIN, que é tudo o que a venda lê deles.
+        """
+        if not produto_ids:
+            return {}
+        result = await session.execute(
+            select(ProdutoLocal)
+            .options(
+                joinedload(ProdutoLocal.produto, innerjoin=True),
+                joinedload(ProdutoLocal.familia),
+            )
+            .where(
+                ProdutoLocal.id == any_(literal(sorted(set(produto_ids)), ARRAY(Integer))),
+                ProdutoLocal.ativo.is_(True),
+            )
+            .order_by(ProdutoLocal.id)
+            .with_for_update(of=ProdutoLocal)
+            .execution_options(populate_existing=True)
+        )
+        return {pl.id: pl for pl in result.scalars().all()}
+
+    @staticmethod
+    async def _baixar_estoque(session: AsyncSession, baixas: dict[int, Decimal]) -> None:
+        """Subtrai as quantidades de cada ProdutoLocal com um único UPDATE.
+
+        Não mexe nos objetos da sessão: quem chama já travou as linhas e mantém
+        estoque_atual em memória coerente (set_committed_value).
+        """
+        if not baixas:
+            return
+        await session.execute(
+            update(ProdutoLocal)
+            .where(ProdutoLocal.id == any_(literal(sorted(baixas), ARRAY(Integer))))
+            .values(estoque_atual=ProdutoLocal.estoque_atual - case(baixas, value=ProdutoLocal.id))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _precificar_item(local: LocalVenda, item: ItemVendaIn, pl: ProdutoLocal | None) -> Decimal:
+        """Valida o item contra o ProdutoLocal já travado e devolve o total do item."""
+        if pl is None or not pl.produto.ativo:
+            raise ValueError("Produto não pertence ao local ou está inativo")
+        if item.desconto_perc > 0 and not local.permite_desconto:
+            raise ValueError("Descontos não são permitidos neste local")
+        if item.desconto_perc > Decimal(local.desconto_maximo_perc):
+            raise ValueError(f"Desconto máximo permitido: {local.desconto_maximo_perc}%")
+        qtd = Decimal(item.quantidade)
+        if pl.estoque_atual < qtd:
+            raise ValueError(
+                f"Estoque insuficiente: {pl.produto.nome} "
+                f"(disponível {pl.estoque_atual}, solicitado {qtd})"
+            )
+        preco_bruto = pl.preco_venda * qtd
+        desconto_valor = preco_bruto * (item.desconto_perc / Decimal("100"))
+        return preco_bruto - desconto_valor
+
+    @staticmethod
+    def _forma_pagamento(local: LocalVenda, payload: VendaCreate, total_itens: Decimal) -> str:
+        total_pagamentos = sum(p.valor for p in payload.pagamentos)
+        if total_pagamentos != total_itens:
+            raise ValueError(
+                f"Pagamentos (R$ {total_pagamentos}) não conferem com o total (R$ {total_itens})"
+            )
+        tipos_pagamento = {p.tipo for p in payload.pagamentos}
+        if len(tipos_pagamento) > 1 and not local.permite_pagamento_misto:
+            raise ValueError("Pagamento misto não é permitido neste local")
+        if len(tipos_pagamento) == 1:
+            return tipos_pagamento.pop()
+        return "MISTO"
+
     @staticmethod
     async def criar(session: AsyncSession, *, evento_id: int, vendedor_id: int, payload: VendaCreate) -> VendaMobile:
         await VendaService._validar_evento_para_venda(session, evento_id)
@@ -92,57 +181,20 @@ class VendaService:
         produto_ids = [item.produto_local_id for item in payload.itens]
         if len(produto_ids) != len(set(produto_ids)):
             raise ValueError("O mesmo produto não pode aparecer mais de uma vez na venda")
+        if any(produto_id is None for produto_id in produto_ids):
+            raise ValueError("Todos os itens devem estar vinculados ao estoque do local")
 
-        # Ordem estável de locks reduz a chance de deadlock entre caixas concorrentes.
-        for item in sorted(payload.itens, key=lambda value: value.produto_local_id or 0):
-            if item.produto_local_id is None:
-                raise ValueError("Todos os itens devem estar vinculados ao estoque do local")
-            pl = (
-                await session.execute(
-                    select(ProdutoLocal)
-                    .options(selectinload(ProdutoLocal.produto), selectinload(ProdutoLocal.familia))
-                    .where(
-                        ProdutoLocal.id == item.produto_local_id,
-                        ProdutoLocal.local_id == local.id,
-                        ProdutoLocal.ativo.is_(True),
-                    )
-                    .with_for_update()
-                )
-            ).scalar_one_or_none()
-            if pl is None or not pl.produto.ativo:
-                raise ValueError("Produto não pertence ao local ou está inativo")
-            if item.desconto_perc > 0 and not local.permite_desconto:
-                raise ValueError("Descontos não são permitidos neste local")
-            if item.desconto_perc > Decimal(local.desconto_maximo_perc):
-                raise ValueError(f"Desconto máximo permitido: {local.desconto_maximo_perc}%")
-            qtd = Decimal(item.quantidade)
-            if pl.estoque_atual < qtd:
-                raise ValueError(
-                    f"Estoque insuficiente: {pl.produto.nome} "
-                    f"(disponível {pl.estoque_atual}, solicitado {qtd})"
-                )
-            preco_unitario = pl.preco_venda
-            preco_bruto = preco_unitario * qtd
-            desconto_valor = preco_bruto * (item.desconto_perc / Decimal("100"))
-            total_item = preco_bruto - desconto_valor
+        produtos = await VendaService._travar_produtos(session, produto_ids)
+        for item in payload.itens:
+            pl = produtos.get(item.produto_local_id)
+            if pl is not None and pl.local_id != local.id:
+                pl = None
+            total_item = VendaService._precificar_item(local, item, pl)
             total_itens += total_item
-            itens_data.append((item, pl, preco_unitario, total_item))
+            itens_data.append((item, pl, pl.preco_venda, total_item))
 
-        # 2. Validar que pagamentos somam o total
-        total_pagamentos = sum(p.valor for p in payload.pagamentos)
-        if total_pagamentos != total_itens:
-            raise ValueError(
-                f"Pagamentos (R$ {total_pagamentos}) não conferem com o total (R$ {total_itens})"
-            )
-
-        # 3. Determinar forma_pagamento
-        tipos_pagamento = {p.tipo for p in payload.pagamentos}
-        if len(tipos_pagamento) > 1 and not local.permite_pagamento_misto:
-            raise ValueError("Pagamento misto não é permitido neste local")
-        if len(tipos_pagamento) == 1:
-            forma_pagamento = tipos_pagamento.pop()
-        else:
-            forma_pagamento = "MISTO"
+        # 2-3. Validar pagamentos e determinar forma_pagamento
+        forma_pagamento = VendaService._forma_pagamento(local, payload, total_itens)
 
         # 4. Criar VendaMobile
         venda = VendaMobile(
@@ -155,13 +207,10 @@ class VendaService:
             data_hora=datetime.now(UTC),
             turno_id=local.caixa_atual_turno_id,
         )
-        session.add(venda)
-        await session.flush()  # para obter venda.id
-
-        # 5. Criar itens e baixar estoque
-        for item, pl, preco_unitario, total_item in itens_data:
-            item_venda = ItemVendaMobile(
-                venda_id=venda.id,
+        # 5. Itens e pagamentos entram pelas coleções: o flush emite um INSERT
+        # multi-linha por tabela (insertmanyvalues), e a resposta não precisa de refresh.
+        venda.itens = [
+            ItemVendaMobile(
                 produto_local_id=item.produto_local_id,
                 nome_produto=pl.produto.nome,
                 codigo_produto=pl.produto.sku,
@@ -171,20 +220,458 @@ class VendaService:
                 desconto_perc=item.desconto_perc,
                 total_item=total_item,
             )
-            session.add(item_venda)
+            for item, pl, preco_unitario, total_item in itens_data
+        ]
+        venda.pagamentos = [PagamentoVenda(tipo=pgto.tipo, valor=pgto.valor) for pgto in payload.pagamentos]
+        session.add(venda)
 
-            # Baixar sub-estoque local
-            pl.estoque_atual -= Decimal(item.quantidade)
+        # 6. Baixar sub-estoque local num único UPDATE
+        for item, pl, _, _ in itens_data:
+            set_committed_value(pl, "estoque_atual", pl.estoque_atual - Decimal(item.quantidade))
+        await VendaService._baixar_estoque(
+            session, {pl.id: Decimal(item.quantidade) for item, pl, _, _ in itens_data}
+        )
 
-        # 6. Registrar pagamentos
-        for pgto in payload.pagamentos:
-            session.add(PagamentoVenda(venda_id=venda.id, tipo=pgto.tipo, valor=pgto.valor))
+        # 7. Atualizar o resumo corrente do turno na mesma transação
+        if venda.turno_id is not None:
+            await ResumoTurnoService.registrar(
+                session,
+                venda.turno_id,
+                total=total_itens,
+                pagamentos=[(p.tipo, p.valor) for p in payload.pagamentos],
+            )
 
         await session.flush()
-        await session.refresh(venda)
         return venda
 
 
+    @staticmethod
+    async def excluir(session: AsyncSession, *, venda_id: int, evento_id: int) -> None:
+        """Exclui a venda devolvendo o estoque, com um número fixo de statements.
+
+        Não carrega itens nem pagamentos como objetos: o estorno de estoque é um
+        único UPDATE ... FROM sobre os itens agregados por produto, e itens,
+        pagamentos e lançamentos financeiros (via venda_pdv_id) saem com DELETEs
+        em lote.
+        """
+        venda = (
+            await session.execute(
+                select(VendaMobile.id, VendaMobile.total, VendaMobile.turno_id, TurnoCaixa.fechado)
+                .outerjoin(TurnoCaixa, TurnoCaixa.id == VendaMobile.turno_id)
+                .where(VendaMobile.id == venda_id, VendaMobile.evento_id == evento_id)
+                # Trava a venda: duas exclusões simultâneas não devolvem o estoque duas vezes
+                .with_for_update(of=VendaMobile)
+            )
+        ).one_or_none()
+        if venda is None:
+            raise NoResultFound("Venda não encontrada")
+        if venda.fechado:
+            raise ValueError("Não é possível excluir uma venda de um caixa já fechado")
+
+        if venda.turno_id is not None:
+            pagamentos = (
+                await session.execute(
+                    select(PagamentoVenda.tipo, PagamentoVenda.valor).where(PagamentoVenda.venda_id == venda_id)
+                )
+            ).all()
+            await ResumoTurnoService.estornar(
+                session,
+                venda.turno_id,
+                total=venda.total,
+                pagamentos=[(p.tipo, p.valor) for p in pagamentos],
+            )
+
+        # Mesma ordem de locks da criação de vendas (por id) para evitar deadlock
+        await session.execute(
+            select(ProdutoLocal.id)
+            .where(
+                ProdutoLocal.id.in_(
+                    select(ItemVendaMobile.produto_local_id).where(ItemVendaMobile.venda_id == venda_id)
+                )
+            )
+            .order_by(ProdutoLocal.id)
+            .with_for_update()
+        )
+        devolucao = (
+            select(
+                ItemVendaMobile.produto_local_id,
+                func.sum(ItemVendaMobile.quantidade).label("quantidade"),
+            )
+            .where(ItemVendaMobile.venda_id == venda_id, ItemVendaMobile.produto_local_id.is_not(None))
+            .group_by(ItemVendaMobile.produto_local_id)
+            .subquery()
+        )
+        await session.execute(
+            update(ProdutoLocal)
+            .where(ProdutoLocal.id == devolucao.c.produto_local_id)
+            .values(estoque_atual=ProdutoLocal.estoque_atual + devolucao.c.quantidade)
+            .execution_options(synchronize_session=False)
+        )
+
+        # O DELETE em lote não passa pelo cascade ORM de LancamentoFinanceiro.anexos e a FK
+        # de finance_anexolancamento não tem ON DELETE: os anexos saem antes.
+        lancamentos_da_venda = select(LancamentoFinanceiro.id).where(LancamentoFinanceiro.venda_pdv_id == venda_id)
+        for stmt in (
+            delete(AnexoLancamento).where(AnexoLancamento.lancamento_id.in_(lancamentos_da_venda)),
+            delete(LancamentoFinanceiro).where(LancamentoFinanceiro.venda_pdv_id == venda_id),
+            delete(PagamentoVenda).where(PagamentoVenda.venda_id == venda_id),
+            delete(ItemVendaMobile).where(ItemVendaMobile.venda_id == venda_id),
+            delete(VendaMobile).where(VendaMobile.id == venda_id),
+        ):
+            await session.execute(stmt.execution_options(synchronize_session=False))
+
+    @staticmethod
+    async def criar_lote(
+        session: AsyncSession,
+        *,
+        evento_id: int,
+        vendedor_id: int,
+        vendas: list[VendaCreate],
+    ) -> list[dict[str, object]]:
+        """Ingere um lote de vendas (replay offline do PDV) numa única transação.
+
+        Cada local e cada ProdutoLocal é travado uma única vez, em ordem de id;
+        vendas, itens e pagamentos entram com INSERTs em lote. Uma venda inválida
+        é rejeitada com o motivo sem derrubar as demais. Retorna, na ordem do
+        payload, dicts com id_referencia, status (criada | duplicada | rejeitada),
+        venda_id e motivo.
+        """
+        await VendaService._validar_evento_para_venda(session, evento_id)
+        resultados: list[dict[str, object]] = [
+            {"id_referencia": v.id_referencia, "status": None, "venda_id": None, "motivo": None}
+            for v in vendas
+        ]
+
+        def rejeitar(idx: int, motivo: str) -> None:
+            resultados[idx].update(status=VendaService.LOTE_REJEITADA, motivo=motivo)
+
+        # 1. Idempotência: referências já gravadas e repetidas dentro do próprio lote
+        referencias = {v.id_referencia for v in vendas}
+        existentes = {
+            row.id_referencia: row
+            for row in (
+                await session.execute(
+                    select(
+                        VendaMobile.id,
+                        VendaMobile.id_referencia,
+                        VendaMobile.evento_id,
+                        VendaMobile.vendedor_id,
+                    ).where(VendaMobile.id_referencia.in_(referencias))
+                )
+            ).all()
+        }
+        pendentes: list[int] = []
+        vistas: set[str] = set()
+        for idx, payload in enumerate(vendas):
+            existente = existentes.get(payload.id_referencia)
+            if existente is not None:
+                if existente.evento_id != evento_id or existente.vendedor_id != vendedor_id:
+                    rejeitar(idx, "Referência de venda já utilizada")
+                else:
+                    resultados[idx].update(status=VendaService.LOTE_DUPLICADA, venda_id=existente.id)
+            elif payload.id_referencia in vistas:
+                rejeitar(idx, "Referência repetida no lote")
+            else:
+                vistas.add(payload.id_referencia)
+                pendentes.append(idx)
+
+        # 2. Travar cada local envolvido uma única vez
+        locais: dict[int, LocalVenda] = {}
+        for local_id in sorted({vendas[i].local_id for i in pendentes if vendas[i].local_id is not None}):
+            try:
+                locais[local_id] = await VendaService._validar_local(session, local_id)
+            except ValueError as exc:
+                for idx in pendentes:
+                    if vendas[idx].local_id == local_id:
+                        rejeitar(idx, str(exc))
+        for idx in pendentes:
+            if vendas[idx].local_id is None:
+                rejeitar(idx, "Local de venda obrigatório")
+        pendentes = [idx for idx in pendentes if resultados[idx]["status"] is None]
+
+        # 3. Travar todos os ProdutoLocal do lote num único SELECT ... FOR UPDATE
+        produto_ids = sorted({
+            item.produto_local_id
+            for idx in pendentes
+            for item in vendas[idx].itens
+            if item.produto_local_id is not None
+        })
+        produtos = await VendaService._travar_produtos(session, produto_ids)
+
+        # 4. Validar cada venda contra o estoque já consumido pelas anteriores do lote
+        agora = datetime.now(UTC)
+        aceitas: list[tuple[int, LocalVenda, str, Decimal, list]] = []
+        baixas: dict[int, Decimal] = {}
+        for idx in pendentes:
+            payload = vendas[idx]
+            local = locais[payload.local_id]
+            try:
+                ids_itens = [item.produto_local_id for item in payload.itens]
+                if len(ids_itens) != len(set(ids_itens)):
+                    raise ValueError("O mesmo produto não pode aparecer mais de uma vez na venda")
+                total_itens = Decimal("0")
+                itens_data = []
+                for item in payload.itens:
+                    if item.produto_local_id is None:
+                        raise ValueError("Todos os itens devem estar vinculados ao estoque do local")
+                    pl = produtos.get(item.produto_local_id)
+                    if pl is not None and pl.local_id != local.id:
+                        pl = None
+                    total_item = VendaService._precificar_item(local, item, pl)
+                    total_itens += total_item
+                    itens_data.append((item, pl, total_item))
+                forma_pagamento = VendaService._forma_pagamento(local, payload, total_itens)
+            except ValueError as exc:
+                rejeitar(idx, str(exc))
+                continue
+            for item, pl, _ in itens_data:
+                set_committed_value(pl, "estoque_atual", pl.estoque_atual - Decimal(item.quantidade))
+                baixas[pl.id] = baixas.get(pl.id, Decimal("0")) + Decimal(item.quantidade)
+            aceitas.append((idx, local, forma_pagamento, total_itens, itens_data))
+
+        if not aceitas:
+            return resultados
+
+        # 5. INSERTs em lote: vendas (com RETURNING), itens e pagamentos
+        venda_rows = (
+            await session.execute(
+                insert(VendaMobile).returning(VendaMobile.id, VendaMobile.id_referencia),
+                [
+                    {
+                        "id_referencia": vendas[idx].id_referencia,
+                        "evento_id": evento_id,
+                        "local_id": local.id,
+                        "vendedor_id": vendedor_id,
+                        "total": total_itens,
+                        "forma_pagamento": forma_pagamento,
+                        "data_hora": agora,
+                        "turno_id": local.caixa_atual_turno_id,
+                    }
+                    for idx, local, forma_pagamento, total_itens, _ in aceitas
+                ],
+            )
+        ).all()
+        venda_ids = {row.id_referencia: row.id for row in venda_rows}
+
+        item_rows: list[dict[str, object]] = []
+        pagamento_rows: list[dict[str, object]] = []
+        por_turno: dict[int, tuple[int, Decimal, list[tuple[str, Decimal]]]] = {}
+        for idx, local, _, total_itens, itens_data in aceitas:
+            payload = vendas[idx]
+            venda_id = venda_ids[payload.id_referencia]
+            resultados[idx].update(status=VendaService.LOTE_CRIADA, venda_id=venda_id)
+            for item, pl, total_item in itens_data:
+                item_rows.append({
+                    "venda_id": venda_id,
+                    "produto_local_id": pl.id,
+                    "nome_produto": pl.produto.nome,
+                    "codigo_produto": pl.produto.sku,
+                    "familia_produto": pl.familia.nome if pl.familia else "",
+                    "quantidade": item.quantidade,
+                    "preco_unitario": pl.preco_venda,
+                    "desconto_perc": item.desconto_perc,
+                    "total_item": total_item,
+                })
+            pagamentos = [(p.tipo, p.valor) for p in payload.pagamentos]
+            pagamento_rows.extend({"venda_id": venda_id, "tipo": tipo, "valor": valor} for tipo, valor in pagamentos)
+            if local.caixa_atual_turno_id is not None:
+                qtd, soma, acumulados = por_turno.get(local.caixa_atual_turno_id, (0, Decimal("0"), []))
+                por_turno[local.caixa_atual_turno_id] = (qtd + 1, soma + total_itens, acumulados + pagamentos)
+
+        await session.execute(insert(ItemVendaMobile), item_rows)
+        await session.execute(insert(PagamentoVenda), pagamento_rows)
+        await VendaService._baixar_estoque(session, baixas)
+
+        # 6. Um UPSERT de resumo por turno para o lote inteiro
+        for turno_id, (qtd, soma, pagamentos) in sorted(por_turno.items()):
+            await ResumoTurnoService.registrar(
+                session, turno_id, total=soma, pagamentos=pagamentos, quantidade=qtd
+            )
+
+        return resultados
+
+
+class ResumoTurnoService:
+    """Mantém pos_resumoturnopagamento e os contadores de pos_turnocaixa.
+
+    Cada venda soma (e cada exclusão subtrai) seus pagamentos com um UPSERT por
+    forma de pagamento, dentro da transação da própria venda. Assim o resumo do
+    caixa atual e o fechamento do turno leem poucas linhas, independentemente
+    de quantas vendas o turno tenha.
+    """
+
+    @staticmethod
+    async def _aplicar(
+        session: AsyncSession,
+        turno_id: int,
+        *,
+        total: Decimal,
+        pagamentos: list[tuple[str, Decimal]],
+        quantidade: int,
+        sinal: int,
+    ) -> None:
+        await session.execute(
+            update(TurnoCaixa)
+            .where(TurnoCaixa.id == turno_id)
+            .values(
+                quantidade_vendas=TurnoCaixa.quantidade_vendas + sinal * quantidade,
+                valor_vendas=TurnoCaixa.valor_vendas + sinal * total,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        # Agrupa antes do UPSERT: o mesmo tipo não pode aparecer duas vezes no VALUES.
+        por_tipo: dict[str, tuple[Decimal, int]] = {}
+        for tipo, valor in pagamentos:
+            acumulado, qtd = por_tipo.get(tipo, (Decimal("0"), 0))
+            por_tipo[tipo] = (acumulado + Decimal(valor), qtd + 1)
+        if not por_tipo:
+            return
+
+        stmt = pg_insert(ResumoTurnoPagamento).values([
+            {"turno_id": turno_id, "tipo": tipo, "valor": sinal * valor, "quantidade": sinal * qtd}
+            for tipo, (valor, qtd) in sorted(por_tipo.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResumoTurnoPagamento.turno_id, ResumoTurnoPagamento.tipo],
+            set_={
+                "valor": ResumoTurnoPagamento.valor + stmt.excluded.valor,
+                "quantidade": ResumoTurnoPagamento.quantidade + stmt.excluded.quantidade,
+            },
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def registrar(
+        session: AsyncSession,
+        turno_id: int,
+        *,
+        total: Decimal,
+        pagamentos: list[tuple[str, Decimal]],
+        quantidade: int = 1,
+    ) -> None:
+        await ResumoTurnoService._aplicar(
+            session, turno_id, total=total, pagamentos=pagamentos, quantidade=quantidade, sinal=1
+        )
+
+    @staticmethod
+    async def estornar(
+        session: AsyncSession,
+        turno_id: int,
+        *,
+        total: Decimal,
+        pagamentos: list[tuple[str, Decimal]],
+    ) -> None:
+        await ResumoTurnoService._aplicar(
+            session, turno_id, total=total, pagamentos=pagamentos, quantidade=1, sinal=-1
+        )
+
+    @staticmethod
+    async def obter(session: AsyncSession, turno_id: int) -> dict[str, object]:
+        """Retorna quantidade, soma e totais por forma (tipo do PDV) do turno."""
+        turno = (
+            await session.execute(
+                select(TurnoCaixa.quantidade_vendas, TurnoCaixa.valor_vendas).where(TurnoCaixa.id == turno_id)
+            )
+        ).one_or_none()
+        rows = (
+            await session.execute(
+                select(ResumoTurnoPagamento.tipo, ResumoTurnoPagamento.valor).where(
+                    ResumoTurnoPagamento.turno_id == turno_id,
+                    ResumoTurnoPagamento.quantidade > 0,
+                )
+            )
+        ).all()
+        quantidade, valor = turno if turno is not None else (0, Decimal("0.00"))
+        return {
+            "total_vendas": quantidade,
+            "soma_total": valor,
+            "por_forma": {tipo: soma for tipo, soma in rows},
+        }
+
+
+class CatalogoPDVService:
+    """Catálogo de venda de um local, versionado para ETag e sincronização delta.
+
+    A versão de um local é LocalVenda.catalogo_versao, incrementada por trigger
+    a cada escrita em ProdutoLocal sob o lock da linha do local: uma versão só
+    fica visível depois que todas as menores do mesmo local comitaram, então um
+    terminal em `desde=N` nunca perde uma escrita com versão <= N. Ler a versão
+    é uma busca por PK; o catálogo completo fica em cache por processo até ela mudar.
+    """
+
+    # local_id -> (versao, catálogo completo)
+    _cache: dict[int, tuple[int, dict[str, object]]] = {}
+
+    @staticmethod
+    async def versao(session: AsyncSession, local_id: int) -> int | None:
+        """Versão atual do catálogo, ou None se o local não existe."""
+        return (
+            await session.execute(select(LocalVenda.catalogo_versao).where(LocalVenda.id == local_id))
+        ).scalar_one_or_none()
+
+    @staticmethod
+    async def _itens(session: AsyncSession, local_id: int, desde: int | None) -> list[dict[str, object]]:
+        stmt = (
+            select(
+                ProdutoLocal.id,
+                ProdutoLocal.produto_id,
+                Produto.nome,
+                Produto.sku,
+                ProdutoLocal.familia_id,
+                func.coalesce(FamiliaVenda.nome, "").label("familia"),
+                ProdutoLocal.preco_venda,
+                ProdutoLocal.estoque_atual,
+                (ProdutoLocal.ativo & Produto.ativo).label("ativo"),
+                ProdutoLocal.versao,
+            )
+            .join(Produto, Produto.id == ProdutoLocal.produto_id)
+            .outerjoin(FamiliaVenda, FamiliaVenda.id == ProdutoLocal.familia_id)
+            .where(ProdutoLocal.local_id == local_id)
+            .order_by(ProdutoLocal.id)
+        )
+        if desde is not None:
+            stmt = stmt.where(ProdutoLocal.versao > desde)
+        return [dict(row._mapping) for row in (await session.execute(stmt)).all()]
+
+    @staticmethod
+    async def catalogo(
+        session: AsyncSession, local_id: int, versao: int, *, desde: int | None = None
+    ) -> dict[str, object]:
+        """Catálogo na `versao` informada; com `desde`, só as linhas alteradas depois dela.
+
+        Se houve remoção depois de `desde` o delta não a representaria, então o
+        catálogo completo é devolvido (completo=True). A remoção é conferida
+        depois da leitura do delta: qualquer remoção com versão até a maior lida
+        já tinha comitado.
+        """
+        if desde is not None and desde >= versao:
+            return {"local_id": local_id, "versao": versao, "completo": False, "itens": []}
+
+        delta = desde is not None
+        if delta:
+            itens = await CatalogoPDVService._itens(session, local_id, desde)
+            removido = (
+                await session.execute(
+                    select(LocalVenda.catalogo_remocao_versao).where(LocalVenda.id == local_id)
+                )
+            ).scalar_one()
+            delta = removido <= desde
+
+        if not delta:
+            em_cache = CatalogoPDVService._cache.get(local_id)
+            if em_cache is not None and em_cache[0] == versao:
+                return em_cache[1]
+            itens = await CatalogoPDVService._itens(session, local_id, None)
+
+        # A versão reportada é a maior efetivamente lida (escritas concorrentes podem tê-la avançado)
+        versao_lida = max([versao, *(item["versao"] for item in itens)])
+        data = {"local_id": local_id, "versao": versao_lida, "completo": not delta, "itens": itens}
+        if not delta:
+            CatalogoPDVService._cache[local_id] = (versao_lida, data)
+        return data
+
+
 class EntradaLocalService:
     """Registra entrada de mercadoria em sub-estoque local."""
 
@@ -286,3 +773,266 @@ class TransferenciaEstoqueLocalService:
         await session.flush()
         await session.refresh(transferencia)
         return transferencia
+
+
+class PDVDashboardService:
+    """KPIs do dashboard do PDV.
+
+    Todas as somas sobre vendas, itens e pagamentos são feitas no banco com
+    GROUP BY sobre a CTE das vendas filtradas; o Python só recebe linhas já
+    agregadas (uma por produto, família ou forma de pagamento), então a memória
+    não cresce com o volume de vendas do evento.
+    """
+
+    SEM_FAMILIA = "Sem Família"
+    FORMAS_PAGAMENTO = ("DINHEIRO", "DÉBITO", "CRÉDITO", "PIX")
+    NOMES_MESES = {
+        1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
+        7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez",
+    }
+
+    @staticmethod
+    def _filtros_mes_local(local_id: int | None, mes: str | None) -> list:
+        filtros = []
+        if local_id is not None:
+            filtros.append(VendaMobile.local_id == local_id)
+        if mes is not None and mes != "Todos":
+            filtros.append(func.extract("month", VendaMobile.data_hora) == int(mes))
+        return filtros
+
+    @staticmethod
+    async def dashboard(
+        session: AsyncSession,
+        evento_id: int,
+        *,
+        local_id: int | None = None,
+        mes: str | None = None,
+    ) -> dict[str, object]:
+        from app.core.models import Evento
+
+        zero = Decimal("0.00")
+        filtros = PDVDashboardService._filtros_mes_local(local_id, mes)
+        vendas = (
+            select(VendaMobile.id, VendaMobile.total)
+            .where(VendaMobile.evento_id == evento_id, *filtros)
+            .cte("vendas_filtradas")
+        )
+
+        # --- Vendas: totais ---
+        total_vendas, receita_total = (
+            await session.execute(
+                select(func.count(vendas.c.id), func.coalesce(func.sum(vendas.c.total), 0))
+            )
+        ).one()
+        receita_total = Decimal(receita_total)
+
+        # --- Itens: quantidade, receita e custo por produto ---
+        custo_unit = func.coalesce(Produto.custo_medio_atual, 0)
+        itens_rows = (
+            await session.execute(
+                select(
+                    ItemVendaMobile.nome_produto,
+                    func.sum(ItemVendaMobile.quantidade).label("qtd"),
+                    func.sum(ItemVendaMobile.total_item).label("receita"),
+                    func.sum(ItemVendaMobile.quantidade * custo_unit).label("custo"),
+                )
+                .join(vendas, ItemVendaMobile.venda_id == vendas.c.id)
+                .outerjoin(ProdutoLocal, ItemVendaMobile.produto_local_id == ProdutoLocal.id)
+                .outerjoin(Produto, ProdutoLocal.produto_id == Produto.id)
+                .group_by(ItemVendaMobile.nome_produto)
+            )
+        ).all()
+
+        # --- Itens: receita por família ---
+        familia_rows = (
+            await session.execute(
+                select(ItemVendaMobile.familia_produto, func.sum(ItemVendaMobile.total_item))
+                .join(vendas, ItemVendaMobile.venda_id == vendas.c.id)
+                .group_by(ItemVendaMobile.familia_produto)
+            )
+        ).all()
+
+        # --- Pagamentos por forma ---
+        tipo_upper = func.upper(PagamentoVenda.tipo)
+        pagamento_rows = (
+            await session.execute(
+                select(tipo_upper.label("tipo"), func.sum(PagamentoVenda.valor))
+                .join(vendas, PagamentoVenda.venda_id == vendas.c.id)
+                .group_by(tipo_upper)
+            )
+        ).all()
+
+        # --- Faturamento por evento (todos os eventos, mesmos filtros de local/mês) ---
+        evt_rows = (
+            await session.execute(
+                select(Evento.nome, func.sum(VendaMobile.total))
+                .join(VendaMobile, Evento.id == VendaMobile.evento_id)
+                .where(*filtros)
+                .group_by(Evento.nome)
+            )
+        ).all()
+
+        # --- Vendas por mês (ignora o filtro de mês) ---
+        mes_expr = func.extract("month", VendaMobile.data_hora)
+        mes_stmt = select(mes_expr, func.sum(VendaMobile.total)).where(VendaMobile.evento_id == evento_id)
+        if local_id is not None:
+            mes_stmt = mes_stmt.where(VendaMobile.local_id == local_id)
+        mes_rows = (await session.execute(mes_stmt.group_by(mes_expr))).all()
+
+        # --- Estoque do local: agregados por família ---
+        produtos_filtros = [LocalVenda.evento_id == evento_id]
+        if local_id is not None:
+            produtos_filtros.append(ProdutoLocal.local_id == local_id)
+
+        estoque_rows = (
+            await session.execute(
+                select(
+                    FamiliaVenda.nome,
+                    func.sum(ProdutoLocal.estoque_atual).label("qtd"),
+                    func.sum(ProdutoLocal.estoque_atual * ProdutoLocal.preco_venda).label("valor_venda"),
+                    func.sum(ProdutoLocal.estoque_atual * Produto.custo_medio_atual).label("custo"),
+                )
+                .join(LocalVenda, ProdutoLocal.local_id == LocalVenda.id)
+                .join(Produto, ProdutoLocal.produto_id == Produto.id)
+                .outerjoin(FamiliaVenda, ProdutoLocal.familia_id == FamiliaVenda.id)
+                .where(*produtos_filtros)
+                .group_by(FamiliaVenda.nome)
+            )
+        ).all()
+
+        # Nomes do catálogo entram no ranking com qtd zero (produtos sem venda).
+        catalogo_nomes = (
+            await session.execute(
+                select(Produto.nome)
+                .select_from(ProdutoLocal)
+                .join(LocalVenda, ProdutoLocal.local_id == LocalVenda.id)
+                .join(Produto, ProdutoLocal.produto_id == Produto.id)
+                .where(*produtos_filtros)
+                .distinct()
+            )
+        ).scalars().all()
+
+        margem_expr = (
+            (ProdutoLocal.preco_venda - Produto.custo_medio_atual) / Produto.custo_medio_atual * 100
+        )
+        margem_rows = (
+            await session.execute(
+                select(Produto.nome, margem_expr.label("margem"))
+                .select_from(ProdutoLocal)
+                .join(LocalVenda, ProdutoLocal.local_id == LocalVenda.id)
+                .join(Produto, ProdutoLocal.produto_id == Produto.id)
+                .where(*produtos_filtros, ProdutoLocal.preco_venda > 0, Produto.custo_medio_atual > 0)
+                .order_by(margem_expr.desc(), Produto.nome)
+                .limit(10)
+            )
+        ).all()
+
+        status_expr = case(
+            (ProdutoLocal.estoque_atual < ProdutoLocal.estoque_minimo, "Ruptura de Estoque"),
+            else_="Reabastecer",
+        )
+        baixo_rows = (
+            await session.execute(
+                select(
+                    Produto.id,
+                    Produto.sku,
+                    Produto.nome,
+                    func.coalesce(FamiliaVenda.nome, PDVDashboardService.SEM_FAMILIA).label("familia"),
+                    status_expr.label("status"),
+                    ProdutoLocal.estoque_atual,
+                )
+                .select_from(ProdutoLocal)
+                .join(LocalVenda, ProdutoLocal.local_id == LocalVenda.id)
+                .join(Produto, ProdutoLocal.produto_id == Produto.id)
+                .outerjoin(FamiliaVenda, ProdutoLocal.familia_id == FamiliaVenda.id)
+                .where(*produtos_filtros, ProdutoLocal.estoque_atual <= ProdutoLocal.ponto_reabastecimento)
+                .order_by(ProdutoLocal.estoque_atual, ProdutoLocal.id)
+            )
+        ).all()
+
+        # --- Montagem (apenas sobre linhas agregadas) ---
+        qtd_por_prod: dict[str, int] = {nome: 0 for nome in catalogo_nomes}
+        rec_por_prod: dict[str, Decimal] = {nome: zero for nome in catalogo_nomes}
+        itens_vendidos = 0
+        custo_total_vendas = zero
+        for nome, qtd, receita, custo in itens_rows:
+            qtd_por_prod[nome] = int(qtd or 0)
+            rec_por_prod[nome] = Decimal(receita or 0)
+            itens_vendidos += int(qtd or 0)
+            custo_total_vendas += Decimal(custo or 0)
+
+        def _ranking(reverse: bool) -> list[dict[str, object]]:
+            nomes = sorted(qtd_por_prod, key=lambda k: qtd_por_prod[k], reverse=reverse)
+            return [{"nome": n, "qtd": qtd_por_prod[n], "receita": rec_por_prod[n]} for n in nomes[:10]]
+
+        top_10_mais_vendidos = _ranking(reverse=True)
+        top_10_menos_vendidos = _ranking(reverse=False)
+
+        vendas_por_pagamento = {forma: zero for forma in PDVDashboardService.FORMAS_PAGAMENTO}
+        for tipo, valor in pagamento_rows:
+            if tipo in vendas_por_pagamento:
+                vendas_por_pagamento[tipo] += Decimal(valor or 0)
+
+        vendas_por_mes: dict[str, Decimal] = {}
+        for m_idx, valor in mes_rows:
+            nome_mes = PDVDashboardService.NOMES_MESES.get(int(m_idx))
+            if nome_mes is not None:
+                vendas_por_mes[nome_mes] = Decimal(str(valor))
+
+        estoque_por_familia_qtd: dict[str, Decimal] = {}
+        custo_por_familia_valor: dict[str, Decimal] = {}
+        itens_estoque = zero
+        valor_estoque_venda = zero
+        custo_total_estoque = zero
+        for familia, qtd, valor_venda, custo in estoque_rows:
+            familia = familia or PDVDashboardService.SEM_FAMILIA
+            estoque_por_familia_qtd[familia] = Decimal(qtd or 0)
+            custo_por_familia_valor[familia] = Decimal(custo or 0)
+            itens_estoque += Decimal(qtd or 0)
+            valor_estoque_venda += Decimal(valor_venda or 0)
+            custo_total_estoque += Decimal(custo or 0)
+
+        # Itens sem família e a família vazia caem no mesmo balde.
+        receita_por_familia: dict[str, Decimal] = {}
+        for familia, total in familia_rows:
+            familia = familia or PDVDashboardService.SEM_FAMILIA
+            receita_por_familia[familia] = receita_por_familia.get(familia, zero) + Decimal(total or 0)
+
+        ticket_medio = receita_total / total_vendas if total_vendas > 0 else zero
+
+        return {
+            "total_vendas_hoje": receita_total,
+            "quantidade_vendas_hoje": total_vendas,
+            "ticket_medio": ticket_medio,
+            "top_produtos": top_10_mais_vendidos,
+            "vendas_por_pagamento": vendas_por_pagamento,
+            "receita_total": receita_total,
+            "itens_vendidos": itens_vendidos,
+            "itens_estoque": itens_estoque,
+            "valor_estoque_venda": valor_estoque_venda,
+            "faturamento_por_evento": {nome: Decimal(str(total)) for nome, total in evt_rows},
+            "vendas_por_mes": vendas_por_mes,
+            "top_10_mais_vendidos": top_10_mais_vendidos,
+            "top_10_menos_vendidos": top_10_menos_vendidos,
+            "lucro_liquido": receita_total - custo_total_vendas,
+            "receita_operacional": receita_total,
+            "total_vendas": total_vendas,
+            "receita_por_familia": receita_por_familia,
+            "ranking_mais_vendidos": top_10_mais_vendidos,
+            "top_10_margem_lucro": [{"nome": nome, "margem": margem} for nome, margem in margem_rows],
+            "custo_total_estoque": custo_total_estoque,
+            "itens_fisicos_totais": itens_estoque,
+            "valor_potencial_venda": valor_estoque_venda,
+            "estoque_por_familia_qtd": estoque_por_familia_qtd,
+            "custo_por_familia_valor": custo_por_familia_valor,
+            "produtos_baixo_estoque": [
+                {
+                    "codigo": sku or str(produto_id),
+                    "nome": nome,
+                    "familia": familia,
+                    "status": status,
+                    "estoque": estoque,
+                }
+                for produto_id, sku, nome, familia, status, estoque in baixo_rows
+            ],
+        }
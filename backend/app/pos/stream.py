@@ -0,0 +1,110 @@
+"""Canal de push do PDV (SSE) alimentado por LISTEN/NOTIFY do Postgres.
+
+Triggers em pos_produtolocal e pos_localvenda (migrações 0017 e 0024) publicam
+no canal `pos_eventos` inclusões, remoções e mudanças de estoque/preço de
+produtos e a abertura/fechamento de caixa. O NOTIFY só é entregue no commit,
+então nenhum terminal vê uma venda que foi desfeita.
+
+Cada worker do uvicorn mantém uma única conexão asyncpg dedicada em LISTEN
+(fora do pool do SQLAlchemy) e distribui os eventos para as filas dos clientes
+conectados ao local. Assim a difusão funciona entre os 4 workers sem polling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import AsyncIterator
+
+import asyncpg
+
+from app.db.session import dsn_direta
+
+logger = logging.getLogger("maanaim.pos.stream")
+
+CANAL = "pos_eventos"
+
+
+class PDVEventBroker:
+    """Assina `pos_eventos` e distribui os eventos por local_id."""
+
+    FILA_MAXIMA = 256
+    RECONEXAO_SEGUNDOS = 5
+
+    def __init__(self) -> None:
+        self._assinantes: dict[int, set[asyncio.Queue[dict]]] = {}
+        self._tarefa: asyncio.Task | None = None
+
+    def _ao_notificar(self, _conn, _pid, _canal, payload: str) -> None:
+        try:
+            evento = json.loads(payload)
+        except ValueError:
+            logger.warning("Payload inválido em %s: %r", CANAL, payload)
+            return
+        for fila in tuple(self._assinantes.get(evento.get("local_id"), ())):
+            try:
+                fila.put_nowait(evento)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta o mais antigo; o terminal ressincroniza pelo catálogo.
+                with contextlib.suppress(asyncio.QueueEmpty):
+                    fila.get_nowait()
+                fila.put_nowait(evento)
+
+    async def _escutar(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn_direta())
+                await conn.add_listener(CANAL, self._ao_notificar)
+                fechada = asyncio.Event()
+                conn.add_termination_listener(lambda _c, fechada=fechada: fechada.set())
+                # Avisa os clientes para ressincronizar: eventos podem ter sido perdidos
+                for local_id in tuple(self._assinantes):
+                    self._ao_notificar(None, None, CANAL, json.dumps({"tipo": "resync", "local_id": local_id}))
+                await fechada.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Conexão LISTEN %s falhou; reconectando", CANAL)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.RECONEXAO_SEGUNDOS)
+
+    def iniciar(self) -> None:
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.get_running_loop().create_task(self._escutar())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._tarefa
+            self._tarefa = None
+
+    @contextlib.asynccontextmanager
+    async def assinar(self, local_id: int) -> AsyncIterator[asyncio.Queue[dict]]:
+        self.iniciar()
+        fila: asyncio.Queue[dict] = asyncio.Queue(maxsize=self.FILA_MAXIMA)
+        self._assinantes.setdefault(local_id, set()).add(fila)
+        try:
+            yield fila
+        finally:
+            filas = self._assinantes.get(local_id)
+            if filas is not None:
+                filas.discard(fila)
+                if not filas:
+                    del self._assinantes[local_id]
+
+
+broker = PDVEventBroker()
+
+
+def formatar_sse(evento: dict) -> str:
+    linhas = [f"event: {evento.get('tipo', 'mensagem')}"]
+    if "versao" in evento:
+        linhas.append(f"id: {evento['versao']}")
+    linhas.append(f"data: {json.dumps(evento, ensure_ascii=False, default=str)}")
+    return "\n".join(linhas) + "\n\n"
@@ -0,0 +1,28 @@
+"""
+Cria as partições mensais futuras de core_auditlog e descarta as antigas.
+
+A API já faz isso no startup e a cada 24h; o script serve para rodar via cron
+em deploys que reiniciam pouco, ou para conferir o estado após a migração 0018.
+Usa AUDIT_PARTICOES_A_FRENTE e AUDIT_RETENCAO_MESES do .env.
+
+Uso:
+  cd backend
+  python -m scripts.auditlog_particoes
+"""
+import asyncio
+
+from app.db.session import engine
+from app.middleware.audit import manter_particoes
+
+
+async def main() -> None:
+    try:
+        resultado = await manter_particoes()
+    finally:
+        await engine.dispose()
+    print(f"criadas: {', '.join(resultado['criadas']) or '-'}")
+    print(f"removidas: {', '.join(resultado['removidas']) or '-'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Benchmark do custo de autenticação por request (só o token, sem banco).
+
+Compara, por request autenticada com `require_scopes`:
+  - jose x2: o caminho antigo, python-jose decodificando o token duas vezes
+    (get_current_user + require_scopes) e montando set de scopes;
+  - verificador frio: VerificadorJWT com cache vazio (1ª request do token);
+  - verificador quente: token já memorizado (requests seguintes até o exp).
+Também mostra o tamanho do token com lista de scopes/grupos e com bitmask.
+
+Uso:
+  cd backend
+  python -m scripts.bench_auth --repeticoes 20000
+"""
+import argparse
+import time
+
+from app.auth.jwt import create_access_token, decode_token
+from app.auth.verificacao import VerificadorJWT
+from app.config import settings
+
+GRUPOS = ["FINANCEIRO", "ESTOQUE", "CAIXA"]
+SCOPES = [
+    "core:read", "core:write", "finance:read", "finance:write",
+    "inventory:read", "inventory:write", "pos:read", "pos:write", "reports:read",
+]
+EXIGIDOS = frozenset({"finance:write"})
+
+
+def _medir(nome: str, repeticoes: int, funcao) -> None:
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    por_chamada = (time.perf_counter() - inicio) / repeticoes * 1_000_000
+    print(f"{nome:<22} {por_chamada:>10.2f} µs/request")
+
+
+def main(repeticoes: int) -> None:
+    settings.JWT_SCOPES_COMPACTOS = False
+    legado = create_access_token(subject=7, groups=GRUPOS, scopes=SCOPES)
+    settings.JWT_SCOPES_COMPACTOS = True
+    compacto = create_access_token(subject=7, groups=GRUPOS, scopes=SCOPES)
+    print(f"token com listas:  {len(legado)} bytes")
+    print(f"token com bitmask: {len(compacto)} bytes")
+    print()
+
+    def jose_duas_vezes() -> None:
+        decode_token(legado)
+        assert set(decode_token(legado)["scopes"]) >= EXIGIDOS
+
+    frio = VerificadorJWT(segredo=settings.JWT_SECRET_KEY, algoritmo="HS256", tamanho_cache=16)
+
+    def verificador_frio() -> None:
+        frio.limpar()
+        assert frio.verificar(compacto)["scopes"] >= EXIGIDOS
+
+    quente = VerificadorJWT(segredo=settings.JWT_SECRET_KEY, algoritmo="HS256", tamanho_cache=16)
+
+    def verificador_quente() -> None:
+        assert quente.verificar(compacto)["scopes"] >= EXIGIDOS
+
+    _medir("jose x2", repeticoes, jose_duas_vezes)
+    _medir("verificador frio", repeticoes, verificador_frio)
+    _medir("verificador quente", repeticoes, verificador_quente)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=20000)
+    main(parser.parse_args().repeticoes)
@@ -0,0 +1,131 @@
+"""
+Benchmark de "troca de turno": N logins simultâneos no /api/v1/auth/login real
+(Postgres + pool do SQLAlchemy) enquanto um cliente faz uma consulta barata no
+banco (SELECT 1 por get_session) sem parar.
+
+Mede a latência dessa consulta antes e durante a rajada e o checkout do pool:
+se o login segurasse a conexão durante o PBKDF2, a consulta esperaria por
+conexão livre (ou estouraria DB_POOL_TIMEOUT) enquanto os hashes rodam.
+A app roda em processo via httpx.ASGITransport; o usuário de teste é criado
+no início e removido no fim (as sessões de login caem junto, ON DELETE CASCADE).
+
+Uso:
+  cd backend
+  DATABASE_URL=postgresql+asyncpg://... DB_POOL_SIZE=5 DB_MAX_OVERFLOW=0 \\
+      python -m scripts.bench_login --logins 50 --intervalo 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Annotated
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.passwords import encerrar_executor, hash_password
+from app.config import settings
+from app.core.models import User
+from app.db.session import async_session_factory, engine, espera_pool, get_session, metricas_pool
+from app.main import app
+
+USUARIO = "bench_login"
+SENHA = "troca-de-turno"
+
+
+@app.get("/bench/db", include_in_schema=False)
+async def bench_db(session: Annotated[AsyncSession, Depends(get_session)]) -> dict[str, int]:
+    return {"ok": (await session.execute(text("SELECT 1"))).scalar_one()}
+
+
+async def _pings(client: httpx.AsyncClient, parar: asyncio.Event, intervalo: float) -> list[tuple[float, float]]:
+    """Uma consulta a cada `intervalo` segundos, medida a partir do horário agendado: se o
+    loop travar, as atrasadas entram com a espera (sem coordinated omission).
+    Devolve (horário agendado, latência em ms)."""
+    amostras: list[tuple[float, float]] = []
+    tarefas: list[asyncio.Task] = []
+
+    async def _um(agendado: float) -> None:
+        (await client.get("/bench/db")).raise_for_status()
+        amostras.append((agendado, (time.perf_counter() - agendado) * 1000))
+
+    agendado = time.perf_counter()
+    while not parar.is_set():
+        await asyncio.sleep(max(0.0, agendado + intervalo - time.perf_counter()))
+        # depois de um travamento, dispara todas as consultas que ficaram para trás
+        while agendado + intervalo <= time.perf_counter():
+            agendado += intervalo
+            tarefas.append(asyncio.create_task(_um(agendado)))
+    await asyncio.gather(*tarefas)
+    return amostras
+
+
+def _p(latencias: list[float], q: float) -> float:
+    latencias = sorted(latencias)
+    return latencias[min(len(latencias) - 1, int(len(latencias) * q))]
+
+
+async def _login(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post("/api/v1/auth/login", json={"username": USUARIO, "password": SENHA})
+
+
+async def _rodada(client: httpx.AsyncClient, logins: int, intervalo: float) -> None:
+    parar = asyncio.Event()
+    pings = asyncio.create_task(_pings(client, parar, intervalo))
+    await asyncio.sleep(1)  # linha de base, sem logins
+
+    espera_pool.maximo = 0.0
+    inicio = time.perf_counter()
+    respostas = await asyncio.gather(*(_login(client) for _ in range(logins)))
+    duracao = time.perf_counter() - inicio
+    parar.set()
+    amostras = await pings
+    assert all(r.status_code == 200 for r in respostas), {r.status_code for r in respostas}
+
+    for fase, latencias in (
+        # margem: a consulta agendada logo antes da rajada já sofre com ela
+        ("repouso", [ms for t, ms in amostras if t < inicio - 0.05]),
+        ("rajada", [ms for t, ms in amostras if inicio <= t < inicio + duracao]),
+    ):
+        print(
+            f"{fase:<8} {duracao:>9.1f} {len(latencias):>6} "
+            f"{statistics.median(latencias):>8.1f} {_p(latencias, 0.99):>8.1f} {max(latencias):>8.1f}"
+        )
+    pool = metricas_pool()
+    print(
+        f"pool: tamanho={pool['tamanho']} espera máx na rajada={espera_pool.maximo * 1000:.1f} ms "
+        f"checkouts lentos={pool['checkouts_lentos']} timeouts={pool['timeouts']}"
+    )
+
+
+async def main(logins: int, intervalo: float) -> None:
+    async with async_session_factory() as session:
+        await session.execute(delete(User).where(User.username == USUARIO))
+        session.add(User(username=USUARIO, password=hash_password(SENHA), is_active=True))
+        await session.commit()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            (await _login(client)).raise_for_status()  # aquecimento do pool de hash e do banco
+            print(
+                f"{logins} logins simultâneos; pool {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}; "
+                "latência de SELECT 1 via get_session"
+            )
+            print(f"{'fase':<8} {'rajada s':>9} {'pings':>6} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+            await _rodada(client, logins, intervalo)
+    finally:
+        async with async_session_factory() as session:
+            await session.execute(delete(User).where(User.username == USUARIO))
+            await session.commit()
+        encerrar_executor()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--intervalo", type=float, default=10, help="ms entre consultas de fundo")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.intervalo / 1000))
@@ -0,0 +1,140 @@
+"""
+Benchmark do overhead da pilha de middlewares por request.
+
+Modo local (padrão): monta três apps com o mesmo endpoint trivial e mede em
+processo, via httpx.ASGITransport, sem banco nem rede:
+  - sem-middleware: só o endpoint (linha de base);
+  - base-http: a pilha antiga, 3x BaseHTTPMiddleware (contagem de SQL,
+    inatividade no-op, auditoria);
+  - asgi: a pilha atual, QueryCounterMiddleware + AuditLogMiddleware ASGI puros.
+A gravação da auditoria é desligada nos três, para medir só o middleware.
+O ASGITransport roda cada request até o fim sem ceder o loop, então o modo local
+mede custo de CPU por request; use concorrência 1 (padrão) para latências comparáveis.
+
+Modo --url: dispara carga concorrente contra um deploy real, por exemplo
+`uvicorn app.main:app --workers 4`, no endpoint de health. Rode uma vez em cada
+versão e compare.
+
+Uso:
+  cd backend
+  python -m scripts.bench_middleware --requisicoes 5000
+  python -m scripts.bench_middleware --url http://localhost:8000/api/v1/health \\
+      --requisicoes 20000 --concorrencia 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.db.session import ContagemSQL, contagem_sql
+from app.middleware import audit
+from app.middleware.audit import AuditLogMiddleware
+from app.middleware.sql import QueryCounterMiddleware
+
+
+class _ContagemBaseHTTP(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        contagem = ContagemSQL()
+        token = contagem_sql.set(contagem)
+        try:
+            response = await call_next(request)
+        finally:
+            contagem_sql.reset(token)
+        response.headers.append("Server-Timing", f'db;dur=0.0;desc="{contagem.statements} statements"')
+        return response
+
+
+class _InatividadeBaseHTTP(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        return await call_next(request)
+
+
+class _AuditoriaBaseHTTP(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        response = await call_next(request)
+        audit.audit_writer.registrar({"path": request.url.path, "status_code": response.status_code})
+        return response
+
+
+def _app(middlewares: list[type]) -> FastAPI:
+    app = FastAPI()
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+
+    @app.get("/api/v1/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+PILHAS = {
+    "sem-middleware": [],
+    "base-http": [_ContagemBaseHTTP, _InatividadeBaseHTTP, _AuditoriaBaseHTTP],
+    "asgi": [QueryCounterMiddleware, AuditLogMiddleware],
+}
+
+
+async def _disparar(client: httpx.AsyncClient, url: str, requisicoes: int, concorrencia: int) -> tuple[float, list[float]]:
+    latencias: list[float] = []
+    restantes = requisicoes
+
+    async def _trabalhador() -> None:
+        nonlocal restantes
+        while restantes > 0:
+            restantes -= 1
+            inicio = time.perf_counter()
+            resposta = await client.get(url)
+            latencias.append((time.perf_counter() - inicio) * 1_000_000)
+            resposta.raise_for_status()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_trabalhador() for _ in range(concorrencia)))
+    return time.perf_counter() - inicio, latencias
+
+
+def _linha(nome: str, duracao: float, latencias: list[float]) -> str:
+    latencias.sort()
+    p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+    return (
+        f"{nome:<16} {len(latencias) / duracao:>10.0f} {statistics.median(latencias):>12.0f} {p95:>10.0f}"
+    )
+
+
+async def run_local(requisicoes: int, concorrencia: int) -> None:
+    audit.audit_writer = type("_Descarte", (), {"registrar": staticmethod(lambda _registro: None)})()
+    print(f"{'pilha':<16} {'req/s':>10} {'mediana µs':>12} {'p95 µs':>10}")
+    for nome, middlewares in PILHAS.items():
+        transport = httpx.ASGITransport(app=_app(middlewares))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _disparar(client, "/api/v1/health", 200, concorrencia)  # aquecimento
+            duracao, latencias = await _disparar(client, "/api/v1/health", requisicoes, concorrencia)
+        print(_linha(nome, duracao, latencias))
+
+
+async def run_url(url: str, requisicoes: int, concorrencia: int) -> None:
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(limits=limites, timeout=30) as client:
+        await _disparar(client, url, 200, concorrencia)
+        duracao, latencias = await _disparar(client, url, requisicoes, concorrencia)
+    print(f"{'alvo':<16} {'req/s':>10} {'mediana µs':>12} {'p95 µs':>10}")
+    print(_linha("deploy", duracao, latencias))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url")
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--concorrencia", type=int, help="padrão: 1 no modo local, 64 com --url")
+    args = parser.parse_args()
+    if args.url:
+        asyncio.run(run_url(args.url, args.requisicoes, args.concorrencia or 64))
+    else:
+        asyncio.run(run_local(args.requisicoes, args.concorrencia or 1))
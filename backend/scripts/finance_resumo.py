@@ -0,0 +1,34 @@
+"""
+Reconstrói o resumo diário financeiro (finance_resumo_diario) a partir dos lançamentos.
+
+O trigger da migração 0020 mantém o resumo em dia; o script serve para
+backfill após restaurar backup, conferência ou correção manual. Escritas em
+lançamentos ficam bloqueadas até o fim (LOCK ... IN SHARE MODE).
+
+Uso:
+  cd backend
+  python -m scripts.finance_resumo              # todos os eventos
+  python -m scripts.finance_resumo --evento 3   # só um evento
+"""
+import argparse
+import asyncio
+
+from app.db.session import async_session_factory, engine
+from app.finance.services import ResumoFinanceiroService
+
+
+async def main(evento_id: int | None) -> None:
+    try:
+        async with async_session_factory() as session:
+            linhas = await ResumoFinanceiroService.reconstruir(session, evento_id)
+            await session.commit()
+    finally:
+        await engine.dispose()
+    alvo = f"evento {evento_id}" if evento_id is not None else "todos os eventos"
+    print(f"resumo reconstruído ({alvo}): {linhas} linhas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evento", type=int, default=None)
+    asyncio.run(main(parser.parse_args().evento))
@@ -0,0 +1,56 @@
+"""Fixtures compartilhadas dos testes."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+# Estratégias de carga que custam um round-trip extra por nível de relacionamento.
+# joinedload entra no mesmo SELECT e não conta.
+_ESTRATEGIAS_COM_SELECT = {("lazy", "selectin"), ("lazy", "subquery")}
+
+
+def _selects_da_opcao(opcao) -> int:
+    return sum(
+        1
+        for elemento in getattr(opcao, "context", ())
+        if _ESTRATEGIAS_COM_SELECT & set(elemento.strategy or ())
+    )
+
+
+def consultas_emitidas(session: AsyncMock) -> int:
+    """Nº de consultas que as chamadas registradas no mock fariam no banco.
+
+    Cada execute/get/refresh conta uma, mais uma por selectinload declarado.
+    `session.get` conta mesmo que o objeto pudesse sair do identity map.
+    """
+    total = 0
+    for chamada in session.execute.await_args_list:
+        opcoes = getattr(chamada.args[0], "_with_options", ())
+        total += 1 + sum(_selects_da_opcao(o) for o in opcoes)
+    for chamada in session.get.await_args_list:
+        opcoes = chamada.kwargs.get("options") or ()
+        total += 1 + sum(_selects_da_opcao(o) for o in opcoes)
+    total += session.refresh.await_count + session.scalar.await_count + session.scalars.await_count
+    return total
+
+
+@pytest.fixture
+def orcamento_consultas():
+    """Falha o teste se o bloco emitir mais consultas que o orçamento do endpoint.
+
+        with orcamento_consultas(session, 2):
+            await RequisicaoService.get(session, 1)
+    """
+
+    @contextmanager
+    def _orcamento(session: AsyncMock, limite: int) -> Iterator[None]:
+        antes = consultas_emitidas(session)
+        yield
+        gastas = consultas_emitidas(session) - antes
+        assert gastas <= limite, f"{gastas} consultas emitidas; orçamento é {limite}"
+
+    return _orcamento
@@ -0,0 +1,127 @@
+"""Testes do AuditLogWriter (fila em memória + INSERT multi-row em lote)."""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.middleware import audit
+from app.middleware.audit import AuditLogWriter
+
+
+class _EngineFalso:
+    def __init__(self, falhar: bool = False) -> None:
+        self.statements = []
+        self.falhar = falhar
+
+    @asynccontextmanager
+    async def begin(self):
+        if self.falhar:
+            raise RuntimeError("banco fora")
+        conn = AsyncMock()
+        yield conn
+        self.statements.append(conn.execute.await_args.args[0])
+
+
+def _registro(i: int) -> dict:
+    return {
+        "user_id": None,
+        "method": "GET",
+        "path": f"/api/v1/x/{i}",
+        "view_name": "x",
+        "status_code": 200,
+        "ip_address": "127.0.0.1",
+        "user_agent": "pytest",
+    }
+
+
+@pytest.mark.asyncio
+async def test_agrupa_registros_em_insert_multi_row(monkeypatch) -> None:
+    engine = _EngineFalso()
+    monkeypatch.setattr(audit, "engine", engine)
+    writer = AuditLogWriter(tamanho_fila=100, tamanho_lote=2, intervalo_ms=50)
+
+    for i in range(5):
+        writer.registrar(_registro(i))
+    await writer.parar()
+
+    assert writer.metricas() == {
+        "fila": 0, "enfileirados": 5, "descartados": 0, "gravados": 5, "falhas": 0, "lotes": 3,
+    }
+    sql = str(engine.statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO core_auditlog")
+    assert sql.count("VALUES") == 1 and sql.count("), (") == 1  # 2 linhas num único INSERT
+
+
+@pytest.mark.asyncio
+async def test_fila_cheia_descarta_sem_bloquear(monkeypatch) -> None:
+    monkeypatch.setattr(audit, "engine", _EngineFalso())
+    writer = AuditLogWriter(tamanho_fila=2, tamanho_lote=10, intervalo_ms=10)
+
+    # sem await entre as chamadas: a task consumidora ainda não rodou
+    for i in range(5):
+        writer.registrar(_registro(i))
+
+    assert writer.descartados == 3
+    assert writer.metricas()["fila"] == 2
+    await writer.parar()
+    assert writer.gravados == 2
+
+
+@pytest.mark.asyncio
+async def test_falha_no_banco_conta_e_nao_derruba_a_task(monkeypatch) -> None:
+    engine = _EngineFalso(falhar=True)
+    monkeypatch.setattr(audit, "engine", engine)
+    writer = AuditLogWriter(tamanho_fila=10, tamanho_lote=10, intervalo_ms=10)
+
+    writer.registrar(_registro(1))
+    await writer.parar()
+
+    assert writer.falhas == 1
+    assert writer.gravados == 0
+
+
+@pytest.mark.asyncio
+async def test_parar_sem_registros_nao_faz_nada() -> None:
+    writer = AuditLogWriter(tamanho_fila=10, tamanho_lote=10, intervalo_ms=10)
+    await writer.parar()
+    assert writer.metricas()["lotes"] == 0
+
+
+def test_middleware_le_status_do_response_start_e_usuario_do_state(monkeypatch) -> None:
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+    from fastapi.testclient import TestClient
+
+    registros: list[dict] = []
+    monkeypatch.setattr(audit, "audit_writer", SimpleNamespace(registrar=registros.append))
+
+    app = FastAPI()
+    app.add_middleware(audit.AuditLogMiddleware)
+
+    @app.post("/api/v1/itens", status_code=201)
+    async def criar(request: Request) -> dict:
+        request.state.user_id = 7
+        return {}
+
+    @app.get("/api/v1/stream")
+    async def stream() -> StreamingResponse:
+        async def _partes():
+            yield b"a"
+            yield b"b"
+
+        return StreamingResponse(_partes())
+
+    with TestClient(app) as client:
+        assert client.post("/api/v1/itens", headers={"X-Forwarded-For": "10.0.0.1, 10.0.0.2"}).status_code == 201
+        assert client.get("/api/v1/stream").content == b"ab"
+        client.get("/docs")
+
+    assert [(r["method"], r["path"], r["status_code"], r["user_id"]) for r in registros] == [
+        ("POST", "/api/v1/itens", 201, 7),
+        ("GET", "/api/v1/stream", 200, None),
+    ]
+    assert registros[0]["ip_address"] == "10.0.0.1"
+    assert registros[0]["view_name"] == "criar"
@@ -0,0 +1,133 @@
+"""Testes da paginação por keyset de /core/audit-logs e da manutenção de partições."""
+
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import AuditLog
+from app.core.routers import audit_logs_lista
+from app.core.services import AuditLogService
+from app.db.paginacao import decode_cursor
+
+
+def _logs(n: int) -> list[AuditLog]:
+    base = datetime(2026, 10, 1, 12, 0, tzinfo=UTC)
+    return [
+        AuditLog(
+            id=500 - i,
+            user_id=None,
+            user=None,
+            method="GET",
+            path=f"/api/v1/x/{i}",
+            view_name="x",
+            status_code=200,
+            ip_address=None,
+            user_agent="",
+            created_at=base - timedelta(seconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+async def _listar(session, **kwargs):
+    params = dict(
+        page=1, page_size=2, user_id=None, method=None, status_code=None,
+        data_inicio=None, data_fim=None, cursor=None, incluir_total=False,
+    )
+    params.update(kwargs)
+    return await audit_logs_lista(current=MagicMock(), session=session, **params)
+
+
+@pytest.mark.asyncio
+async def test_audit_logs_keyset_sem_count() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    logs = _logs(3)
+    res = MagicMock()
+    res.scalars.return_value.all.return_value = logs
+    session.execute.return_value = res
+
+    pagina = await _listar(session, status_code=500)
+
+    assert session.execute.await_count == 1
+    assert pagina.total is None
+    assert [log.id for log in pagina.items] == [500, 499]
+    assert decode_cursor(pagina.next_cursor) == (logs[1].created_at, 499)
+
+    session.execute.reset_mock()
+    res.scalars.return_value.all.return_value = logs[2:]
+    pagina = await _listar(session, status_code=500, cursor=pagina.next_cursor)
+
+    compilado = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "OFFSET" not in compilado
+    assert "(core_auditlog.created_at, core_auditlog.id) <" in compilado
+    assert "ORDER BY core_auditlog.created_at DESC, core_auditlog.id DESC" in compilado
+    assert pagina.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_audit_logs_cursor_invalido() -> None:
+    with pytest.raises(HTTPException) as exc:
+        await _listar(AsyncMock(spec=AsyncSession), cursor="???")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_manter_particoes_cria_a_frente_e_aplica_retencao() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    existentes = MagicMock()
+    existentes.scalars.return_value = [
+        "core_auditlog_padrao",
+        "core_auditlog_p202509",
+        "core_auditlog_p202510",
+        "core_auditlog_p202610",
+        "core_auditlog_p202611",
+    ]
+    vazia = MagicMock()
+    vazia.scalar.return_value = False
+    session.execute.side_effect = lambda stmt, *a: existentes if "pg_inherits" in str(stmt) else vazia
+
+    resultado = await AuditLogService.manter_particoes(
+        session, meses_a_frente=3, retencao_meses=12, hoje=date(2026, 10, 18)
+    )
+
+    assert resultado == {
+        "criadas": ["core_auditlog_p202612", "core_auditlog_p202701"],
+        "removidas": ["core_auditlog_p202509"],
+    }
+    sqls = [str(c.args[0]) for c in session.execute.call_args_list]
+    assert "pg_advisory_xact_lock" in sqls[0]
+    assert (
+        "CREATE TABLE IF NOT EXISTS core_auditlog_p202701 PARTITION OF core_auditlog "
+        "FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2027-02-01 00:00:00+00')"
+    ) in sqls
+    assert "DROP TABLE IF EXISTS core_auditlog_p202509" in sqls
+
+
+@pytest.mark.asyncio
+async def test_manter_particoes_move_linhas_da_particao_padrao() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    existentes = MagicMock()
+    existentes.scalars.return_value = ["core_auditlog_padrao"]
+    com_linhas = MagicMock()
+    com_linhas.scalar.return_value = True
+    session.execute.side_effect = lambda stmt, *a: existentes if "pg_inherits" in str(stmt) else com_linhas
+
+    resultado = await AuditLogService.manter_particoes(
+        session, meses_a_frente=0, retencao_meses=12, hoje=date(2026, 10, 18)
+    )
+
+    assert resultado["criadas"] == ["core_auditlog_p202610"]
+    sqls = [str(c.args[0]) for c in session.execute.call_args_list]
+    assert not any("PARTITION OF core_auditlog FOR VALUES" in sql for sql in sqls)
+    criacao, movimento, anexacao = sqls[-3:]
+    assert criacao.startswith("CREATE TABLE core_auditlog_p202610 (LIKE core_auditlog")
+    assert "DELETE FROM core_auditlog_padrao" in movimento
+    assert "INSERT INTO core_auditlog_p202610" in movimento
+    assert anexacao == (
+        "ALTER TABLE core_auditlog ATTACH PARTITION core_auditlog_p202610 "
+        "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')"
+    )
@@ -0,0 +1,38 @@
+"""Testes da busca de produtos (pg_trgm + unaccent)."""
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.search import documento_busca, filtro_busca, normalizar_termo
+from app.inventory.models import Produto
+from app.pos.models import ItemVendaMobile
+
+# Expressões dos índices GIN criados em alembic/versions/0014_busca_trigram.py
+INDICES = {
+    "pos_itemvendamobile": "f_unaccent(lower((nome_produto || ' ') || codigo_produto))",
+    "inventory_produto": "f_unaccent(lower((nome || ' ') || sku))",
+}
+
+
+def _sql(expr) -> str:
+    return str(expr.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_normalizar_termo_remove_acentos() -> None:
+    assert normalizar_termo("  Açúcar Mascavo ") == "acucar mascavo"
+    assert normalizar_termo("PÃO DE QUEIJO") == "pao de queijo"
+
+
+def test_filtro_escapa_curingas() -> None:
+    filtro = filtro_busca(documento_busca(Produto.nome, Produto.sku), "50%_off")
+    assert filtro.right.value == "%50\\%\\_off%"
+
+
+def test_expressao_igual_a_do_indice() -> None:
+    # Se divergir do índice GIN, o planner volta ao seq scan.
+    esperado = {
+        "pos_itemvendamobile": documento_busca(ItemVendaMobile.nome_produto, ItemVendaMobile.codigo_produto),
+        "inventory_produto": documento_busca(Produto.nome, Produto.sku),
+    }
+    for tabela, expressao in INDICES.items():
+        gerado = _sql(esperado[tabela]).replace(f"{tabela}.", "")
+        assert gerado == expressao
@@ -0,0 +1,47 @@
+"""Testes do dashboard financeiro calculado por agregação SQL."""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance.schemas import DashboardKPIs
+from app.finance.services import LancamentoService
+
+
+def _result(rows) -> MagicMock:
+    res = MagicMock()
+    res.all.return_value = rows
+    return res
+
+
+async def test_dashboard_usa_so_linhas_agregadas() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.side_effect = [
+        _result([  # tipo, forma de pagamento, quantidade, soma
+            ("RECEITA", "PIX", 40, Decimal("1000.00")),
+            ("RECEITA", "DINHEIRO", 10, Decimal("200.00")),
+            ("DESPESA", "PIX", 5, Decimal("300.00")),
+        ]),
+        _result([("Inscrições", Decimal("1200.00")), ("Compras", Decimal("250.00")), ("Compras", Decimal("50.00"))]),
+    ]
+
+    dashboard = DashboardKPIs(**await LancamentoService.dashboard(session, 1))
+
+    assert session.execute.await_count == 2
+    assert dashboard.receitas == Decimal("1200.00")
+    assert dashboard.despesas == Decimal("300.00")
+    assert dashboard.saldo == Decimal("900.00")
+    assert dashboard.total_lancamentos == 55
+    assert dashboard.por_forma_pagamento == {"PIX": Decimal("1300.00"), "DINHEIRO": Decimal("200.00")}
+    assert dashboard.por_categoria == {"Inscrições": Decimal("1200.00"), "Compras": Decimal("300.00")}
+
+
+async def test_dashboard_de_evento_sem_lancamentos() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.side_effect = [_result([]), _result([])]
+
+    dashboard = DashboardKPIs(**await LancamentoService.dashboard(session, 1))
+
+    assert dashboard.saldo == 0 and dashboard.total_lancamentos == 0
+    assert dashboard.por_forma_pagamento == {} and dashboard.por_categoria == {}
@@ -0,0 +1,97 @@
+"""Testes das exportações financeiras em streaming (CSV/NDJSON)."""
+
+import asyncio
+import contextlib
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance import exportacao
+from app.finance.exportacao import com_sessao_propria, csv_em_blocos, ndjson_em_blocos
+from app.finance.services import LancamentoService
+
+
+async def _gerar(linhas):
+    for linha in linhas:
+        yield linha
+
+
+async def test_csv_sai_em_blocos_de_tamanho_fixo(monkeypatch) -> None:
+    monkeypatch.setattr(exportacao, "LOTE", 2)
+    linhas = [(i, f'descrição "{i}", com vírgula', Decimal("10.50")) for i in range(5)]
+
+    blocos = [b async for b in csv_em_blocos(_gerar(linhas), cabecalho=["id", "descricao", "valor"])]
+
+    assert len(blocos) == 3  # 2 + 2 + 1 linhas; o cabeçalho vai no primeiro bloco
+    texto = "".join(blocos)
+    assert texto.startswith(exportacao.BOM)
+    lidas = list(csv.reader(io.StringIO(texto.removeprefix(exportacao.BOM))))
+    assert lidas[0] == ["id", "descricao", "valor"]
+    assert lidas[3] == ["2", 'descrição "2", com vírgula', "10.50"]
+
+
+async def test_ndjson_preserva_centavos_e_datas() -> None:
+    objetos = [{"id": 1, "valor": Decimal("0.10"), "data": date(2026, 7, 10), "categoria": "Doações"}]
+
+    texto = "".join([b async for b in ndjson_em_blocos(_gerar(objetos))])
+
+    assert json.loads(texto) == {"id": 1, "valor": "0.10", "data": "2026-07-10", "categoria": "Doações"}
+
+
+async def test_exportar_lancamentos_usa_cursor_com_os_filtros_da_listagem() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.stream.return_value = _gerar([("linha",)])
+
+    linhas = [
+        linha
+        async for linha in LancamentoService.exportar(
+            session, 1, tipo="DESPESA", data_inicio=date(2026, 7, 1), data_fim=date(2026, 7, 31)
+        )
+    ]
+
+    assert linhas == [("linha",)]
+    stmt = session.stream.await_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == exportacao.LOTE
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "finance_lancamentofinanceiro.tipo = " in sql
+    assert "finance_lancamentofinanceiro.data >= " in sql and "finance_lancamentofinanceiro.data <= " in sql
+    assert len(stmt.selected_columns) == len(LancamentoService.EXPORTACAO_COLUNAS)
+
+
+async def test_exportacoes_tem_sessao_propria_e_vagas_limitadas(monkeypatch) -> None:
+    abertas: list[object] = []
+    fechadas: list[object] = []
+
+    @contextlib.asynccontextmanager
+    async def _fabrica():
+        sessao = object()
+        abertas.append(sessao)
+        try:
+            yield sessao
+        finally:
+            fechadas.append(sessao)
+
+    monkeypatch.setattr(exportacao, "async_session_factory", _fabrica)
+    monkeypatch.setattr(exportacao, "_vagas", asyncio.Semaphore(1))
+    liberar = asyncio.Event()
+
+    async def _linhas(sessao):
+        yield sessao
+        await liberar.wait()
+
+    primeira = com_sessao_propria(_linhas)
+    assert await anext(primeira) is abertas[0]
+    segunda = asyncio.create_task(anext(com_sessao_propria(_linhas)))
+    await asyncio.sleep(0.05)
+    assert not segunda.done() and len(abertas) == 1  # sem vaga, nem pega conexão
+
+    liberar.set()
+    assert [s async for s in primeira] == []
+    assert fechadas == abertas[:1]
+    assert await asyncio.wait_for(segunda, 1) is abertas[1]
@@ -0,0 +1,113 @@
+"""Testes do cache em disco do PDF do DRE e do pool de renderização."""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core import pdf as pool_pdf
+from app.finance import pdf
+from app.finance.pdf import DrePdfService
+
+
+def _dre(receitas: str) -> dict:
+    return {
+        "receitas_por_categoria": [{"categoria": "Inscrições", "total": Decimal(receitas)}],
+        "despesas_por_categoria": [],
+        "total_receitas": Decimal(receitas),
+        "total_despesas": Decimal("0.00"),
+        "resultado_liquido": Decimal(receitas),
+    }
+
+
+@pytest.fixture
+def renderizacoes(monkeypatch, tmp_path):
+    """Troca o pool de processos por threads e o WeasyPrint por um gravador de bytes."""
+    chamadas: list[str] = []
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def _renderizar(html_str: str, caminho: str, idade_versoes_antigas: float) -> None:
+        chamadas.append(caminho)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, "wb") as f:
+            f.write(b"%PDF")
+
+    monkeypatch.setattr(pdf, "_media_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(pool_pdf, "_get_executor", lambda: executor)
+    monkeypatch.setattr(pdf, "_renderizar", _renderizar)
+    yield chamadas
+    executor.shutdown()
+
+
+async def test_download_repetido_sai_do_disco(renderizacoes) -> None:
+    periodo = (date(2026, 7, 1), date(2026, 7, 31))
+
+    primeiro = await DrePdfService.gerar(_dre("100.00"), 1, "Acampamento", *periodo)
+    segundo = await DrePdfService.gerar(_dre("100.00"), 1, "Acampamento", *periodo)
+
+    assert primeiro == segundo
+    assert os.path.basename(primeiro).startswith("dre_1_2026-07-01_2026-07-31_")
+    assert renderizacoes == [primeiro]
+
+
+async def test_dados_novos_no_periodo_geram_outra_versao(renderizacoes) -> None:
+    antigo = await DrePdfService.gerar(_dre("100.00"), 1, "Acampamento", None, None)
+    novo = await DrePdfService.gerar(_dre("150.00"), 1, "Acampamento", None, None)
+
+    assert antigo != novo
+    assert len(renderizacoes) == 2
+
+
+async def test_downloads_simultaneos_renderizam_uma_vez(renderizacoes) -> None:
+    caminhos = await asyncio.gather(
+        *(DrePdfService.gerar(_dre("100.00"), 2, "Retiro", None, None) for _ in range(5))
+    )
+
+    assert len(set(caminhos)) == 1
+    assert len(renderizacoes) == 1
+    assert pdf._em_andamento == {}
+
+
+def test_html_do_dre_traz_periodo_e_totais() -> None:
+    html = pdf.montar_html_dre(_dre("1234.50"), "Acampamento", date(2026, 7, 1), None)
+
+    assert "A partir de 01/07/2026" in html
+    assert "R$ 1.234,50" in html
+    assert "Nenhuma despesa no período." in html
+    assert "<style>" not in html  # o CSS vai pré-analisado pelo processo do pool
+
+
+def test_versao_substituida_so_sai_depois_do_prazo(tmp_path) -> None:
+    agora = time.time()
+
+    def _versao(nome: str, idade: float) -> str:
+        caminho = tmp_path / nome
+        caminho.write_bytes(b"%PDF")
+        os.utime(caminho, (agora - idade, agora - idade))
+        return str(caminho)
+
+    antiga = _versao("dre_1_inicio_fim_aaa.pdf", 7200)
+    _versao("dre_1_inicio_fim_bbb.pdf", 600)  # recém-substituída: pode estar em download
+    _versao("dre_1_inicio_fim_ccc.pdf", 0)
+    _versao("dre_2_inicio_fim_ddd.pdf", 7200)  # única versão do outro DRE
+
+    assert pdf._versoes_antigas(str(tmp_path), 3600) == [antiga]
+
+
+async def test_pool_quebrado_e_descartado(monkeypatch) -> None:
+    class _Quebrado(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("processo morreu")
+
+    quebrado = _Quebrado(max_workers=1)
+    monkeypatch.setattr(pool_pdf, "_executor", quebrado)
+
+    with pytest.raises(BrokenProcessPool):
+        await pool_pdf.executar(print)
+
+    assert pool_pdf._executor is None  # a próxima chamada cria outro pool
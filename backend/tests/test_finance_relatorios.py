@@ -0,0 +1,127 @@
+"""Testes dos relatórios financeiros lidos do resumo diário."""
+
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.finance.schemas import DREOut
+from app.finance.services import ReportService, ResumoFinanceiroService
+
+
+def _sql(session: AsyncMock, indice: int = 0) -> str:
+    stmt = session.execute.await_args_list[indice].args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+async def test_dre_em_uma_consulta_ao_resumo() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = [
+        SimpleNamespace(tipo="RECEITA", cat_nome="Inscrições", total=Decimal("1000.00")),
+        SimpleNamespace(tipo="DESPESA", cat_nome="Alimentação", total=Decimal("300.00")),
+        SimpleNamespace(tipo="RECEITA", cat_nome="Cantina", total=Decimal("200.00")),
+        SimpleNamespace(tipo="DESPESA", cat_nome="Transporte", total=Decimal("100.00")),
+    ]
+
+    dre = DREOut(**await ReportService.dre(session, 1))
+
+    session.execute.assert_awaited_once()
+    assert "FROM finance_resumo_diario" in _sql(session)
+    assert dre.total_receitas == Decimal("1200.00")
+    assert dre.total_despesas == Decimal("400.00")
+    assert dre.resultado_liquido == Decimal("800.00")
+    assert round(dre.margem_percentual, 2) == 66.67
+    assert [linha.categoria for linha in dre.receitas_por_categoria] == ["Inscrições", "Cantina"]
+
+
+async def test_fluxo_de_caixa_acumula_saldo_por_dia() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = [
+        SimpleNamespace(data=date(2026, 7, 1), receitas=Decimal("100"), despesas=Decimal("30")),
+        SimpleNamespace(data=date(2026, 7, 2), receitas=Decimal("0"), despesas=Decimal("50")),
+    ]
+
+    fluxo = await ReportService.cash_flow(session, 1)
+
+    assert "FROM finance_resumo_diario" in _sql(session)
+    assert [linha["saldo_acumulado"] for linha in fluxo["linhas"]] == [Decimal("70"), Decimal("20")]
+    assert fluxo["saldo_final"] == Decimal("20")
+
+
+async def test_reconstruir_refaz_so_o_evento_pedido() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock(rowcount=12)
+
+    assert await ResumoFinanceiroService.reconstruir(session, 3) == 12
+
+    assert _sql(session, 0) == "LOCK TABLE finance_lancamentofinanceiro IN SHARE MODE"
+    assert _sql(session, 1).startswith("DELETE FROM finance_resumo_diario WHERE")
+    insercao = _sql(session, 2)
+    assert insercao.startswith("INSERT INTO finance_resumo_diario")
+    assert "GROUP BY finance_lancamentofinanceiro.evento_id" in insercao
+
+
+async def test_periodo_vai_para_o_sql_de_todos_os_relatorios() -> None:
+    periodo = {"data_inicio": date(2026, 7, 10), "data_fim": date(2026, 7, 12)}
+    for relatorio, tabela in (
+        (ReportService.dre, "finance_resumo_diario"),
+        (ReportService.cash_flow, "finance_resumo_diario"),
+        (ReportService.reconciliation, "finance_resumo_diario"),
+    ):
+        session = AsyncMock(spec=AsyncSession)
+        session.execute.return_value = []
+
+        await relatorio(session, 1, **periodo)
+
+        sql = _sql(session)
+        assert f"{tabela}.data >= " in sql and f"{tabela}.data <= " in sql, relatorio.__name__
+
+    session = AsyncMock(spec=AsyncSession)
+    session.stream.side_effect = lambda stmt: _Cursor([])
+    await ReportService.official_report(session, 1, **periodo)
+    for chamada in session.stream.await_args_list:
+        sql = str(chamada.args[0].compile(dialect=postgresql.dialect()))
+        assert "finance_lancamentofinanceiro.data >= " in sql and "finance_lancamentofinanceiro.data <= " in sql
+
+
+class _Cursor:
+    """Imita o AsyncResult de `session.stream`."""
+
+    def __init__(self, linhas) -> None:
+        self._linhas = iter(linhas)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._linhas)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def _linha_oficial(tipo: str, id_: int, valor: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        tipo=tipo, id=id_, data=date(2026, 7, 10), descricao=f"L{id_}", categoria="Geral",
+        valor=Decimal(valor), forma_pagamento="PIX",
+    )
+
+
+async def test_relatorio_oficial_le_colunas_por_cursor_do_servidor() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    cursores = iter([
+        _Cursor([_linha_oficial("RECEITA", 1, "100.00"), _linha_oficial("RECEITA", 2, "50.00")]),
+        _Cursor([_linha_oficial("DESPESA", 3, "30.00")]),
+    ])
+    session.stream.side_effect = lambda stmt: next(cursores)
+
+    relatorio = await ReportService.official_report(session, 1)
+
+    session.execute.assert_not_awaited()
+    stmt = session.stream.await_args_list[0].args[0]
+    assert stmt.get_execution_options()["yield_per"] > 0
+    assert [linha["id"] for linha in relatorio["receitas"]] == [1, 2]
+    assert relatorio["saldo"] == Decimal("120.00")
@@ -0,0 +1,32 @@
+"""Testes do health check público e das métricas internas."""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import get_current_user, get_token_payload
+from app.main import app
+
+
+def test_health_publico_nao_expoe_metricas() -> None:
+    resposta = TestClient(app).get("/api/v1/health")
+
+    assert resposta.status_code == 200
+    assert set(resposta.json()) == {"status", "project", "environment"}
+
+
+def test_metricas_exigem_admin_read() -> None:
+    cliente = TestClient(app)
+    assert cliente.get("/api/v1/health/metricas").status_code == 401
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, is_superuser=False)
+    try:
+        app.dependency_overrides[get_token_payload] = lambda: {"scopes": frozenset({"pos:read"})}
+        assert cliente.get("/api/v1/health/metricas").status_code == 403
+
+        app.dependency_overrides[get_token_payload] = lambda: {"scopes": frozenset({"admin:read"})}
+        resposta = cliente.get("/api/v1/health/metricas")
+    finally:
+        app.dependency_overrides.clear()
+    assert resposta.status_code == 200
+    assert {"db_pool", "audit", "principal_cache", "jwt_cache", "revogacoes"} <= set(resposta.json())
@@ -0,0 +1,70 @@
+"""Testes do hash PBKDF2 fora do event loop."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import passwords, routers
+from app.auth.schemas import LoginIn
+from app.core.models import User
+
+
+@pytest.mark.asyncio
+async def test_hash_async_compativel_com_django_e_nao_trava_o_loop() -> None:
+    ticks = 0
+    parar = asyncio.Event()
+
+    async def _relogio() -> None:
+        nonlocal ticks
+        while not parar.is_set():
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    relogio = asyncio.create_task(_relogio())
+    try:
+        hashed = await passwords.hash_password_async("s3nha")
+        assert await passwords.verify_password_async("s3nha", hashed)
+        assert not await passwords.verify_password_async("outra", hashed)
+    finally:
+        parar.set()
+        await relogio
+        passwords.encerrar_executor()
+
+    assert hashed.startswith("pbkdf2_sha256$600000$")
+    assert passwords.verify_password("s3nha", hashed)  # versão síncrona lê o mesmo formato
+    # cada hash leva centenas de ms; com o loop livre o relógio anda dezenas de vezes
+    assert ticks > 20
+
+
+@pytest.mark.asyncio
+async def test_login_devolve_a_conexao_antes_do_hash(monkeypatch) -> None:
+    session = AsyncMock(spec=AsyncSession)
+    usuario = User(
+        id=7, username="ana", password="hash", is_active=True, is_superuser=False, is_staff=False,
+        first_name="Ana", last_name="", email="", groups=[],
+    )
+    resultado = MagicMock()
+    resultado.scalar_one_or_none.return_value = usuario
+    session.execute.return_value = resultado
+    commits_ao_verificar: list[int] = []
+
+    async def _verificar(senha: str, hashed: str) -> bool:
+        commits_ao_verificar.append(session.commit.await_count)
+        return True
+
+    get_scopes = AsyncMock(return_value=["core:read"])
+    monkeypatch.setattr(routers, "verify_password_async", _verificar)
+    monkeypatch.setattr(routers.UserService, "get_scopes", get_scopes)
+    monkeypatch.setattr(routers.SessaoService, "abrir", AsyncMock(return_value="sid"))
+
+    try:
+        token = await routers.login(LoginIn(username="ana", password="s3nha"), Response(), session)
+    finally:
+        routers.principal_cache.invalidar(7)
+
+    assert commits_ao_verificar == [1]  # transação encerrada antes do PBKDF2
+    assert token.user.scopes == ["core:read"]
+    get_scopes.assert_awaited_once()  # a resposta reaproveita os scopes do token
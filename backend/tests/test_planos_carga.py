@@ -0,0 +1,107 @@
+"""Planos de carga explícitos: relacionamentos não carregam sozinhos e cada
+endpoint tem um orçamento de consultas."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import configure_mappers, selectinload
+
+from app.auth.dependencies import get_current_user
+from app.auth.jwt import create_access_token
+from app.auth.principal import Principal, principal_cache
+from app.auth.routers import me
+from app.auth.verificacao import verificar_access_token
+from app.core.services import AuditLogService, UserService
+from app.db.base import Base
+from app.finance.services import LancamentoService
+from app.inventory.models import RequisicaoSaida
+from app.inventory.services import CotacaoService, RequisicaoService
+from app.pos.services import VendaService
+
+
+def test_relacionamentos_sao_lazy_raise() -> None:
+    configure_mappers()
+    implicitos = [
+        f"{mapper.class_.__name__}.{rel.key} ({rel.lazy})"
+        for mapper in Base.registry.mappers
+        for rel in mapper.relationships
+        if rel.lazy != "raise"
+    ]
+    assert implicitos == []
+
+
+@pytest.mark.asyncio
+async def test_orcamento_estoura_com_selectin_extra(orcamento_consultas) -> None:
+    session = AsyncMock(spec=AsyncSession)
+
+    with pytest.raises(AssertionError, match="2 consultas"), orcamento_consultas(session, 1):
+        await session.execute(select(RequisicaoSaida).options(selectinload(RequisicaoSaida.itens)))
+
+
+@pytest.mark.asyncio
+async def test_usuario_autenticado_sai_do_cache_sem_consultas(orcamento_consultas) -> None:
+    principal_cache.invalidar()
+    session = AsyncMock(spec=AsyncSession)
+    res = MagicMock()
+    res.one_or_none.return_value = SimpleNamespace(
+        id=7, username="ana", is_active=True, is_superuser=False, is_staff=False
+    )
+    res.scalars.return_value.all.return_value = ["finance:read"]
+    session.execute.return_value = res
+    token = create_access_token(subject=7, is_superuser=False, groups=[], scopes=[], evento_id=None)
+    payload = verificar_access_token(token)
+
+    with orcamento_consultas(session, 3):  # usuário + 2 leituras de scopes
+        user = await get_current_user(SimpleNamespace(state=SimpleNamespace()), payload, session)
+    with orcamento_consultas(session, 0):
+        de_novo = await get_current_user(SimpleNamespace(state=SimpleNamespace()), payload, session)
+
+    assert de_novo is user
+    assert user.id == 7 and "finance:read" in user.scopes
+
+
+@pytest.mark.asyncio
+async def test_me_carrega_grupos_sob_demanda(orcamento_consultas) -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.get.return_value = SimpleNamespace(
+        id=7, username="ana", first_name="Ana", last_name="", email="",
+        is_superuser=False, is_staff=False, groups=[SimpleNamespace(id=1, name="Caixa")],
+    )
+    current = Principal(
+        id=7, username="ana", is_active=True, is_superuser=False, is_staff=False,
+        scopes=frozenset({"core:read"}),
+    )
+
+    with orcamento_consultas(session, 2):  # usuário + grupos; scopes vêm do principal
+        out = await me(current, session)
+
+    session.execute.assert_not_awaited()
+    assert [g.name for g in out.groups] == ["Caixa"]
+    assert out.scopes == ["core:read"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("chamada", "limite"),
+    [
+        (lambda s: RequisicaoService.get(s, 1), 2),  # requisição + itens (produto por JOIN)
+        (lambda s: CotacaoService.get(s, 1), 3),  # cotação + itens + preços
+        (lambda s: RequisicaoService.list(s, 1), 3),  # count + página + itens
+        (lambda s: CotacaoService.list(s, 1), 4),  # count + página + itens + preços
+        (lambda s: LancamentoService.list(s, 1), 3),  # count + página + anexos
+        (lambda s: LancamentoService.get(s, 1), 2),
+        (lambda s: AuditLogService.list_paginated(s), 2),  # usuário por JOIN
+        (lambda s: UserService.list_all(s), 2),
+        (lambda s: VendaService._travar_produtos(s, [3, 1, 2]), 1),
+    ],
+)
+async def test_orcamento_de_consultas_por_servico(orcamento_consultas, chamada, limite) -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    session.get.return_value = MagicMock()
+
+    with orcamento_consultas(session, limite):
+        await chamada(session)
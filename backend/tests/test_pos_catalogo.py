@@ -0,0 +1,95 @@
+"""Testes do catálogo versionado do PDV (ETag / delta)."""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.pos.routers import catalogo_local
+from app.pos.services import CatalogoPDVService
+
+
+def _versao_res(catalogo_versao: int) -> MagicMock:
+    res = MagicMock()
+    res.scalar_one_or_none.return_value = catalogo_versao
+    return res
+
+
+def _itens_res(*versoes: int) -> MagicMock:
+    res = MagicMock()
+    rows = []
+    for versao in versoes:
+        row = MagicMock()
+        row._mapping = {
+            "id": versao,
+            "produto_id": 1,
+            "nome": "Pastel",
+            "sku": "P1",
+            "familia_id": None,
+            "familia": "",
+            "preco_venda": Decimal("5.00"),
+            "estoque_atual": Decimal("3"),
+            "ativo": True,
+            "versao": versao,
+        }
+        rows.append(row)
+    res.all.return_value = rows
+    return res
+
+
+async def _catalogo(session, **kwargs):
+    params = {"desde": None, "if_none_match": None}
+    params.update(kwargs)
+    response = Response()
+    result = await catalogo_local(local_id=1, user=MagicMock(), session=session, response=response, **params)
+    return result, response
+
+
+@pytest.mark.asyncio
+async def test_catalogo_304_quando_versao_nao_mudou() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = _versao_res(7)
+
+    result, _ = await _catalogo(session, if_none_match='"1-7"')
+
+    assert result.status_code == 304
+    assert result.headers["ETag"] == '"1-7"'
+    assert session.execute.await_count == 1  # só a leitura da versão
+
+
+@pytest.mark.asyncio
+async def test_catalogo_completo_fica_em_cache_ate_mudar_a_versao() -> None:
+    CatalogoPDVService._cache.clear()
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.side_effect = [_versao_res(7), _itens_res(5, 7), _versao_res(7)]
+
+    data, response = await _catalogo(session)
+    assert data["completo"] is True
+    assert [item["id"] for item in data["itens"]] == [5, 7]
+    assert response.headers["ETag"] == '"1-7"'
+
+    data_cache, _ = await _catalogo(session)
+    assert data_cache is data
+    assert session.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_catalogo_delta_e_remocao_forca_completo() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    removido = MagicMock()
+    removido.scalar_one.return_value = 0
+    session.execute.side_effect = [_versao_res(9), _itens_res(9), removido]
+
+    data, _ = await _catalogo(session, desde=7)
+    assert data["completo"] is False
+    assert [item["versao"] for item in data["itens"]] == [9]
+
+    CatalogoPDVService._cache.clear()
+    removido_depois = MagicMock()
+    removido_depois.scalar_one.return_value = 8
+    session.execute.side_effect = [_versao_res(9), _itens_res(9), removido_depois, _itens_res(5, 9)]
+
+    data, _ = await _catalogo(session, desde=7)
+    assert data["completo"] is True
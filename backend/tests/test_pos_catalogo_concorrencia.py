@@ -0,0 +1,119 @@
+"""Versão do catálogo do PDV com escritas concorrentes (Postgres real).
+
+Roda os triggers da migração 0023 num schema temporário. Precisa de
+TEST_DATABASE_URL (postgresql://...); sem ela o módulo é pulado.
+"""
+
+import ast
+import asyncio
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+
+DSN = os.getenv("TEST_DATABASE_URL", "").replace("postgresql+asyncpg://", "postgresql://")
+pytestmark = pytest.mark.skipif(not DSN, reason="TEST_DATABASE_URL não definida")
+
+_MIGRACAO = Path(__file__).parents[1] / "alembic" / "versions" / "0023_pos_catalogo_versao_local.py"
+
+
+def _sql_da_migracao() -> dict[str, str]:
+    """Constantes SQL da migração (importá-la exigiria o `op` do alembic)."""
+    arvore = ast.parse(_MIGRACAO.read_text())
+    return {
+        no.targets[0].id: ast.literal_eval(no.value)
+        for no in arvore.body
+        if isinstance(no, ast.Assign) and no.targets[0].id.startswith("FUNCAO_")
+    }
+
+
+@pytest.fixture
+async def conexoes():
+    import asyncpg
+
+    schema = f"teste_catalogo_{uuid.uuid4().hex[:8]}"
+    admin = await asyncpg.connect(DSN)
+    await admin.execute(f"CREATE SCHEMA {schema}")
+    abertas = [await asyncpg.connect(DSN, server_settings={"search_path": schema}) for _ in range(3)]
+    migracao = _sql_da_migracao()
+    await abertas[0].execute(
+        """
+        CREATE TABLE pos_localvenda (
+            id bigint PRIMARY KEY,
+            catalogo_versao bigint NOT NULL DEFAULT 0,
+            catalogo_remocao_versao bigint NOT NULL DEFAULT 0
+        );
+        CREATE TABLE pos_produtolocal (
+            id bigint PRIMARY KEY,
+            local_id bigint NOT NULL REFERENCES pos_localvenda (id),
+            estoque_atual numeric(12, 2) NOT NULL,
+            versao bigint NOT NULL DEFAULT 0
+        );
+        """
+    )
+    await abertas[0].execute(migracao["FUNCAO_VERSAO"])
+    await abertas[0].execute(migracao["FUNCAO_REMOCAO"])
+    await abertas[0].execute(
+        """
+        CREATE TRIGGER trg_produtolocal_versao BEFORE INSERT OR UPDATE ON pos_produtolocal
+        FOR EACH ROW EXECUTE FUNCTION pos_produtolocal_bump_versao();
+        CREATE TRIGGER trg_produtolocal_remocao_versao AFTER DELETE ON pos_produtolocal
+        FOR EACH ROW EXECUTE FUNCTION pos_produtolocal_remocao_versao();
+        INSERT INTO pos_localvenda (id) VALUES (1);
+        INSERT INTO pos_produtolocal (id, local_id, estoque_atual) VALUES (1, 1, 10), (2, 1, 10);
+        """
+    )
+    try:
+        yield abertas
+    finally:
+        for conn in abertas:
+            await conn.close()
+        await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+        await admin.close()
+
+
+async def test_versao_so_fica_visivel_depois_das_menores(conexoes) -> None:
+    escritor_a, escritor_b, terminal = conexoes
+    inicial = await terminal.fetchval("SELECT catalogo_versao FROM pos_localvenda WHERE id = 1")
+
+    transacao_a = escritor_a.transaction()
+    await transacao_a.start()
+    versao_a = await escritor_a.fetchval(
+        "UPDATE pos_produtolocal SET estoque_atual = estoque_atual - 1 WHERE id = 1 RETURNING versao"
+    )
+
+    async def escrever_b() -> int:
+        async with escritor_b.transaction():
+            return await escritor_b.fetchval(
+                "UPDATE pos_produtolocal SET estoque_atual = estoque_atual - 1 WHERE id = 2 RETURNING versao"
+            )
+
+    # B começou depois de A mas em outra linha: com nextval comitaria antes com versão maior
+    tarefa_b = asyncio.create_task(escrever_b())
+    await asyncio.sleep(0.3)
+    assert not tarefa_b.done()
+    assert await terminal.fetchval("SELECT catalogo_versao FROM pos_localvenda WHERE id = 1") == inicial
+
+    await transacao_a.commit()
+    versao_b = await asyncio.wait_for(tarefa_b, timeout=5)
+
+    assert versao_b == versao_a + 1
+    atual = await terminal.fetchval("SELECT catalogo_versao FROM pos_localvenda WHERE id = 1")
+    assert atual == versao_b
+    # Um terminal em `desde=inicial` recebe as duas escritas
+    delta = await terminal.fetch(
+        "SELECT id FROM pos_produtolocal WHERE local_id = 1 AND versao > $1 ORDER BY id", inicial
+    )
+    assert [row["id"] for row in delta] == [1, 2]
+
+
+async def test_remocao_marca_a_versao_do_local(conexoes) -> None:
+    escritor, _, terminal = conexoes
+
+    await escritor.execute("DELETE FROM pos_produtolocal WHERE id = 2")
+
+    versao, remocao = await terminal.fetchrow(
+        "SELECT catalogo_versao, catalogo_remocao_versao FROM pos_localvenda WHERE id = 1"
+    )
+    assert versao == remocao > 0
@@ -0,0 +1,55 @@
+"""Testes do dashboard do PDV calculado por agregação SQL."""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.pos.schemas import PDVDashboard
+from app.pos.services import PDVDashboardService
+
+
+def _result(rows=None, one=None, scalars=None) -> MagicMock:
+    res = MagicMock()
+    res.all.return_value = rows or []
+    res.one.return_value = one
+    res.scalars.return_value.all.return_value = scalars or []
+    return res
+
+
+@pytest.mark.asyncio
+async def test_dashboard_monta_kpis_a_partir_de_linhas_agregadas() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.side_effect = [
+        _result(one=(2, Decimal("80.00"))),  # totais das vendas
+        _result(rows=[  # itens por produto: nome, qtd, receita, custo
+            ("Refrigerante", 5, Decimal("50.00"), Decimal("20.00")),
+            ("Pastel", 3, Decimal("30.00"), Decimal("12.00")),
+        ]),
+        _result(rows=[("Bebidas", Decimal("50.00")), ("Sem Família", Decimal("30.00"))]),
+        _result(rows=[("PIX", Decimal("50.00")), ("DINHEIRO", Decimal("30.00")), ("VALE", Decimal("1.00"))]),
+        _result(rows=[("Retiro", Decimal("80.00"))]),
+        _result(rows=[(7, Decimal("80.00"))]),
+        _result(rows=[("Bebidas", Decimal("10.00"), Decimal("100.00"), Decimal("40.00"))]),
+        _result(scalars=["Refrigerante", "Pastel", "Água"]),  # catálogo do local
+        _result(rows=[("Refrigerante", Decimal("150.00"))]),
+        _result(rows=[(9, "", "Água", "Sem Família", "Ruptura de Estoque", Decimal("0.00"))]),
+    ]
+
+    data = await PDVDashboardService.dashboard(session, 1)
+    dashboard = PDVDashboard(**data)
+
+    assert dashboard.total_vendas == 2
+    assert dashboard.ticket_medio == Decimal("40.00")
+    assert dashboard.itens_vendidos == 8
+    assert dashboard.lucro_liquido == Decimal("48.00")
+    assert dashboard.vendas_por_mes == {"Jul": Decimal("80.00")}
+    assert set(dashboard.vendas_por_pagamento) == {"DINHEIRO", "DÉBITO", "CRÉDITO", "PIX"}
+    assert dashboard.vendas_por_pagamento["PIX"] == Decimal("50.00")
+    assert [p.nome for p in dashboard.top_10_mais_vendidos] == ["Refrigerante", "Pastel", "Água"]
+    assert dashboard.top_10_menos_vendidos[0].nome == "Água"
+    assert dashboard.top_10_menos_vendidos[0].qtd == 0
+    assert dashboard.custo_total_estoque == Decimal("40.00")
+    assert dashboard.produtos_baixo_estoque[0].codigo == "9"
+    assert session.execute.await_count == 10
@@ -0,0 +1,53 @@
+"""Testes do canal de push do PDV (fan-out dos NOTIFY por local)."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.pos.stream import CANAL, PDVEventBroker, formatar_sse
+
+
+@pytest.mark.asyncio
+async def test_broker_distribui_por_local_e_descarta_excesso() -> None:
+    broker = PDVEventBroker()
+    broker.FILA_MAXIMA = 2
+    with patch.object(PDVEventBroker, "iniciar"):
+        async with broker.assinar(1) as fila_1, broker.assinar(2) as fila_2:
+            for estoque in (5, 4, 3):
+                broker._ao_notificar(
+                    None, None, CANAL, json.dumps({"tipo": "produto", "local_id": 1, "estoque_atual": estoque})
+                )
+            broker._ao_notificar(None, None, CANAL, json.dumps({"tipo": "caixa", "local_id": 2}))
+
+            # Fila cheia descarta o evento mais antigo
+            assert [fila_1.get_nowait()["estoque_atual"] for _ in range(2)] == [4, 3]
+            assert fila_2.get_nowait()["tipo"] == "caixa"
+            assert fila_1.empty() and fila_2.empty()
+
+    assert broker._assinantes == {}
+
+
+def test_formatar_sse() -> None:
+    texto = formatar_sse({"tipo": "produto", "local_id": 1, "versao": 42})
+    assert texto.startswith("event: produto\nid: 42\ndata: {")
+    assert texto.endswith("\n\n")
+
+
+@pytest.mark.asyncio
+async def test_stream_aceita_ticket_do_proprio_local() -> None:
+    from fastapi import HTTPException
+
+    from app.auth.jwt import create_access_token, create_stream_ticket
+    from app.pos.routers import _usuario_do_stream
+
+    ticket = create_stream_ticket(7, local_id=1, sessao="s1")
+    with patch("app.pos.routers.get_current_user", AsyncMock(return_value="principal")) as atual:
+        assert await _usuario_do_stream(None, 1, None, None, ticket=ticket) == "principal"
+        assert atual.await_args.args[1]["sub"] == "7"
+
+        # EventSource de outro local, ou access token no lugar do ticket: 401
+        for invalido in (ticket, create_access_token(7)):
+            with pytest.raises(HTTPException) as erro:
+                await _usuario_do_stream(None, 2, None, None, ticket=invalido)
+            assert erro.value.status_code == 401
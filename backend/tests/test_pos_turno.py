@@ -3,21 +3,19 @@
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.pos.finance_integration import POSFinanceIntegration
-from app.pos.models import LocalVenda, TurnoCaixa, VendaMobile, PagamentoVenda
+from app.pos.models import LocalVenda, TurnoCaixa
+from app.pos.relatorios import RelatorioTurnoService
 from app.core.models import Evento
 from app.finance.models import CategoriaFinanceira, ContaCaixa
 
 
 @pytest.mark.asyncio
-@patch("weasyprint.HTML")
-@patch("builtins.open")
-@patch("os.makedirs")
-async def test_consolidar_turno_e_fechar_sucesso(
-    mock_makedirs, mock_open, mock_html
-) -> None:
+@patch.object(RelatorioTurnoService, "agendar_apos_commit")
+async def test_consolidar_turno_e_fechar_sucesso(mock_agendar) -> None:
     session = AsyncMock(spec=AsyncSession)
 
     # Mock LocalVenda
@@ -39,15 +37,6 @@ async def test_consolidar_turno_e_fechar_sucesso(
         fechado=False,
     )
 
-    # Mock Vendas
-    venda1 = VendaMobile(id=1, total=Decimal("50.00"), turno_id=10)
-    venda1.pagamentos = [PagamentoVenda(tipo="PIX", valor=Decimal("50.00"))]
-    venda1.itens = []
-    
-    venda2 = VendaMobile(id=2, total=Decimal("30.00"), turno_id=10)
-    venda2.pagamentos = [PagamentoVenda(tipo="DINHEIRO", valor=Decimal("30.00"))]
-    venda2.itens = []
-
     # Mock Categoria and Conta
     categoria = CategoriaFinanceira(id=2, nome="Vendas PDV")
     conta = ContaCaixa(id=3, nome="Caixa PDV")
@@ -57,18 +46,16 @@ async def test_consolidar_turno_e_fechar_sucesso(
     mock_local_res = MagicMock()
     mock_local_res.scalar_one_or_none.return_value = local
     
-    # 2. Get Vendas
-    mock_vendas_res = MagicMock()
-    mock_vendas_res.scalars.return_value.unique.return_value.all.return_value = [venda1, venda2]
-
-    # 3. Items summary query
-    mock_items_res = MagicMock()
-    mock_items_res.all.return_value = [] # no items for simplicity
+    # 2. Resumo corrente do turno (contadores + totais por forma)
+    mock_totais_res = MagicMock()
+    mock_totais_res.one_or_none.return_value = (2, Decimal("80.00"))
+    mock_formas_res = MagicMock()
+    mock_formas_res.all.return_value = [("PIX", Decimal("50.00")), ("DINHEIRO", Decimal("30.00"))]
 
     session.execute.side_effect = [
         mock_local_res,      # local query
-        mock_vendas_res,     # vendas query
-        mock_items_res,      # items query
+        mock_totais_res,     # contadores do turno
+        mock_formas_res,     # resumo por forma
     ]
 
     async def mock_get(model, ident, **kwargs):
@@ -95,11 +82,10 @@ async def test_consolidar_turno_e_fechar_sucesso(
         assert turno.fechado is True
         assert turno.fechado_por_id == 9
         assert turno.valor_fechamento == Decimal("80.00")
-        assert turno.relatorio_pdf == "pos/fechamento_10.pdf"
-
-        # Check mock pdf generation called
-        mock_html.assert_called_once()
-        mock_open.assert_called_once()
+        # O PDF não é mais gerado na requisição: fica pendente até o commit
+        assert turno.relatorio_pdf is None
+        assert turno.relatorio_status == TurnoCaixa.RELATORIO_PENDENTE
+        mock_agendar.assert_called_once_with(session, 10)
 
         # Verifica se os lançamentos financeiros foram criados com o evento_id correto
         from app.finance.models import LancamentoFinanceiro
@@ -108,3 +94,86 @@ async def test_consolidar_turno_e_fechar_sucesso(
         assert len(lancamentos) > 0
         for lanc in lancamentos:
             assert lanc.evento_id == 1
+            assert lanc.turno_caixa_id == 10
+        # O anexo do PDF só entra quando o arquivo existir (RelatorioTurnoService.anexar)
+        from app.finance.models import AnexoLancamento
+        assert not [obj for obj in added_objs if isinstance(obj, AnexoLancamento)]
+
+
+@pytest.mark.asyncio
+async def test_resumo_turno_registrar_e_obter() -> None:
+    from app.pos.services import ResumoTurnoService
+
+    session = AsyncMock(spec=AsyncSession)
+    await ResumoTurnoService.registrar(
+        session,
+        10,
+        total=Decimal("50.00"),
+        pagamentos=[("PIX", Decimal("20.00")), ("PIX", Decimal("10.00")), ("DINHEIRO", Decimal("20.00"))],
+    )
+    # Um UPDATE nos contadores + um UPSERT agrupado por forma
+    assert session.execute.await_count == 2
+
+    totais = MagicMock()
+    totais.one_or_none.return_value = (1, Decimal("50.00"))
+    formas = MagicMock()
+    formas.all.return_value = [("PIX", Decimal("30.00")), ("DINHEIRO", Decimal("20.00"))]
+    session.execute.side_effect = [totais, formas]
+
+    resumo = await ResumoTurnoService.obter(session, 10)
+    assert resumo["total_vendas"] == 1
+    assert resumo["soma_total"] == Decimal("50.00")
+    assert resumo["por_forma"] == {"PIX": Decimal("30.00"), "DINHEIRO": Decimal("20.00")}
+
+
+@pytest.mark.asyncio
+@patch("app.core.pdf._get_executor")
+async def test_gerar_relatorio_turno_publica_pdf(mock_executor) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    session = AsyncMock(spec=AsyncSession)
+    reivindicado = MagicMock()
+    reivindicado.scalar_one_or_none.return_value = 10
+    session.execute.side_effect = [reivindicado, MagicMock(), MagicMock()]
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    mock_executor.return_value = ThreadPoolExecutor(max_workers=1)
+
+    with patch("app.pos.relatorios.async_session_factory", factory), patch.object(
+        RelatorioTurnoService, "montar_html", AsyncMock(return_value="<html></html>")
+    ), patch("app.pos.relatorios._renderizar_pdf") as mock_render:
+        await RelatorioTurnoService.gerar(10)
+
+    mock_render.assert_called_once()
+    assert mock_render.call_args.args[1].endswith("pos/fechamento_10.pdf")
+    reivindicacao = str(session.execute.await_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+    assert "relatorio_reivindicado_em < now() - " in reivindicacao
+    final = session.execute.await_args_list[1].args[0].compile().params
+    assert final["relatorio_status"] == TurnoCaixa.RELATORIO_PRONTO
+    assert final["relatorio_pdf"] == "pos/fechamento_10.pdf"
+    anexo = str(session.execute.await_args_list[2].args[0].compile(dialect=postgresql.dialect()))
+    assert anexo.startswith("INSERT INTO finance_anexolancamento")
+    assert "finance_lancamentofinanceiro.turno_caixa_id = " in anexo
+
+
+@pytest.mark.asyncio
+@patch("app.core.pdf._get_executor")
+async def test_gerar_relatorio_com_erro_nao_anexa_pdf(mock_executor) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    session = AsyncMock(spec=AsyncSession)
+    reivindicado = MagicMock()
+    reivindicado.scalar_one_or_none.return_value = 10
+    session.execute.side_effect = [reivindicado, MagicMock()]
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = session
+    mock_executor.return_value = ThreadPoolExecutor(max_workers=1)
+
+    with patch("app.pos.relatorios.async_session_factory", factory), patch.object(
+        RelatorioTurnoService, "montar_html", AsyncMock(return_value="<html></html>")
+    ), patch("app.pos.relatorios._renderizar_pdf", side_effect=OSError("disco cheio")):
+        await RelatorioTurnoService.gerar(10)
+
+    assert session.execute.await_count == 2
+    final = session.execute.await_args_list[-1].args[0].compile().params
+    assert final["relatorio_status"] == TurnoCaixa.RELATORIO_ERRO
@@ -0,0 +1,85 @@
+"""Testes da exclusão de venda do PDV (estorno set-based)."""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.pos.services import VendaService
+
+
+def _sql(call) -> str:
+    return str(call.args[0].compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_excluir_venda_usa_statements_em_lote() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    venda_res = MagicMock()
+    venda_res.one_or_none.return_value = SimpleNamespace(
+        id=5, total=Decimal("30.00"), turno_id=10, fechado=False
+    )
+    pagamentos_res = MagicMock()
+    pagamentos_res.all.return_value = [SimpleNamespace(tipo="PIX", valor=Decimal("30.00"))]
+    session.execute.side_effect = [venda_res, pagamentos_res] + [MagicMock() for _ in range(10)]
+
+    await VendaService.excluir(session, venda_id=5, evento_id=1)
+
+    sqls = [_sql(call) for call in session.execute.await_args_list]
+    # venda, pagamentos, resumo (2), lock, estoque, 5 deletes - independe do nº de itens
+    assert len(sqls) == 11
+    assert not any("ILIKE" in sql.upper() for sql in sqls)
+    estoque = next(sql for sql in sqls if sql.startswith("UPDATE pos_produtolocal"))
+    assert "FROM (SELECT" in estoque
+    assert any("DELETE FROM finance_lancamentofinanceiro" in sql and "venda_pdv_id" in sql for sql in sqls)
+
+
+@pytest.mark.asyncio
+async def test_excluir_venda_remove_anexos_dos_lancamentos_antes() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    venda_res = MagicMock()
+    venda_res.one_or_none.return_value = SimpleNamespace(
+        id=5, total=Decimal("30.00"), turno_id=10, fechado=False
+    )
+    pagamentos_res = MagicMock()
+    pagamentos_res.all.return_value = [SimpleNamespace(tipo="PIX", valor=Decimal("30.00"))]
+    session.execute.side_effect = [venda_res, pagamentos_res] + [MagicMock() for _ in range(10)]
+
+    await VendaService.excluir(session, venda_id=5, evento_id=1)
+
+    sqls = [_sql(call) for call in session.execute.await_args_list]
+    anexos = next(i for i, sql in enumerate(sqls) if sql.startswith("DELETE FROM finance_anexolancamento"))
+    lancamentos = next(i for i, sql in enumerate(sqls) if sql.startswith("DELETE FROM finance_lancamentofinanceiro"))
+    # a FK do anexo não tem ON DELETE: apagar o lançamento primeiro daria IntegrityError
+    assert anexos < lancamentos
+    assert "lancamento_id IN (SELECT finance_lancamentofinanceiro.id" in sqls[anexos]
+    assert "finance_lancamentofinanceiro.venda_pdv_id = " in sqls[anexos]
+
+
+@pytest.mark.asyncio
+async def test_excluir_venda_de_caixa_fechado() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    venda_res = MagicMock()
+    venda_res.one_or_none.return_value = SimpleNamespace(
+        id=5, total=Decimal("30.00"), turno_id=10, fechado=True
+    )
+    session.execute.return_value = venda_res
+
+    with pytest.raises(ValueError):
+        await VendaService.excluir(session, venda_id=5, evento_id=1)
+    assert session.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_excluir_venda_inexistente() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    venda_res = MagicMock()
+    venda_res.one_or_none.return_value = None
+    session.execute.return_value = venda_res
+
+    with pytest.raises(NoResultFound):
+        await VendaService.excluir(session, venda_id=5, evento_id=1)
@@ -0,0 +1,72 @@
+"""Testes da paginação por keyset de GET /pos/vendas."""
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.paginacao import decode_cursor
+from app.pos.models import VendaMobile
+from app.pos.routers import listar_vendas
+
+
+def _vendas(n: int) -> list[VendaMobile]:
+    base = datetime(2026, 7, 1, 12, 0, tzinfo=UTC)
+    return [
+        VendaMobile(
+            id=100 - i,
+            id_referencia=f"ref-{i}",
+            evento_id=1,
+            local_id=2,
+            vendedor_id=9,
+            data_hora=base - timedelta(minutes=i),
+            total=Decimal("10.00"),
+            forma_pagamento="PIX",
+            turno_id=None,
+            itens=[],
+            pagamentos=[],
+        )
+        for i in range(n)
+    ]
+
+
+async def _listar(session, **kwargs):
+    params = dict(page=1, page_size=2, local_id=2, familia=None, produto=None, cursor=None, incluir_total=False)
+    params.update(kwargs)
+    return await listar_vendas(user=MagicMock(), evento_id=1, session=session, **params)
+
+
+@pytest.mark.asyncio
+async def test_listar_vendas_keyset_sem_total() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    vendas = _vendas(3)  # page_size + 1: há próxima página
+    res = MagicMock()
+    res.scalars.return_value.all.return_value = vendas
+    session.execute.return_value = res
+
+    pagina = await _listar(session)
+
+    assert session.execute.await_count == 1  # sem COUNT
+    assert pagina.total is None
+    assert [v.id for v in pagina.items] == [100, 99]
+    assert decode_cursor(pagina.next_cursor) == (vendas[1].data_hora, 99)
+
+    session.execute.reset_mock()
+    res.scalars.return_value.all.return_value = vendas[2:]
+    pagina = await _listar(session, cursor=pagina.next_cursor)
+
+    stmt = session.execute.await_args.args[0]
+    compilado = str(stmt.compile())
+    assert "OFFSET" not in compilado
+    assert "(pos_vendamobile.data_hora, pos_vendamobile.id) <" in compilado
+    assert pagina.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_listar_vendas_cursor_invalido() -> None:
+    with pytest.raises(HTTPException) as exc:
+        await _listar(AsyncMock(spec=AsyncSession), cursor="não-é-cursor")
+    assert exc.value.status_code == 400
@@ -0,0 +1,141 @@
+"""Testes da ingestão em lote de vendas do PDV (replay offline)."""
+
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import Evento
+from app.inventory.models import Produto
+from app.pos.models import LocalVenda, ProdutoLocal
+from app.pos.schemas import VendaCreate
+from app.pos.services import VendaService
+
+
+def _venda(ref: str, quantidade: int, valor: str) -> VendaCreate:
+    return VendaCreate(
+        local_id=1,
+        id_referencia=ref,
+        itens=[{"produto_local_id": 5, "quantidade": quantidade}],
+        pagamentos=[{"tipo": "PIX", "valor": valor}],
+    )
+
+
+@pytest.mark.asyncio
+async def test_criar_lote_status_por_venda() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.get.return_value = Evento(id=1, nome="Retiro", fechado=False, status="ATIVO")
+
+    local = LocalVenda(
+        id=1,
+        ativo=True,
+        modulo_pdv=True,
+        caixa_aberto=True,
+        caixa_atual_turno_id=10,
+        permite_desconto=False,
+        desconto_maximo_perc=0,
+        permite_pagamento_misto=False,
+    )
+    pl = ProdutoLocal(id=5, local_id=1, ativo=True, estoque_atual=Decimal("4"), preco_venda=Decimal("10.00"))
+    pl.produto = Produto(nome="Pastel", sku="P1", ativo=True)
+    pl.familia = None
+
+    config_res = MagicMock()
+    config_res.scalar_one_or_none.return_value = None
+    existentes_res = MagicMock()
+    existentes_res.all.return_value = [
+        SimpleNamespace(id=77, id_referencia="B", evento_id=1, vendedor_id=9),
+    ]
+    local_res = MagicMock()
+    local_res.scalar_one_or_none.return_value = local
+    produtos_res = MagicMock()
+    produtos_res.scalars.return_value.all.return_value = [pl]
+    vendas_res = MagicMock()
+    vendas_res.all.return_value = [SimpleNamespace(id=101, id_referencia="A")]
+
+    session.execute.side_effect = [
+        config_res,      # configuração do evento
+        existentes_res,  # referências já gravadas
+        local_res,       # lock do local (uma vez por lote)
+        produtos_res,    # lock dos ProdutoLocal (um único SELECT)
+        vendas_res,      # INSERT vendas RETURNING
+        MagicMock(),     # INSERT itens
+        MagicMock(),     # INSERT pagamentos
+        MagicMock(),     # baixa de estoque (um UPDATE)
+        MagicMock(),     # contadores do turno
+        MagicMock(),     # UPSERT resumo por forma
+    ]
+
+    resultados = await VendaService.criar_lote(
+        session,
+        evento_id=1,
+        vendedor_id=9,
+        vendas=[
+            _venda("A", 3, "30.00"),
+            _venda("B", 1, "10.00"),
+            _venda("C", 2, "20.00"),  # sobra 1 no estoque após A
+            _venda("A", 1, "10.00"),
+        ],
+    )
+
+    assert [r["status"] for r in resultados] == ["criada", "duplicada", "rejeitada", "rejeitada"]
+    assert resultados[0]["venda_id"] == 101
+    assert resultados[1]["venda_id"] == 77
+    assert "Estoque insuficiente" in resultados[2]["motivo"]
+    assert resultados[3]["motivo"] == "Referência repetida no lote"
+    assert pl.estoque_atual == Decimal("1")
+    assert session.execute.await_count == 10
+
+
+@pytest.mark.asyncio
+async def test_criar_trava_produtos_numa_unica_consulta() -> None:
+    session = AsyncMock(spec=AsyncSession)
+    session.add = MagicMock()
+    session.get.return_value = Evento(id=1, nome="Retiro", fechado=False, status="ATIVO")
+
+    local = LocalVenda(
+        id=1,
+        ativo=True,
+        modulo_pdv=True,
+        caixa_aberto=True,
+        caixa_atual_turno_id=None,
+        permite_desconto=False,
+        desconto_maximo_perc=0,
+        permite_pagamento_misto=False,
+    )
+    produtos = []
+    for pid in (5, 6, 7):
+        pl = ProdutoLocal(id=pid, local_id=1, ativo=True, estoque_atual=Decimal("10"), preco_venda=Decimal("5.00"))
+        pl.produto = Produto(nome=f"Produto {pid}", sku=f"P{pid}", ativo=True)
+        pl.familia = None
+        produtos.append(pl)
+
+    config_res = MagicMock()
+    config_res.scalar_one_or_none.return_value = None
+    local_res = MagicMock()
+    local_res.scalar_one_or_none.return_value = local
+    existente_res = MagicMock()
+    existente_res.scalar_one_or_none.return_value = None
+    produtos_res = MagicMock()
+    produtos_res.scalars.return_value.all.return_value = produtos
+    session.execute.side_effect = [config_res, local_res, existente_res, produtos_res, MagicMock()]
+
+    venda = await VendaService.criar(
+        session,
+        evento_id=1,
+        vendedor_id=9,
+        payload=VendaCreate(
+            local_id=1,
+            id_referencia="X1",
+            itens=[{"produto_local_id": pid, "quantidade": 2} for pid in (7, 5, 6)],
+            pagamentos=[{"tipo": "PIX", "valor": "30.00"}],
+        ),
+    )
+
+    # configuração, local, idempotência, lock dos produtos e baixa de estoque
+    assert session.execute.await_count == 5
+    assert venda.total == Decimal("30.00")
+    assert len(venda.itens) == 3
+    assert [pl.estoque_atual for pl in produtos] == [Decimal("8")] * 3
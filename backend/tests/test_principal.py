@@ -0,0 +1,82 @@
+"""Testes do cache de principal e do JWT decodificado uma vez por request."""
+
+from typing import Annotated
+from unittest.mock import AsyncMock
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.auth import dependencies
+from app.auth.dependencies import CurrentUser, require_scopes
+from app.auth.jwt import create_access_token
+from app.auth.principal import Principal, PrincipalCache, invalidar_apos_commit, principal_cache
+from app.db.session import get_session
+
+
+def _principal(user_id: int = 7, **kwargs) -> Principal:
+    campos = dict(
+        id=user_id, username="ana", is_active=True, is_superuser=False, is_staff=False,
+        scopes=frozenset({"core:read"}),
+    )
+    campos.update(kwargs)
+    return Principal(**campos)
+
+
+def test_invalidacao_espera_o_commit() -> None:
+    principal_cache.invalidar()
+    principal_cache.guardar(_principal(7))
+    principal_cache.guardar(_principal(8))
+
+    with Session(create_engine("sqlite://")) as sessao:
+        sessao.execute(text("SELECT 1"))
+        invalidar_apos_commit(sessao, 7)
+        assert principal_cache.obter(7) is not None  # ainda não commitou
+        sessao.commit()
+
+    assert principal_cache.obter(7) is None
+    assert principal_cache.obter(8) is not None
+
+
+def test_carga_iniciada_antes_da_invalidacao_nao_e_guardada() -> None:
+    cache = PrincipalCache(ttl_segundos=60, tamanho_maximo=2)
+    geracao = cache.geracao
+    cache.invalidar(7)  # commit de outra request no meio da carga
+    cache.guardar(_principal(7), geracao)
+    assert cache.obter(7) is None
+
+    for user_id in (1, 2, 3):
+        cache.guardar(_principal(user_id))
+    assert cache.obter(1) is None and cache.obter(3) is not None  # tamanho máximo
+
+
+def test_require_scopes_reaproveita_o_payload(monkeypatch) -> None:
+    principal_cache.invalidar()
+    principal_cache.guardar(_principal(7))
+    decodificacoes = []
+    verificar_original = dependencies.verificar_access_token
+    monkeypatch.setattr(
+        dependencies,
+        "verificar_access_token",
+        lambda token: decodificacoes.append(token) or verificar_original(token),
+    )
+
+    app = FastAPI()
+    app.dependency_overrides[get_session] = lambda: AsyncMock()
+
+    @app.get("/financeiro")
+    async def financeiro(user: Annotated[CurrentUser, Depends(require_scopes("finance:read"))]) -> dict:
+        return {"id": user.id}
+
+    @app.get("/core")
+    async def core(user: Annotated[CurrentUser, Depends(require_scopes("core:read"))]) -> dict:
+        return {"id": user.id}
+
+    token = create_access_token(subject=7, scopes=["core:read"])
+    with TestClient(app) as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/core", headers=headers).json() == {"id": 7}
+        assert client.get("/financeiro", headers=headers).status_code == 403
+
+    assert len(decodificacoes) == 2  # uma por request
@@ -0,0 +1,87 @@
+"""Testes da revogação de tokens (filtro de Bloom) e do rastreio de atividade."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app.auth import services
+from app.auth.dependencies import get_current_user
+from app.auth.jwt import create_access_token, create_refresh_token, decode_token
+from app.auth.principal import Principal, principal_cache
+from app.auth.revogacao import FiltroBloom, RastreadorAtividade, revogacoes
+from app.auth.services import SessaoService
+from app.config import settings
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def _resultado(valor) -> MagicMock:
+    resultado = MagicMock()
+    resultado.scalar_one_or_none.return_value = valor
+    return resultado
+
+
+def test_filtro_bloom_sem_falso_negativo_e_poucos_falsos_positivos() -> None:
+    filtro = FiltroBloom(bits=1 << 16, hashes=7)
+    revogados = [f"revogado-{i}" for i in range(2000)]
+    for jti in revogados:
+        filtro.adicionar(jti)
+
+    assert all(jti in filtro for jti in revogados)
+    falsos = sum(f"valido-{i}" in filtro for i in range(20000))
+    assert falsos / 20000 < 0.01
+
+
+def test_tokens_levam_jti_e_sid() -> None:
+    access = decode_token(create_access_token(subject=7, sessao="s1"))
+    refresh = decode_token(create_refresh_token(7, sessao="s1"))
+    assert access["sid"] == refresh["sid"] == "s1"
+    assert access["jti"] and refresh["jti"] and access["jti"] != refresh["jti"]
+
+
+async def test_token_fora_do_filtro_nao_consulta_o_banco() -> None:
+    principal_cache.guardar(
+        Principal(7, "ana", True, False, False, frozenset({"core:read"}))
+    )
+    session = AsyncMock(spec=AsyncSession)
+    payload = {"sub": "7", "jti": "nunca-revogado", "sid": "sessao-7"}
+
+    user = await get_current_user(_request(), payload, session)
+
+    assert user.id == 7
+    session.execute.assert_not_awaited()
+
+
+async def test_token_revogado_e_recusado() -> None:
+    revogacoes.adicionar("jti-revogado")
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = _resultado("jti-revogado")
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user(_request(), {"sub": "7", "jti": "jti-revogado"}, session)
+
+    assert exc.value.status_code == 401
+    session.execute.assert_awaited_once()
+
+
+async def test_sessao_inativa_considera_atividade_ainda_nao_gravada(monkeypatch) -> None:
+    rastreador = RastreadorAtividade(intervalo_segundos=60)
+    monkeypatch.setattr(services, "rastreador_atividade", rastreador)
+    session = AsyncMock(spec=AsyncSession)
+    session.scalar.return_value = datetime.now(UTC) - timedelta(
+        seconds=settings.INACTIVITY_TIMEOUT_SECONDS + 60
+    )
+
+    assert await SessaoService.inativa(session, "s1")
+    rastreador.registrar("s1")
+    assert rastreador.ultima_local("s1") is not None
+    assert not await SessaoService.inativa(session, "s1")
+
+    session.scalar.return_value = None  # encerrada no logout
+    assert await SessaoService.inativa(session, "s1")
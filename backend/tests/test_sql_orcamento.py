@@ -0,0 +1,92 @@
+"""Testes do contador de SQL por request (Server-Timing + orçamento por rota)."""
+
+import logging
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import settings
+from app.db import session as db_session
+from app.middleware.sql import OrcamentoSQLExcedido, QueryCounterMiddleware
+
+
+def _simular_statements(n: int) -> None:
+    conn = SimpleNamespace(info={})
+    for _ in range(n):
+        db_session._antes_do_cursor(conn, None, "SELECT 1", (), None, False)
+        db_session._depois_do_cursor(conn, None, "SELECT 1", (), None, False)
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware)
+
+    @app.get("/itens/{item_id}")
+    async def item(item_id: int) -> dict[str, int]:
+        _simular_statements(item_id)
+        return {"id": item_id}
+
+    return app
+
+
+def test_server_timing_conta_statements_da_request() -> None:
+    with TestClient(_app()) as client:
+        response = client.get("/itens/3")
+
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    db, pool = response.headers["Server-Timing"].split(", ")
+    assert db.endswith('desc="3 statements"')
+    assert pool.startswith("pool;dur=")
+
+
+def test_listener_fora_de_request_nao_conta() -> None:
+    assert db_session.contagem_sql.get() is None
+    _simular_statements(2)  # não deve levantar nem acumular em lugar nenhum
+
+
+def test_orcamento_estourado_falha_em_ambiente_de_teste(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "ENVIRONMENT", "test")
+    monkeypatch.setattr(settings, "SQL_ORCAMENTOS", {"GET /itens/{item_id}": 2})
+
+    with TestClient(_app()) as client:
+        assert client.get("/itens/2").status_code == 200
+        with pytest.raises(OrcamentoSQLExcedido, match="3 statements"):
+            client.get("/itens/3")
+
+
+def test_orcamento_estourado_so_avisa_em_producao(monkeypatch, caplog) -> None:
+    monkeypatch.setattr(settings, "ENVIRONMENT", "prod")
+    monkeypatch.setattr(settings, "SQL_ORCAMENTO_PADRAO", 1)
+
+    with caplog.at_level(logging.INFO, logger="maanaim.sql"), TestClient(_app()) as client:
+        response = client.get("/itens/4")
+
+    assert response.status_code == 200
+    registro = next(r for r in caplog.records if r.levelno == logging.INFO)
+    assert registro.rota == "GET /itens/{item_id}"
+    assert registro.sql_statements == 4
+    assert any(r.levelno == logging.WARNING and "orçamento: 1" in r.message for r in caplog.records)
+
+
+async def test_espera_do_pool_vai_para_a_request_e_para_as_metricas(monkeypatch) -> None:
+    espera = db_session.EsperaPool()
+    monkeypatch.setattr(db_session, "espera_pool", espera)
+    pool = db_session.PoolMedido(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.05)
+    contagem = db_session.ContagemSQL()
+    token = db_session.contagem_sql.set(contagem)
+    try:
+        conexao = await greenlet_spawn(pool.connect)
+        with pytest.raises(PoolTimeoutError):
+            await greenlet_spawn(pool.connect)  # pool esgotado: espera o pool_timeout
+    finally:
+        db_session.contagem_sql.reset(token)
+        conexao.close()
+
+    assert espera.checkouts == 2 and espera.timeouts == 1 and espera.lentos >= 1
+    assert contagem.espera_pool >= 0.05
@@ -0,0 +1,68 @@
+"""Testes da verificação rápida do access token e da claim compacta de scopes."""
+
+import base64
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.auth import verificacao
+from app.auth.jwt import InvalidTokenError, create_access_token, decode_token
+from app.auth.verificacao import VerificadorJWT
+from app.config import settings
+
+SCOPES = ["core:read", "finance:write", "pos:write", "relatorios:especial"]
+
+
+def _verificador(tamanho_cache: int = 8) -> VerificadorJWT:
+    return VerificadorJWT(
+        segredo=settings.JWT_SECRET_KEY, algoritmo=settings.JWT_ALGORITHM, tamanho_cache=tamanho_cache
+    )
+
+
+def test_token_compacto_menor_e_com_os_mesmos_scopes(monkeypatch) -> None:
+    compacto = create_access_token(subject=7, groups=["FINANCEIRO", "CAIXA"], scopes=SCOPES)
+    monkeypatch.setattr(settings, "JWT_SCOPES_COMPACTOS", False)
+    legado = create_access_token(subject=7, groups=["FINANCEIRO", "CAIXA"], scopes=SCOPES)
+
+    assert len(compacto) < len(legado)
+    assert decode_token(compacto)["scopes"] == ["relatorios:especial"]  # só o fora do bitmask
+    verificador = _verificador()
+    for token in (compacto, legado):
+        payload = verificador.verificar(token)
+        assert payload["sub"] == "7"
+        assert payload["scopes"] == frozenset(SCOPES)
+
+
+def test_token_memorizado_ate_o_exp(monkeypatch) -> None:
+    verificador = _verificador(tamanho_cache=1)
+    token = create_access_token(subject=7, scopes=["core:read"])
+
+    assert verificador.verificar(token) is verificador.verificar(token)
+    assert verificador.metricas() == {"entradas": 1, "acertos": 1, "faltas": 1}
+
+    # expira enquanto está no cache
+    exp = verificador.verificar(token)["exp"]
+    monkeypatch.setattr(verificacao, "time", SimpleNamespace(time=lambda: exp + 1))
+    with pytest.raises(InvalidTokenError):
+        verificador.verificar(token)
+    assert verificador.metricas()["entradas"] == 0
+
+
+def test_rejeita_assinatura_adulterada_e_alg_none(monkeypatch) -> None:
+    verificador = _verificador()
+    token = create_access_token(subject=7, scopes=["core:read"])
+    cabecalho, corpo, assinatura = token.split(".")
+
+    corpo_admin = json.loads(base64.urlsafe_b64decode(corpo + "=" * (-len(corpo) % 4)))
+    corpo_admin["superuser"] = True
+    forjado = base64.urlsafe_b64encode(json.dumps(corpo_admin).encode()).decode().rstrip("=")
+    nenhum = base64.urlsafe_b64encode(b'{"alg":"none","typ":"JWT"}').decode().rstrip("=")
+
+    for invalido in (f"{cabecalho}.{forjado}.{assinatura}", f"{nenhum}.{corpo}.", "a.b", token + "x"):
+        with pytest.raises(InvalidTokenError):
+            verificador.verificar(invalido)
+
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", -1)
+    with pytest.raises(InvalidTokenError):
+        verificador.verificar(create_access_token(subject=7))
@@ -655,12 +655,17 @@ function FamiliasSubTab({ localId, onVoltar }: { localId: number; onVoltar: () =
 /* ====================================================================== */
 
 function AuditoriaCrud() {
-  const [page, setPage] = useState(1);
+  // keyset: cursors[i] abre a página i + 1 (a primeira não tem cursor)
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
   const [methodFilter, setMethodFilter] = useState("");
   const [statusFilter, setStatusFilter] = useState("");
   const pageSize = 50;
+  const page = cursors.length;
+  const resetPage = () => setCursors([undefined]);
 
-  const filters: Record<string, any> = { page, page_size: pageSize };
+  const filters: Record<string, any> = { page_size: pageSize, incluir_total: false };
+  const cursor = cursors[cursors.length - 1];
+  if (cursor) filters.cursor = cursor;
   if (methodFilter) filters.method = methodFilter;
   if (statusFilter) filters.status_code = Number(statusFilter);
 
@@ -674,7 +679,7 @@ function AuditoriaCrud() {
           <select
             className="flex h-9 w-28 rounded-md border border-input bg-background px-3 py-1 text-sm"
             value={methodFilter}
-            onChange={(e) => { setMethodFilter(e.target.value); setPage(1); }}
+            onChange={(e) => { setMethodFilter(e.target.value); resetPage(); }}
           >
             <option value="">Todos</option>
             <option value="GET">GET</option>
@@ -688,7 +693,7 @@ function AuditoriaCrud() {
           <select
             className="flex h-9 w-28 rounded-md border border-input bg-background px-3 py-1 text-sm"
             value={statusFilter}
-            onChange={(e) => { setStatusFilter(e.target.value); setPage(1); }}
+            onChange={(e) => { setStatusFilter(e.target.value); resetPage(); }}
           >
             <option value="">Todos</option>
             <option value="200">200 OK</option>
@@ -743,24 +748,22 @@ function AuditoriaCrud() {
         ))}
       </div>
 
-      {data && data.total > pageSize && (
+      {data && (page > 1 || data.next_cursor) && (
         <div className="flex items-center justify-center gap-4">
           <Button
             size="sm"
             variant="outline"
             disabled={page <= 1}
-            onClick={() => setPage((p) => Math.max(1, p - 1))}
+            onClick={() => setCursors((c) => (c.length > 1 ? c.slice(0, -1) : c))}
           >
             <ChevronLeft className="h-4 w-4" /> Anterior
           </Button>
-          <span className="text-sm text-mm-muted">
-            Página {data.page} de {Math.ceil(data.total / pageSize)}
-          </span>
+          <span className="text-sm text-mm-muted">Página {page}</span>
           <Button
             size="sm"
             variant="outline"
-            disabled={page >= Math.ceil(data.total / pageSize)}
-            onClick={() => setPage((p) => p + 1)}
+            disabled={!data.next_cursor}
+            onClick={() => data.next_cursor && setCursors((c) => [...c, data.next_cursor!])}
           >
             Próximo <ChevronRight className="h-4 w-4" />
           </Button>
@@ -387,6 +387,8 @@ type AuditLogFilters = {
   status_code?: number;
   data_inicio?: string;
   data_fim?: string;
+  cursor?: string;
+  incluir_total?: boolean;
 };
 
 export function useAuditLogs(filters: AuditLogFilters = {}) {
@@ -123,9 +123,10 @@ export interface AuditLog {
 
 export interface PaginatedAuditLogs {
   items: AuditLog[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor: string | null;
 }
 
 export interface OrdemCompra {
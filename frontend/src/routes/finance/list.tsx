@@ -1,5 +1,5 @@
 import { useQuery } from "@tanstack/react-query";
-import { Plus, Search, Trash2, Pencil, Paperclip } from "lucide-react";
+import { Download, Plus, Search, Trash2, Pencil, Paperclip } from "lucide-react";
 import { useState } from "react";
 import { Link, useNavigate, useLocation } from "react-router-dom";
 import { toast } from "sonner";
@@ -26,6 +26,7 @@ export function FinanceListPage() {
   const [categoriaId, setCategoriaId] = useState<string>("");
   const [descricao, setDescricao] = useState("");
   const [page, setPage] = useState(1);
+  const [isExporting, setIsExporting] = useState(false);
   const pageSize = 25;
 
   const { data: categorias } = useCategorias();
@@ -46,6 +47,32 @@ export function FinanceListPage() {
     placeholderData: (prev) => prev,
   });
 
+  async function exportarCSV() {
+    try {
+      setIsExporting(true);
+      const response = await api.get("/finance/lancamentos/csv", {
+        params: {
+          tipo: tipo || undefined,
+          categoria_id: categoriaId || undefined,
+        },
+        responseType: "blob",
+      });
+      const blob = new Blob([response.data], { type: "text/csv;charset=utf-8" });
+      const url = window.URL.createObjectURL(blob);
+      const link = document.createElement("a");
+      link.href = url;
+      link.setAttribute("download", "lancamentos.csv");
+      document.body.appendChild(link);
+      link.click();
+      link.parentNode?.removeChild(link);
+      window.URL.revokeObjectURL(url);
+    } catch {
+      toast.error("Falha ao exportar CSV");
+    } finally {
+      setIsExporting(false);
+    }
+  }
+
   async function excluir(id: number, descricao: string) {
     if (!confirm(`Excluir lançamento "${descricao}"?`)) return;
     try {
@@ -180,6 +207,9 @@ export function FinanceListPage() {
             <Button size="sm" onClick={() => refetch()} disabled={isFetching}>
               Atualizar
             </Button>
+            <Button variant="outline" size="sm" onClick={exportarCSV} disabled={isExporting}>
+              <Download className="mr-2" size={16} /> {isExporting ? "Exportando..." : "Exportar CSV"}
+            </Button>
           </div>
         </CardContent>
       </Card>